@@ -0,0 +1,15 @@
+// Live results of a tournament: refresh the teams table whenever the results change
+document.querySelectorAll("[data-live-results-url]").forEach((element) => {
+    const source = new EventSource(element.dataset.liveResultsUrl);
+    let lastResults = null;
+
+    source.addEventListener("results", (event) => {
+        // The first event carries the results the page was rendered with, and each reconnect
+        // (every few seconds where the connection cannot be held) sends them again unchanged
+        const changed = lastResults !== null && event.data !== lastResults;
+        lastResults = event.data;
+        if (changed) {
+            document.body.dispatchEvent(new Event("teamsListChanged"));
+        }
+    });
+});
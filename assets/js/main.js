@@ -15,6 +15,7 @@ import "./confirm";
 import "./toasts";
 import "./tooltip";
 import "./search";
+import "./live-results";
 
 // Alpine should be the last one
 import "./alpine";
@@ -2,6 +2,7 @@ window.memberSearch = function (tournament_id) {
     return {
         results: [],
         selectedMember: {},
+        selectedMembers: [], // for the bulk roster form only
         showResults: false,
         highlightedIndex: -1,
         query: "",
@@ -101,7 +102,15 @@ window.memberSearch = function (tournament_id) {
             this.showResults = false;
             this.highlightedIndex = -1;
 
-            if (this.tournament_id) {
+            const memberIdsInput = document.querySelector("#id_member_ids");
+            if (this.tournament_id && memberIdsInput) {
+                // Bulk roster form, members are collected until the form is submitted
+                if (!this.selectedMembers.some((selected) => selected.id === member.id)) {
+                    this.selectedMembers.push(member);
+                }
+                this.query = "";
+                this.updateMemberIds(memberIdsInput);
+            } else if (this.tournament_id) {
                 // Roster page
                 const memberInput = document.querySelector("#id_member_id");
                 memberInput.value = member.id;
@@ -111,5 +120,15 @@ window.memberSearch = function (tournament_id) {
                 await this.fetchForm(member.id);
             }
         },
+
+        unselectMember(member) {
+            this.selectedMembers = this.selectedMembers.filter((selected) => selected.id !== member.id);
+            this.updateMemberIds(document.querySelector("#id_member_ids"));
+        },
+
+        updateMemberIds(memberIdsInput) {
+            memberIdsInput.value = this.selectedMembers.map((selected) => selected.id).join(",");
+            memberIdsInput.dispatchEvent(new Event("change", { bubbles: true }));
+        },
     };
 };
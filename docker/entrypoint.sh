@@ -6,7 +6,13 @@ python manage.py collectstatic --no-input
 # Apply database migrations
 python manage.py migrate
 
-# Start the gunicorn worker process at the defined port
-ddtrace-run gunicorn ultihub.wsgi:application --access-logfile - --error-logfile - --bind 0.0.0.0:8000 &
+# Start the gunicorn worker process at the defined port. With SERVER_MODE=asgi the app is
+# served by uvicorn workers, so async views (live results, Sentry tunnel, member search)
+# wait for I/O without holding a worker.
+if [ "$SERVER_MODE" = "asgi" ]; then
+    ddtrace-run gunicorn ultihub.asgi:application --worker-class uvicorn_worker.UvicornWorker --access-logfile - --error-logfile - --bind 0.0.0.0:8000 &
+else
+    ddtrace-run gunicorn ultihub.wsgi:application --access-logfile - --error-logfile - --bind 0.0.0.0:8000 &
+fi
 
 wait
@@ -0,0 +1,92 @@
+import pickle
+
+import pytest
+from api.authentication import _cache_key
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from tests.conftest import simulate_commit
+
+
+@pytest.fixture
+def token_client(api_client, user):
+    with simulate_commit():
+        token = Token.objects.create(user=user)
+    api_client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    api_client.token = token
+    return api_client
+
+
+def _patch(client, application):
+    return client.patch(
+        reverse("api:competition-application", kwargs={"pk": application.pk}),
+        {"final_placement": 1},
+    )
+
+
+def _token_queries(queries):
+    return [query for query in queries if "authtoken_token" in query["sql"]]
+
+
+def test_token_is_cached(token_client, competition_application):
+    assert _patch(token_client, competition_application).status_code == 200
+
+    with CaptureQueriesContext(connection) as queries:
+        response = _patch(token_client, competition_application)
+
+    assert response.status_code == 200
+    assert response.wsgi_request.user == token_client.token.user
+    assert _token_queries(queries) == []
+
+
+def test_deleted_token_is_refused(token_client, competition_application):
+    assert _patch(token_client, competition_application).status_code == 200
+
+    with simulate_commit():
+        token_client.token.delete()
+
+    assert _patch(token_client, competition_application).status_code == 401
+
+
+def test_deactivated_user_is_refused(token_client, competition_application):
+    assert _patch(token_client, competition_application).status_code == 200
+
+    user = token_client.token.user
+    user.is_active = False
+    with simulate_commit():
+        user.save()
+
+    response = _patch(token_client, competition_application)
+    assert response.status_code == 401
+    assert response.json() == {"detail": "User inactive or deleted."}
+
+
+def test_invalid_token_is_not_cached(competition_application):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as queries:
+            assert _patch(client, competition_application).status_code == 401
+        assert len(_token_queries(queries)) == 1
+
+
+def test_cached_user_holds_no_credentials(token_client, competition_application):
+    user = token_client.token.user
+    user.set_password("secret")
+    with simulate_commit():
+        user.save()
+    assert _patch(token_client, competition_application).status_code == 200
+
+    cached = pickle.dumps(cache.get(_cache_key(token_client.token.key)))
+    assert token_client.token.key.encode() not in cached
+    assert user.password.encode() not in cached
+
+    response = _patch(token_client, competition_application)
+    assert response.status_code == 200
+    # The password is not lost, it is deferred
+    assert response.wsgi_request.user.password == user.password
@@ -0,0 +1,105 @@
+import math
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from tests.factories import ClubFactory
+from tests.helpers import create_complete_competition
+
+
+@pytest.fixture
+def settled(monkeypatch):
+    monkeypatch.setattr("api.changes.SETTLE_TIME", timedelta(0))
+
+
+def _sync(api_client, since=None, page_size=2):
+    changes, pages = [], 0
+    while True:
+        params = {"page_size": page_size} | ({"since": since} if since else {})
+        response = api_client.get(reverse("api:changes"), params)
+        assert response.status_code == 200
+        data = response.json()
+        changes += [(change["type"], change["id"], change["action"]) for change in data["results"]]
+        since, pages = data["next"], pages + 1
+        if not data["has_more"]:
+            return changes, since, pages
+
+
+@pytest.mark.usefixtures("settled")
+class TestChanges:
+    def test_full_sync_in_pages(self, api_client):
+        objects = create_complete_competition()
+
+        changes, _, pages = _sync(api_client)
+
+        assert len(changes) == len(set(changes))
+        assert pages == math.ceil(len(changes) / 2)
+        assert {
+            ("competition", objects["competition"].id, "upsert"),
+            ("competition_application", objects["application"].id, "upsert"),
+            ("tournament", objects["tournament"].id, "upsert"),
+            ("team_at_tournament", objects["team_at_tournament"].id, "upsert"),
+            ("club", objects["application"].team.club.id, "upsert"),
+        } <= set(changes)
+
+    def test_resumes_after_cursor(self, api_client):
+        objects = create_complete_competition()
+        _, cursor, _ = _sync(api_client)
+
+        objects["tournament"].name = "Renamed"
+        objects["tournament"].save()
+        club = ClubFactory()
+        club_id = club.id
+        club.delete()
+
+        changes, next_cursor, _ = _sync(api_client, cursor)
+        # The upsert of the club is gone with the row, only its deletion is left
+        assert changes == [
+            ("tournament", objects["tournament"].id, "upsert"),
+            ("club", club_id, "delete"),
+        ]
+        assert _sync(api_client, next_cursor)[0] == []
+
+    def test_admin_approval_and_winners_update(self, api_client, admin_client):
+        objects = create_complete_competition()
+        _, cursor, _ = _sync(api_client)
+
+        admin_client.post(
+            reverse("admin:competitions_competitionapplication_changelist"),
+            {"action": "decline", "_selected_action": [objects["application"].pk]},
+        )
+        objects["tournament"].update_winners()
+
+        changes, _, _ = _sync(api_client, cursor)
+        assert changes == [
+            ("competition_application", objects["application"].id, "upsert"),
+            ("tournament", objects["tournament"].id, "upsert"),
+        ]
+
+    def test_upsert_data(self, api_client):
+        objects = create_complete_competition()
+        response = api_client.get(reverse("api:changes"), {"page_size": 100})
+        tournament = next(
+            change for change in response.json()["results"] if change["type"] == "tournament"
+        )
+        assert tournament["data"]["competition_id"] == objects["competition"].id
+        assert tournament["data"]["name"] == objects["tournament"].name
+
+    def test_invalid_cursor(self, api_client):
+        response = api_client.get(reverse("api:changes"), {"since": "nonsense"})
+        assert response.status_code == 400
+        assert "since" in response.json()
+
+
+def test_recent_changes_wait_to_settle(api_client):
+    ClubFactory()
+    response = api_client.get(reverse("api:changes"))
+    assert response.json() == {"results": [], "next": None, "has_more": False}
+
+
+def test_changes_are_not_conditional(api_client):
+    response = api_client.get(reverse("api:changes"))
+
+    assert "ETag" not in response
+    assert "ETag" in api_client.get(reverse("api:seasons"))
@@ -0,0 +1,77 @@
+import pytest
+from api.throttling import ApiThrottle
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+WINDOW_START = 60 * 1000
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {"now": WINDOW_START}
+    monkeypatch.setattr(ApiThrottle, "timer", staticmethod(lambda: clock["now"]))
+    return clock
+
+
+@pytest.fixture
+def rates(monkeypatch):
+    monkeypatch.setattr(ApiThrottle, "rates", {"client": "30/min", "endpoint": "20/min"})
+
+
+pytestmark = pytest.mark.usefixtures("clock", "rates")
+
+
+def test_expensive_endpoint_costs_more(api_client):
+    url = reverse("api:competitions")
+    assert [api_client.get(url).status_code for _ in range(3)] == [200, 200, 429]
+
+    response = api_client.get(url)
+    # The next window has to start, then half of its predecessor to pass
+    assert response["Retry-After"] == "90"
+    # Other endpoints and other clients have their own budgets
+    assert api_client.get(reverse("api:clubs")).status_code == 200
+    assert APIClient(REMOTE_ADDR="10.0.0.2").get(url).status_code == 200
+
+
+def test_client_budget(api_client):
+    api_client.get(reverse("api:competitions"))
+    api_client.get(reverse("api:competitions"))
+
+    statuses = [api_client.get(reverse("api:changes")).status_code for _ in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+    # Refused requests are not charged
+    assert api_client.get(reverse("api:clubs")).status_code == 200
+
+
+def test_window_slides(api_client, clock):
+    url = reverse("api:competitions")
+    api_client.get(url)
+    api_client.get(url)
+
+    # Half of the previous window still counts
+    clock["now"] = WINDOW_START + 90
+    assert api_client.get(url).status_code == 200
+    response = api_client.get(url)
+    assert response.status_code == 429
+    assert response["Retry-After"] == "30"
+
+    clock["now"] = WINDOW_START + 120
+    assert api_client.get(url).status_code == 200
+
+
+def test_endpoint_budget(api_client):
+    url = reverse("api:clubs")
+    assert [api_client.get(url).status_code for _ in range(21)] == [200] * 20 + [429]
+    assert api_client.get(reverse("api:seasons")).status_code == 200
+
+
+def test_authenticated_clients_are_counted_by_user(api_client, user):
+    api_client.force_authenticate(user)
+    url = reverse("api:competitions")
+    api_client.get(url)
+    api_client.get(url)
+
+    # Anonymous requests from the same address have a budget of their own
+    assert APIClient().get(url).status_code == 200
+    assert api_client.get(url).status_code == 429
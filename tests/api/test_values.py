@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+import pytest
+from api.management.commands.benchmark_api_serializers import (
+    get_endpoints,
+    serialize_values,
+    serialize_with_model,
+)
+from competitions.enums import ApplicationStateEnum
+from competitions.models import Season
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tests.factories import (
+    AgeLimitFactory,
+    CompetitionApplicationFactory,
+    MemberAtTournamentFactory,
+)
+from tests.helpers import create_complete_competition
+
+
+@pytest.fixture
+def season_data():
+    objects = create_complete_competition()
+    other = create_complete_competition(season=objects["competition"].season)
+    other["competition"].age_limit = AgeLimitFactory()
+    other["competition"].save()
+    CompetitionApplicationFactory(
+        competition=objects["competition"], state=ApplicationStateEnum.DECLINED
+    )
+    for team_at_tournament in (objects["team_at_tournament"], other["team_at_tournament"]):
+        for jersey_number in (7, 12):
+            MemberAtTournamentFactory(
+                tournament=team_at_tournament.tournament,
+                team_at_tournament=team_at_tournament,
+                jersey_number=jersey_number,
+                is_captain=jersey_number == 7,
+            )
+    other["team_at_tournament"].spirit_avg = Decimal("10.5")
+    other["team_at_tournament"].final_placement = 1
+    other["team_at_tournament"].save()
+    Season.objects.update(invoices_generated_at=timezone.now())
+    return objects
+
+
+def test_values_match_the_model_serializers(season_data):
+    for endpoint in get_endpoints(season_data["competition"].season):
+        assert serialize_values(endpoint) == serialize_with_model(endpoint), endpoint.name
+
+
+def test_benchmark_command(season_data, capsys):
+    call_command("benchmark_api_serializers", season_data["competition"].season.name, repeat=1)
+
+    output = capsys.readouterr().out
+    assert "competitions: 2 rows" in output
+    assert "teams-at-tournament: 2 rows" in output
+
+
+def test_fields_select_columns_and_relations(api_client, season_data):
+    url = reverse("api:teams-at-tournament")
+    params = {"tournament_id": season_data["tournament"].id}
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, params | {"fields": "id,team_name"})
+    assert response.json() == [
+        {
+            "id": season_data["team_at_tournament"].id,
+            "team_name": season_data["application"].team_name,
+        }
+    ]
+    assert not any("jersey_number" in query["sql"] for query in queries)
+
+    response = api_client.get(url, params | {"fields": "id", "include": "members"})
+    [team] = response.json()
+    assert team.keys() == {"id", "members"}
+    assert [member["jersey_number"] for member in team["members"]] == [7, 12]
+
+
+def test_include_adds_relations_to_all_fields(api_client, season_data):
+    response = api_client.get(reverse("api:competitions"), {"include": "tournaments"})
+
+    assert response.status_code == 200
+    assert all("accepted_applications" not in item for item in response.json())
+    assert all(len(item["tournaments"]) == 1 for item in response.json())
+    assert response.json()[0].keys() >= {"id", "name", "season"}
+
+
+def test_unknown_fields_are_rejected(api_client):
+    response = api_client.get(reverse("api:clubs"), {"fields": "id,password"})
+    assert response.status_code == 400
+    assert response.json() == {"fields": "Unknown fields: password."}
+
+    response = api_client.get(reverse("api:clubs"), {"include": "name"})
+    assert response.status_code == 400
+
+
+def test_fields_with_pagination(api_client, season_data):
+    response = api_client.get(
+        reverse("api:competitions"), {"fields": "id", "page_size": 1, "ordering": "updated_at"}
+    )
+
+    assert response.json()["results"] == [{"id": season_data["competition"].id}]
+    response = api_client.get(response.json()["next"])
+    assert len(response.json()["results"]) == 1
@@ -1,29 +1,33 @@
+import json
 from decimal import Decimal
 
 import pytest
+from api.views import SeasonRostersView
+from asgiref.sync import async_to_sync
+from auditlog.models import LogEntry
 from competitions.enums import EnvironmentEnum
 from competitions.models import CompetitionApplication
+from django.db import connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.authtoken.models import Token
-from rest_framework.test import APIClient
 from tournaments.models import TeamAtTournament
 
+from tests.conftest import simulate_commit
 from tests.factories import (
+    ClubFactory,
     CompetitionApplicationFactory,
     CompetitionFactory,
     DivisionFactory,
     MemberAtTournamentFactory,
+    SeasonFactory,
     TournamentFactory,
 )
 from tests.helpers import create_complete_competition
 
 
-@pytest.fixture
-def api_client():
-    return APIClient()
-
-
 @pytest.fixture
 def api_token(user):
     return Token.objects.create(user=user)
@@ -189,6 +193,115 @@ def test_patch_team_at_tournament(api_token, api_client, team_at_tournament):
     assert team_at_tournament.spirit_avg is None
 
 
+def test_post_tournament_results(api_token, api_client, tournament, team_at_tournament_factory):
+    with simulate_commit():
+        teams = team_at_tournament_factory.create_batch(3, tournament=tournament)
+    url = reverse("api:tournament-results", args=[tournament.pk])
+
+    # Without token in header
+    response = api_client.post(url, data={}, format="json")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    with simulate_commit():
+        response = api_client.post(
+            url,
+            data={
+                "teams": [
+                    {"id": teams[0].pk, "final_placement": 2, "spirit_avg": "12.500"},
+                    {"id": teams[1].pk, "final_placement": 1, "spirit_avg": "14.250"},
+                    {"id": teams[2].pk, "final_placement": 3},
+                ]
+            },
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {api_token.key}",
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["teams"][1] == {
+        "id": teams[1].pk,
+        "final_placement": 1,
+        "spirit_avg": "14.250",
+    }
+
+    assert [
+        (team.final_placement, team.spirit_avg)
+        for team in TeamAtTournament.objects.filter(tournament=tournament).order_by("pk")
+    ] == [(2, Decimal("12.500")), (1, Decimal("14.250")), (3, None)]
+    tournament.refresh_from_db()
+    assert tournament.winner_team == teams[1]
+    assert tournament.sotg_winner_team == teams[1]
+
+
+def test_post_tournament_results_audits_teams_and_updates_winners_once(
+    api_token, api_client, tournament, team_at_tournament_factory
+):
+    with simulate_commit():
+        teams = team_at_tournament_factory.create_batch(10, tournament=tournament)
+
+    with CaptureQueriesContext(connection) as queries, simulate_commit():
+        response = api_client.post(
+            reverse("api:tournament-results", args=[tournament.pk]),
+            data={
+                "teams": [
+                    {"id": team.pk, "final_placement": placement}
+                    for placement, team in enumerate(teams, start=1)
+                ]
+            },
+            format="json",
+            HTTP_AUTHORIZATION=f"Token {api_token.key}",
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+    updates = [
+        query["sql"].split(" SET ")[0] for query in queries if query["sql"].startswith("UPDATE")
+    ]
+    assert updates.count('UPDATE "tournaments_teamattournament"') == len(teams)
+    assert updates.count('UPDATE "tournaments_tournament"') == 1
+
+    entry = LogEntry.objects.get_for_object(teams[0]).get(action=LogEntry.Action.UPDATE)
+    assert entry.changes_dict == {"final_placement": ["None", "1"]}
+
+
+@pytest.mark.parametrize(
+    "results,error",
+    [
+        ([{"id": 0, "final_placement": 1}, {"id": 0, "final_placement": 2}], "only once"),
+        ([{"id": 0, "final_placement": 1}, {"id": 1, "final_placement": 1}], "unique"),
+        # Clashes with the placement of a team missing in the payload
+        ([{"id": 0, "final_placement": 2}], "unique"),
+        ([{"id": -1, "final_placement": 1}], "not at this tournament"),
+        ([{"id": 0, "final_placement": 0}], "greater than or equal to 1"),
+        ([{"id": 0, "spirit_avg": "21"}], "less than or equal to 20"),
+        ([], "empty"),
+    ],
+)
+def test_post_tournament_results_validation(
+    api_token, api_client, tournament, team_at_tournament_factory, results, error
+):
+    teams = [
+        team_at_tournament_factory(tournament=tournament),
+        team_at_tournament_factory(tournament=tournament, final_placement=2),
+    ]
+    # Team from another tournament
+    team_ids = [team.pk for team in teams] + [team_at_tournament_factory().pk]
+    for result in results:
+        result["id"] = team_ids[result["id"]]
+
+    response = api_client.post(
+        reverse("api:tournament-results", args=[tournament.pk]),
+        data={"teams": results},
+        format="json",
+        HTTP_AUTHORIZATION=f"Token {api_token.key}",
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert error in str(response.json())
+    # Nothing is saved when any result is invalid
+    assert list(
+        TeamAtTournament.objects.filter(tournament=tournament)
+        .order_by("pk")
+        .values_list("final_placement", flat=True)
+    ) == [None, 2]
+
+
 def test_get_competition_application(api_client, competition_application):
     response = api_client.get(
         reverse("api:competition-application", args=[competition_application.pk])
@@ -251,3 +364,164 @@ def test_get_seasons(api_client, season):
             "age_reference_date": season.age_reference_date.isoformat(),
         },
     ]
+
+
+def _get_all_pages(api_client, url, **params):
+    ids, pages = [], 0
+    response = api_client.get(url, params)
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        ids += [item["id"] for item in data["results"]]
+        pages += 1
+        if not data["next"]:
+            return ids, pages
+        response = api_client.get(data["next"])
+
+
+def test_get_clubs_paginated(api_client):
+    clubs = ClubFactory.create_batch(5)
+
+    ids, pages = _get_all_pages(api_client, reverse("api:clubs"), page_size=2)
+
+    assert ids == [club.id for club in reversed(clubs)]
+    assert pages == 3
+
+
+def test_get_clubs_paginated_by_updated_at(api_client):
+    clubs = ClubFactory.create_batch(3)
+    clubs[0].save()
+
+    ids, _ = _get_all_pages(api_client, reverse("api:clubs"), page_size=2, ordering="updated_at")
+
+    assert ids == [clubs[1].id, clubs[2].id, clubs[0].id]
+
+
+def test_get_competitions_paginated_prefetches_only_the_page(api_client):
+    competitions = [create_complete_competition()["competition"] for _ in range(3)]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("api:competitions"), {"page_size": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["results"]] == [competitions[-1].id]
+    prefetches = [
+        query["sql"]
+        for query in queries
+        if '"tournaments_tournament"."competition_id" IN' in query["sql"]
+    ]
+    assert len(prefetches) == 1
+    assert f"IN ({competitions[-1].id})" in prefetches[0]
+
+
+def test_get_list_with_invalid_ordering(api_client):
+    response = api_client.get(reverse("api:seasons"), {"page_size": 10, "ordering": "name"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "ordering" in response.json()
+
+
+@override_settings(API_UNPAGINATED_LISTS=False)
+def test_get_list_paginated_by_default(api_client, season):
+    response = api_client.get(reverse("api:seasons"))
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert [item["id"] for item in data["results"]] == [season.id]
+    assert data["next"] is None
+
+
+def _read_rosters(api_client, api_token, season, **params):
+    response = api_client.get(
+        reverse("api:season-rosters", kwargs={"pk": season.pk}),
+        params,
+        HTTP_AUTHORIZATION=f"Token {api_token.key}",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"] == "application/x-ndjson"
+    return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+
+def test_get_season_rosters(api_client, api_token, monkeypatch):
+    monkeypatch.setattr("api.views.STREAM_CHUNK_SIZE", 1)
+    objects = create_complete_competition()
+    team_at_tournament = objects["team_at_tournament"]
+    entries = [
+        MemberAtTournamentFactory(
+            tournament=team_at_tournament.tournament,
+            team_at_tournament=team_at_tournament,
+            jersey_number=jersey_number,
+        )
+        for jersey_number in (7, 12)
+    ]
+    other_season = create_complete_competition(season=SeasonFactory(name="2024"))
+    MemberAtTournamentFactory(
+        tournament=other_season["tournament"],
+        team_at_tournament=other_season["team_at_tournament"],
+    )
+
+    lines = _read_rosters(api_client, api_token, objects["competition"].season)
+
+    member = entries[0].member
+    assert lines[0] == {
+        "id": entries[0].id,
+        "tournament": {"id": objects["tournament"].id, "name": objects["tournament"].name},
+        "team": {
+            "id": team_at_tournament.id,
+            "team_id": objects["application"].team_id,
+            "club_id": objects["application"].team.club_id,
+            "name": objects["application"].team_name,
+        },
+        "member": {
+            "id": member.id,
+            "full_name": member.full_name,
+            "birth_year": member.birth_date.year,
+            "sex": member.sex,
+        },
+        "jersey_number": 7,
+        "is_captain": False,
+        "is_spirit_captain": False,
+        "is_coach": False,
+    }
+    assert [line["id"] for line in lines] == [entry.id for entry in entries]
+
+    # Resumed after the last line read
+    lines = _read_rosters(api_client, api_token, objects["competition"].season, after=entries[0].id)
+    assert [line["id"] for line in lines] == [entries[1].id]
+
+
+def test_get_season_rosters_under_asgi(api_token, monkeypatch):
+    monkeypatch.setattr("api.views.STREAM_CHUNK_SIZE", 2)
+    objects = create_complete_competition()
+    team_at_tournament = objects["team_at_tournament"]
+    entries = MemberAtTournamentFactory.create_batch(
+        3, tournament=team_at_tournament.tournament, team_at_tournament=team_at_tournament
+    )
+    request = AsyncRequestFactory().get(
+        reverse("api:season-rosters", kwargs={"pk": objects["competition"].season.pk}),
+        headers={"authorization": f"Token {api_token.key}"},
+    )
+
+    response = SeasonRostersView.as_view()(request, pk=objects["competition"].season.pk)
+
+    # An async iterator, so the chunks are read as they are sent, not all up front
+    assert response.status_code == status.HTTP_200_OK
+    assert response.is_async
+
+    @async_to_sync
+    async def read():
+        return [json.loads(line) async for line in response.streaming_content]
+
+    assert [line["id"] for line in read()] == [entry.id for entry in entries]
+
+
+def test_get_season_rosters_errors(api_client, api_token):
+    season = SeasonFactory()
+    url = reverse("api:season-rosters", kwargs={"pk": season.pk})
+
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Token {api_token.key}")
+    response = api_client.get(url, {"after": "x"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert json.loads(response.content) == {"after": "A roster entry id is required."}
+    assert api_client.get(url.replace(str(season.pk), "0")).status_code == 404
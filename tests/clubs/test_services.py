@@ -1,7 +1,9 @@
 from unittest.mock import patch
 
+import pytest
 from clubs.models import ClubNotification
-from clubs.services import notify_club
+from clubs.services import notify_club, send_notification_digests
+from users.models import Agent, NotificationDeliveryEnum
 
 from tests.factories import AgentAtClubFactory, AgentFactory, ClubFactory
 
@@ -65,3 +67,69 @@ class TestNotifyClub:
 
         assert ClubNotification.objects.count() == 0
         mock_send_email.assert_not_called()
+
+
+class TestNotificationDigests:
+    @patch("clubs.services.send_email")
+    def test_digest_agent_gets_no_immediate_email(self, mock_send_email):
+        club = ClubFactory()
+        agent = AgentFactory(notification_delivery=NotificationDeliveryEnum.HOURLY_DIGEST)
+        AgentAtClubFactory(agent=agent, club=club, is_active=True)
+
+        notify_club(club, "Test Subject", "Test Message")
+
+        mock_send_email.assert_not_called()
+        assert ClubNotification.objects.get().is_digest_pending
+
+    @patch("clubs.services.send_email")
+    def test_sends_one_digest_per_agent(self, mock_send_email):
+        club = ClubFactory()
+        other_club = ClubFactory()
+        agent = AgentFactory(notification_delivery=NotificationDeliveryEnum.HOURLY_DIGEST)
+        AgentAtClubFactory(agent=agent, club=club, is_active=True)
+        AgentAtClubFactory(agent=agent, club=other_club, is_active=True)
+
+        notify_club(club, "First Subject", "First Message")
+        notify_club(club, "Second Subject", "Second Message")
+        notify_club(other_club, "Third Subject", "Third Message")
+
+        assert send_notification_digests(NotificationDeliveryEnum.HOURLY_DIGEST) == 1
+
+        mock_send_email.assert_called_once()
+        subject, body = mock_send_email.call_args[0]
+        assert subject == "Notifications digest (3)"
+        for message in ["First Message", "Second Message", "Third Message"]:
+            assert message in body
+        assert mock_send_email.call_args[1]["to"] == [agent.user.email]
+        assert not ClubNotification.objects.filter(is_digest_pending=True).exists()
+
+    @patch("clubs.services.send_email")
+    def test_digest_only_for_matching_delivery(self, mock_send_email):
+        club = ClubFactory()
+        agent = AgentFactory(notification_delivery=NotificationDeliveryEnum.DAILY_DIGEST)
+        AgentAtClubFactory(agent=agent, club=club, is_active=True)
+
+        notify_club(club, "Test Subject", "Test Message")
+
+        assert send_notification_digests(NotificationDeliveryEnum.HOURLY_DIGEST) == 0
+        mock_send_email.assert_not_called()
+        assert ClubNotification.objects.get().is_digest_pending
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"notification_delivery": NotificationDeliveryEnum.IMMEDIATE},
+            {"has_email_notifications_enabled": False},
+        ],
+    )
+    @patch("clubs.services.send_email")
+    def test_drops_pending_notifications_of_agent_without_digest(self, mock_send_email, changes):
+        club = ClubFactory()
+        agent = AgentFactory(notification_delivery=NotificationDeliveryEnum.DAILY_DIGEST)
+        AgentAtClubFactory(agent=agent, club=club, is_active=True)
+        notify_club(club, "Test Subject", "Test Message")
+        Agent.objects.filter(pk=agent.pk).update(**changes)
+
+        assert send_notification_digests(NotificationDeliveryEnum.HOURLY_DIGEST) == 0
+        mock_send_email.assert_not_called()
+        assert not ClubNotification.objects.get().is_digest_pending
@@ -124,3 +124,42 @@ def with_app_settings(**settings_kwargs):
         return wrapper
 
     return decorator
+
+
+@contextmanager
+def simulate_commit():
+    """Context manager to run on_commit callbacks registered inside it, as a commit would.
+
+    Tests run in a transaction that is never committed. Unlike Django's
+    captureOnCommitCallbacks, executed callbacks are removed, so code checking the
+    pending callbacks sees the same state as after a real commit.
+    """
+    from django.db import connection
+
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback, _ in callbacks:
+        callback()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def redis_server(monkeypatch):
+    """In-memory Redis of the live results and the Sentry tunnel buffer."""
+    import fakeredis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr("tournaments.live.get_redis", lambda: fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(
+        "tournaments.live.get_async_redis", lambda: fakeredis.FakeAsyncRedis(server=server)
+    )
+    monkeypatch.setattr("core.sentry_tunnel.get_redis", lambda: fakeredis.FakeRedis(server=server))
+    return server
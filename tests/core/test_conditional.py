@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from clubs.models import Club, ClubNotification
+from competitions.enums import ApplicationStateEnum
+from competitions.models import Season
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.db import SessionStore
+from django.urls import reverse
+from django.utils import timezone
+from tournaments.models import Tournament
+from tournaments.views import tournament_detail_view
+
+from core.conditional import get_validators
+from tests.factories import (
+    AgentAtClubFactory,
+    ClubFactory,
+    CompetitionApplicationFactory,
+    MemberAtTournamentFactory,
+    TeamAtTournamentFactory,
+    UserFactory,
+)
+
+
+class TestGetValidators:
+    def test_one_query_for_all_querysets(self, django_assert_num_queries):
+        ClubFactory()
+        with django_assert_num_queries(1):
+            validators = get_validators([Club.objects.all(), Season.objects.none()])
+        assert validators.last_modified == Club.objects.get().updated_at
+
+    def test_changed_by_update_insert_and_delete(self):
+        club = ClubFactory()
+        etags = [get_validators([Club.objects.all()]).etag]
+
+        club.save()
+        etags.append(get_validators([Club.objects.all()]).etag)
+        ClubFactory()
+        etags.append(get_validators([Club.objects.all()]).etag)
+        club.delete()
+        etags.append(get_validators([Club.objects.all()]).etag)
+
+        assert len(set(etags)) == 4
+
+    def test_no_querysets(self):
+        assert get_validators([]).last_modified is None
+
+
+class TestApiConditionalGet:
+    def test_not_modified_before_serialization(self, client, django_assert_num_queries):
+        club = ClubFactory()
+        response = client.get(reverse("api:clubs"))
+        assert response.status_code == 200
+        assert response["Cache-Control"] == "public, max-age=30"
+        assert response["Last-Modified"]
+
+        with django_assert_num_queries(1):
+            response = client.get(reverse("api:clubs"), HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+        assert response["Cache-Control"] == "public, max-age=30"
+
+        club.save()
+        response = client.get(reverse("api:clubs"), HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 200
+
+    def test_roster_member_change_modifies_teams_at_tournament(self, client):
+        member_at_tournament = MemberAtTournamentFactory()
+        url = reverse("api:teams-at-tournament")
+        params = {"tournament_id": member_at_tournament.tournament_id}
+        etag = client.get(url, params)["ETag"]
+
+        assert client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        member_at_tournament.member.save()
+        assert client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_applications_approved_in_admin_modify_competitions(self, client, admin_client):
+        application = CompetitionApplicationFactory(state=ApplicationStateEnum.AWAITING_PAYMENT)
+        url = reverse("api:competitions")
+        etag = client.get(url)["ETag"]
+
+        response = admin_client.post(
+            reverse("admin:competitions_competitionapplication_changelist"),
+            {"action": "approve", "_selected_action": [application.pk]},
+        )
+
+        assert response.status_code == 302
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        [competition] = response.json()
+        assert [item["id"] for item in competition["accepted_applications"]] == [application.pk]
+
+    def test_missing_tournament_id_is_not_conditional(self, client):
+        response = client.get(reverse("api:teams-at-tournament"))
+        assert response.status_code == 400
+        assert "ETag" not in response
+
+
+class TestTournamentPagesConditionalGet:
+    def test_detail_depends_on_user(self, client, logged_in_client):
+        team_at_tournament = TeamAtTournamentFactory()
+        url = reverse("tournaments:detail", args=[team_at_tournament.tournament_id])
+        response = client.get(url)
+        assert response["Cache-Control"] == "private, no-cache"
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+        agent_client = logged_in_client(UserFactory(), ClubFactory())
+        assert agent_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 200
+
+    def test_detail_modified_by_notifications_of_agent(self, logged_in_client):
+        team_at_tournament = TeamAtTournamentFactory()
+        url = reverse("tournaments:detail", args=[team_at_tournament.tournament_id])
+        agent_at_club = AgentAtClubFactory()
+        agent_client = logged_in_client(agent_at_club.agent.user, agent_at_club.club)
+        etag = agent_client.get(url)["ETag"]
+
+        assert agent_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        ClubNotification.objects.create(agent_at_club=agent_at_club, subject="S", message="M")
+        response = agent_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.context["new_notifications_count"] == 1
+
+    def test_detail_with_pending_messages_is_not_conditional(self, client, rf):
+        team_at_tournament = TeamAtTournamentFactory()
+        etag = client.get(reverse("tournaments:detail", args=[team_at_tournament.tournament_id]))[
+            "ETag"
+        ]
+        request = rf.get("/", HTTP_IF_NONE_MATCH=etag)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+        messages.info(request, "Saved")
+
+        response = tournament_detail_view(request, team_at_tournament.tournament_id)
+
+        assert response.status_code == 200
+        assert "ETag" not in response
+        assert b"Saved" in response.content
+
+    def test_teams_table_modified_by_results(self, client):
+        team_at_tournament = TeamAtTournamentFactory()
+        url = reverse("tournaments:teams_table", args=[team_at_tournament.tournament_id])
+        etag = client.get(url)["ETag"]
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        team_at_tournament.final_placement = 1
+        team_at_tournament.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_teams_table_modified_by_rosters_and_deadline(self, client, logged_in_client):
+        team_at_tournament = TeamAtTournamentFactory()
+        tournament = team_at_tournament.tournament
+        url = reverse("tournaments:teams_table", args=[tournament.pk])
+        etag = client.get(url)["ETag"]
+
+        MemberAtTournamentFactory(tournament=tournament, team_at_tournament=team_at_tournament)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.context["teams_at_tournament"][0].member_count == 1
+
+        etag = response["ETag"]
+        Tournament.objects.filter(pk=tournament.pk).update(
+            rosters_deadline=timezone.now() - timedelta(minutes=1)
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        # The buttons are green for the club of the team only
+        agent_client = logged_in_client(UserFactory(), team_at_tournament.application.team.club)
+        assert agent_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
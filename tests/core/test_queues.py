@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+from clubs.tasks import send_daily_notification_digests
+from django.core.management import call_command
+from finance.tasks import calculate_season_fees_and_generate_invoices, check_fakturoid_invoices
+from huey import MemoryHuey
+from huey.contrib.djhuey import HUEY
+from members.tasks import generate_nsa_export
+
+from core.queues import (
+    BULK,
+    INTERACTIVE,
+    MAINTENANCE,
+    QUEUES,
+    _connect_signals,
+    get_queue_stats,
+)
+from core.tasks import backup_database, flush_email_outbox, forward_sentry_envelopes
+
+
+def test_interactive_queue_is_the_default_huey():
+    assert QUEUES[INTERACTIVE] is HUEY
+    assert QUEUES[BULK] is not HUEY
+    assert QUEUES[BULK].name == f"{HUEY.name}-bulk"
+
+
+def test_tasks_are_routed_to_their_queue():
+    assert flush_email_outbox.huey is QUEUES[INTERACTIVE]
+    assert generate_nsa_export.huey is QUEUES[BULK]
+    assert calculate_season_fees_and_generate_invoices.huey is QUEUES[BULK]
+    assert check_fakturoid_invoices.huey is QUEUES[MAINTENANCE]
+    assert backup_database.huey is QUEUES[MAINTENANCE]
+    assert forward_sentry_envelopes.huey is QUEUES[MAINTENANCE]
+    assert send_daily_notification_digests.huey is QUEUES[MAINTENANCE]
+
+
+class TestQueueStats:
+    def setup_method(self):
+        self.huey = MemoryHuey("test", immediate=False)
+        _connect_signals("test", self.huey)
+
+        @self.huey.task()
+        def noop():
+            pass
+
+        self.noop = noop
+
+    def test_empty_queue(self):
+        assert get_queue_stats(self.huey) == {"pending": 0, "scheduled": 0, "oldest_age": None}
+
+    def test_oldest_age_is_measured_from_first_enqueued_task(self):
+        with patch("core.queues.time.time", return_value=1000):
+            self.noop()
+        with patch("core.queues.time.time", return_value=1030):
+            self.noop()
+
+        with patch("core.queues.time.time", return_value=1045):
+            stats = get_queue_stats(self.huey)
+
+        assert stats == {"pending": 2, "scheduled": 0, "oldest_age": 45}
+
+    def test_enqueued_at_is_cleared_once_task_executes(self):
+        self.noop()
+        task = self.huey.dequeue()
+        self.huey.execute(task)
+
+        assert self.huey.get(f"enqueued-at:{task.id}", peek=True) is None
+
+
+def test_huey_queues_command_shows_all_queues(capsys):
+    call_command("huey_queues")
+
+    output = capsys.readouterr().out
+    for name in (INTERACTIVE, BULK, MAINTENANCE):
+        assert name in output
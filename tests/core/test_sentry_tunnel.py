@@ -1,31 +1,169 @@
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
+import httpx
+import pytest
+from django.core.management import call_command
 from django.test import Client
 from django.urls import reverse
 
+from core import sentry_tunnel
+from core.sentry_tunnel import BUFFER_KEY, forward_envelopes, get_stats
+from core.tasks import retry_sentry_forwarding
+
 SENTRY_DSN = "https://key@o123.ingest.us.sentry.io/456"
 
 
+@pytest.fixture(autouse=True)
+def sentry_dsn(settings):
+    settings.SENTRY_DSN = SENTRY_DSN
+
+
+@pytest.fixture
+def sentry_requests(monkeypatch):
+    """Requests sent to Sentry, answered by the statuses in ``sentry_requests.statuses``."""
+
+    class SentryRequests(list):
+        statuses: list[int] = []
+
+        def handle(self, request: httpx.Request) -> httpx.Response:
+            self.append(request)
+            return httpx.Response(self.statuses.pop(0) if self.statuses else 200)
+
+    requests = SentryRequests()
+    monkeypatch.setattr(
+        "core.sentry_tunnel.get_http_client",
+        lambda: httpx.Client(transport=httpx.MockTransport(requests.handle)),
+    )
+    return requests
+
+
+def make_envelope(message: str = "test", dsn: str = SENTRY_DSN) -> bytes:
+    return (
+        json.dumps({"dsn": dsn}).encode()
+        + b"\n"
+        + b'{"type":"event"}\n'
+        + json.dumps({"message": message}).encode()
+    )
+
+
+def post_envelope(client: Client, envelope: bytes):
+    return client.post(
+        reverse("api:sentry_tunnel"), data=envelope, content_type="application/octet-stream"
+    )
+
+
+def buffered() -> list[bytes]:
+    return sentry_tunnel.get_redis().lrange(BUFFER_KEY, 0, -1)
+
+
 class TestSentryTunnelView:
-    @patch("core.views.requests.post")
-    def test_forwards_envelope_to_sentry(self, mock_post: MagicMock, client: Client, settings):
-        settings.SENTRY_DSN = SENTRY_DSN
-        mock_post.return_value = MagicMock(status_code=200)
-
-        envelope = (
-            json.dumps({"dsn": SENTRY_DSN}).encode()
-            + b"\n"
-            + b'{"type":"event"}\n{"message":"test"}'
-        )
-        response = client.post(
-            reverse("api:sentry_tunnel"), data=envelope, content_type="application/octet-stream"
-        )
-
-        assert response.status_code == 200
-        mock_post.assert_called_once_with(
-            "https://o123.ingest.us.sentry.io/api/456/envelope/",
-            data=envelope,
-            headers={"Content-Type": "application/x-sentry-envelope"},
-            timeout=5,
-        )
+    def test_buffers_envelope_and_schedules_forwarding(self, client: Client):
+        envelope = make_envelope()
+
+        with patch("core.views.schedule_sentry_forwarding") as schedule:
+            response = post_envelope(client, envelope)
+            post_envelope(client, make_envelope("second"))
+
+        assert response.status_code == 202
+        assert buffered() == [envelope, make_envelope("second")]
+        # Only the envelope reaching an empty buffer schedules a run
+        schedule.assert_called_once_with()
+
+    def test_rejects_foreign_dsn(self, client: Client):
+        response = post_envelope(client, make_envelope(dsn="https://key@o1.ingest.sentry.io/1"))
+
+        assert response.status_code == 403
+        assert buffered() == []
+
+    def test_rejects_too_large_envelope(self, client: Client):
+        response = post_envelope(client, make_envelope("x" * sentry_tunnel.MAX_ENVELOPE_SIZE))
+
+        assert response.status_code == 413
+        assert buffered() == []
+
+    def test_drops_envelope_when_buffer_is_full(self, client: Client):
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, *[b"envelope"] * sentry_tunnel.BUFFER_SIZE)
+
+        response = post_envelope(client, make_envelope())
+
+        assert response.status_code == 429
+        assert response["Retry-After"] == "60"
+        assert len(buffered()) == sentry_tunnel.BUFFER_SIZE
+        assert get_stats()["dropped_full"] == 1
+
+    def test_samples_envelopes_above_threshold(self, client: Client):
+        # Three quarters full, every other envelope is kept
+        length = (sentry_tunnel.SAMPLE_FROM + sentry_tunnel.BUFFER_SIZE) // 2
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, *[b"envelope"] * length)
+
+        with patch("core.sentry_tunnel.random.random", side_effect=[0.4, 0.6]):
+            kept = post_envelope(client, make_envelope("kept"))
+            dropped = post_envelope(client, make_envelope("dropped"))
+
+        assert kept.status_code == 202
+        assert dropped.status_code == 429
+        assert buffered()[-1] == make_envelope("kept")
+        assert get_stats()["dropped_sampled"] == 1
+
+
+class TestForwardEnvelopes:
+    def test_forwards_buffered_envelopes_in_order(self, sentry_requests):
+        envelopes = [make_envelope(str(i)) for i in range(sentry_tunnel.FORWARD_BATCH_SIZE + 1)]
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, *envelopes)
+
+        outcomes = forward_envelopes()
+
+        assert outcomes == {"forwarded": len(envelopes)}
+        assert [request.content for request in sentry_requests] == envelopes
+        request = sentry_requests[0]
+        assert str(request.url) == "https://o123.ingest.us.sentry.io/api/456/envelope/"
+        assert request.headers["Content-Type"] == "application/x-sentry-envelope"
+        assert buffered() == []
+        assert get_stats() == {"buffered": 0, "forwarded": len(envelopes)}
+
+    def test_drops_rejected_envelope(self, sentry_requests):
+        sentry_requests.statuses = [400]
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, make_envelope("bad"), make_envelope("ok"))
+
+        assert forward_envelopes() == {"dropped_rejected": 1, "forwarded": 1}
+        assert buffered() == []
+
+    def test_stops_on_rate_limit(self, sentry_requests):
+        sentry_requests.statuses = [200, 429]
+        envelopes = [make_envelope(str(i)) for i in range(3)]
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, *envelopes)
+
+        assert forward_envelopes() == {"forwarded": 1, "dropped_rate_limited": 1}
+        assert buffered() == envelopes[2:]
+
+    def test_keeps_envelopes_when_sentry_fails(self, sentry_requests):
+        sentry_requests.statuses = [200, 503]
+        envelopes = [make_envelope(str(i)) for i in range(3)]
+        sentry_tunnel.get_redis().rpush(BUFFER_KEY, *envelopes)
+
+        assert forward_envelopes() == {"forwarded": 1}
+        assert buffered() == envelopes[1:]
+        assert len(sentry_requests) == 2
+
+
+def test_command_shows_counters(sentry_requests, capsys):
+    sentry_tunnel.get_redis().rpush(BUFFER_KEY, make_envelope())
+    forward_envelopes()
+
+    call_command("sentry_tunnel")
+
+    output = capsys.readouterr().out
+    assert "buffered                     0 / 200" in output
+    assert "forwarded                    1" in output
+
+
+def test_periodic_task_forwards_left_envelopes(sentry_requests):
+    retry_sentry_forwarding.call_local()
+    assert sentry_requests == []
+
+    sentry_tunnel.get_redis().rpush(BUFFER_KEY, make_envelope())
+    retry_sentry_forwarding.call_local()
+
+    assert len(sentry_requests) == 1
+    assert buffered() == []
@@ -0,0 +1,62 @@
+import pickle
+from unittest.mock import patch
+
+import pytest
+from finance.tasks import calculate_season_fees_for_check
+from members.models import Member
+from members.tasks import generate_nsa_export
+
+from core.task_args import ModelRef, resolve_model_refs
+
+
+def test_model_instances_are_enqueued_as_references(user, season, club):
+    task = generate_nsa_export.s(user, season, club)
+
+    assert task.args == (
+        ModelRef("auth.user", user.pk),
+        ModelRef("competitions.season", season.pk),
+        ModelRef("clubs.club", club.pk),
+    )
+
+
+def test_payload_is_smaller_than_pickled_instances(user, season, club):
+    task = generate_nsa_export.s(user, season, club)
+
+    payload = generate_nsa_export.huey.serialize_task(task)
+
+    assert len(payload) < 400
+    assert len(payload) < len(pickle.dumps((user, season, club)))
+
+
+def test_instances_are_fetched_again_in_the_worker(user, season):
+    huey = calculate_season_fees_for_check.huey
+    payload = huey.serialize_task(calculate_season_fees_for_check.s(user, season))
+    season.name = "2099"
+    season.save()
+
+    with patch("finance.tasks.send_email") as send_email_mock:
+        huey.execute(huey.deserialize_task(payload))
+
+    assert "season 2099" in send_email_mock.call_args.args[1]
+
+
+def test_unsaved_instance_is_rejected(user, season):
+    with pytest.raises(ValueError):
+        calculate_season_fees_for_check.s(user, season.__class__(name="unsaved"))
+
+
+def test_select_related_hint(django_assert_num_queries, member):
+    fn = resolve_model_refs(lambda member: member.club.name, {"member": ["club"]})
+
+    with django_assert_num_queries(1):
+        assert fn(ModelRef("members.member", member.pk)) == member.club.name
+
+
+def test_other_arguments_are_passed_unchanged(member):
+    fn = resolve_model_refs(lambda member, count, *, flag=False: (member, count, flag))
+
+    assert fn(ModelRef("members.member", member.pk), 3, flag=True) == (
+        Member.objects.get(pk=member.pk),
+        3,
+        True,
+    )
@@ -1,56 +1,125 @@
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
-from core.tasks import send_email
+from django.utils import timezone
+
+from core.models import OutgoingEmail
+from core.tasks import EMAIL_MAX_ATTEMPTS, flush_email_outbox, send_email
 
 
 class TestSendEmail:
-    @patch("core.tasks.EmailMessage")
     @patch("core.tasks.ENVIRONMENT", "prod")
-    def test_sends_email_in_prod(self, mock_email_class):
-        mock_email_instance = MagicMock()
-        mock_email_class.return_value = mock_email_instance
+    def test_queues_email_in_prod(self):
+        send_email("Subject", "<p>Body</p>", ["test@example.com"], csv_data="a,b\n1,2")
+
+        outgoing_email = OutgoingEmail.objects.get()
+        assert outgoing_email.subject == "Subject"
+        assert outgoing_email.body == "<p>Body</p>"
+        assert outgoing_email.to == ["test@example.com"]
+        assert outgoing_email.csv_data == "a,b\n1,2"
+        assert outgoing_email.sent_at is None
+
+    @patch("core.tasks.ENVIRONMENT", "dev")
+    def test_does_not_queue_in_non_prod(self):
+        send_email("Subject", "Body", ["test@example.com"])
+
+        assert not OutgoingEmail.objects.exists()
+
+
+@patch("core.tasks.get_connection")
+class TestFlushEmailOutbox:
+    def _connection(self, mock_get_connection):
+        return mock_get_connection.return_value.__enter__.return_value
+
+    def test_sends_batch_over_single_connection(self, mock_get_connection):
+        for i in range(3):
+            OutgoingEmail.objects.create(subject=f"S{i}", body="Body", to=[f"{i}@example.com"])
+
+        flush_email_outbox()
+
+        mock_get_connection.assert_called_once()
+        assert self._connection(mock_get_connection).send_messages.call_count == 3
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_claims_batch_before_sending(self, mock_get_connection):
+        outgoing_email = OutgoingEmail.objects.create(
+            subject="Subject", body="Body", to=["test@example.com"]
+        )
+
+        def send_messages(messages):
+            # A concurrent flush finds nothing due while the batch is being sent
+            assert not OutgoingEmail.objects.filter(next_attempt_at__lte=timezone.now()).exists()
+            return 1
+
+        self._connection(mock_get_connection).send_messages.side_effect = send_messages
+        flush_email_outbox()
 
-        send_email("Subject", "<p>Body</p>", ["test@example.com"])
+        outgoing_email.refresh_from_db()
+        assert outgoing_email.sent_at is not None
+
+    def test_builds_html_message_with_csv_attachment(self, mock_get_connection):
+        OutgoingEmail.objects.create(
+            subject="Subject", body="Body", to=["test@example.com"], csv_data="a,b\n1,2"
+        )
+
+        with patch("core.tasks.EmailMessage") as mock_email_class:
+            mock_email_instance = MagicMock()
+            mock_email_class.return_value = mock_email_instance
+            flush_email_outbox()
 
         mock_email_class.assert_called_once_with(
-            subject="Subject", body="<p>Body</p>", to=["test@example.com"]
+            subject="Subject", body="Body", to=["test@example.com"]
         )
         assert mock_email_instance.content_subtype == "html"
-        mock_email_instance.send.assert_called_once()
+        mock_email_instance.attach.assert_called_once_with("data.csv", "a,b\n1,2", "text/csv")
 
-    @patch("core.tasks.EmailMessage")
-    @patch("core.tasks.ENVIRONMENT", "dev")
-    def test_does_not_send_in_non_prod(self, mock_email_class):
-        send_email("Subject", "Body", ["test@example.com"])
+    def test_skips_emails_not_due_yet(self, mock_get_connection):
+        OutgoingEmail.objects.create(
+            subject="Subject",
+            body="Body",
+            to=["test@example.com"],
+            next_attempt_at=timezone.now() + timedelta(minutes=1),
+        )
 
-        mock_email_class.assert_not_called()
+        flush_email_outbox()
 
-    @patch("core.tasks.EmailMessage")
-    @patch("core.tasks.ENVIRONMENT", "prod")
-    def test_attaches_csv_when_provided(self, mock_email_class):
-        mock_email_instance = MagicMock()
-        mock_email_class.return_value = mock_email_instance
+        self._connection(mock_get_connection).send_messages.assert_not_called()
 
-        send_email("Subject", "Body", ["test@example.com"], csv_data="a,b\n1,2")
+    def test_failed_email_is_retried_later_without_blocking_batch(self, mock_get_connection):
+        failing = OutgoingEmail.objects.create(subject="S1", body="Body", to=["bad@example.com"])
+        passing = OutgoingEmail.objects.create(subject="S2", body="Body", to=["ok@example.com"])
+        self._connection(mock_get_connection).send_messages.side_effect = [
+            Exception("SMTP error"),
+            1,
+        ]
 
-        mock_email_instance.attach.assert_called_once_with("data.csv", "a,b\n1,2", "text/csv")
+        flush_email_outbox()
 
-    @patch("core.tasks.EmailMessage")
-    @patch("core.tasks.ENVIRONMENT", "prod")
-    def test_no_csv_attachment_when_none(self, mock_email_class):
-        mock_email_instance = MagicMock()
-        mock_email_class.return_value = mock_email_instance
+        failing.refresh_from_db()
+        passing.refresh_from_db()
+        assert failing.attempts == 1
+        assert failing.sent_at is None
+        assert failing.failed_at is None
+        assert failing.next_attempt_at > timezone.now()
+        assert passing.sent_at is not None
 
-        send_email("Subject", "Body", ["test@example.com"], csv_data=None)
+    def test_email_fails_after_all_retries(self, mock_get_connection):
+        outgoing_email = OutgoingEmail.objects.create(
+            subject="Subject", body="Body", to=["bad@example.com"], attempts=EMAIL_MAX_ATTEMPTS - 1
+        )
+        self._connection(mock_get_connection).send_messages.side_effect = Exception("SMTP error")
 
-        mock_email_instance.attach.assert_not_called()
+        flush_email_outbox()
 
-    @patch("core.tasks.EmailMessage")
-    @patch("core.tasks.ENVIRONMENT", "prod")
-    def test_sets_html_content_subtype(self, mock_email_class):
-        mock_email_instance = MagicMock()
-        mock_email_class.return_value = mock_email_instance
+        outgoing_email.refresh_from_db()
+        assert outgoing_email.attempts == EMAIL_MAX_ATTEMPTS
+        assert outgoing_email.failed_at is not None
 
-        send_email("Subject", "Body", ["test@example.com"])
+    def test_connection_failure_counts_attempt_for_whole_batch(self, mock_get_connection):
+        for i in range(2):
+            OutgoingEmail.objects.create(subject=f"S{i}", body="Body", to=[f"{i}@example.com"])
+        mock_get_connection.return_value.__enter__.side_effect = Exception("Connection refused")
 
-        assert mock_email_instance.content_subtype == "html"
+        flush_email_outbox()
+
+        assert list(OutgoingEmail.objects.values_list("attempts", flat=True)) == [1, 1]
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from huey import MemoryHuey
+
+from core.models import TaskRun, TaskRunStateEnum
+from core.queues import _connect_signals
+
+
+class TestTaskRunTelemetry:
+    def setup_method(self):
+        self.huey = MemoryHuey("test", immediate=False)
+        _connect_signals("bulk", self.huey)
+
+        @self.huey.task()
+        def noop():
+            pass
+
+        @self.huey.task(retries=1)
+        def fail():
+            raise RuntimeError("boom")
+
+        self.noop = noop
+        self.fail = fail
+
+    def run_next(self):
+        self.huey.execute(self.huey.dequeue())
+
+    def test_completed_run_is_recorded_with_queue_wait(self):
+        with patch("core.queues.time.time", return_value=1000):
+            self.noop()
+        with patch("core.queues.time.time", return_value=1012):
+            self.run_next()
+
+        run = TaskRun.objects.get()
+        assert run.name.endswith("test_telemetry.noop")
+        assert run.queue == "bulk"
+        assert run.state == TaskRunStateEnum.COMPLETE
+        assert run.queue_wait == 12
+        assert run.duration >= 0
+        assert run.error == ""
+
+    def test_failed_run_is_recorded_as_retrying_until_retries_are_exhausted(self):
+        self.fail()
+        self.run_next()
+        self.run_next()
+
+        runs = TaskRun.objects.order_by("id")
+        assert [run.state for run in runs] == [
+            TaskRunStateEnum.RETRYING,
+            TaskRunStateEnum.FAILED,
+        ]
+        assert [run.retries_left for run in runs] == [1, 0]
+        assert runs[0].error == "RuntimeError('boom')"
+
+    @patch("core.telemetry.TASK_RUN_HISTORY", 2)
+    def test_only_last_runs_are_kept_per_task(self):
+        for _ in range(3):
+            self.noop()
+            self.run_next()
+        self.huey.enqueue(self.fail.s(retries=0))
+        self.run_next()
+
+        noop_runs = TaskRun.objects.filter(name__endswith=".noop")
+        assert noop_runs.count() == 2
+        assert TaskRun.objects.filter(name__endswith=".fail").count() == 1
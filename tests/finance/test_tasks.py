@@ -1,9 +1,11 @@
 from datetime import timedelta
 from decimal import Decimal
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 from competitions.models import ApplicationStateEnum, CompetitionFeeTypeEnum
+from core.models import TaskRun, TaskRunStateEnum
+from core.queues import MAINTENANCE, lock_task
 from django.utils import timezone
 from finance.models import Invoice, InvoiceStateEnum, InvoiceTypeEnum
 from finance.services import create_invoice
@@ -52,6 +54,98 @@ def test_command_resend_invoices_to_fakturoid_should_not_resend_invoices_younger
     assert invoice.fakturoid_status == ""
 
 
+class TestResendInvoicesCheckpoint:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.huey = resend_invoices_to_fakturoid.huey
+        self.checkpoint_key = "checkpoint:resend_invoices_to_fakturoid"
+        self.invoices = InvoiceFactory.create_batch(3)
+        Invoice.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+        yield
+        self.huey.get(self.checkpoint_key)
+
+    @patch("finance.tasks.create_invoice_in_fakturoid_and_save_data")
+    def test_run_resumes_after_checkpoint(self, mock_create):
+        self.huey.put(self.checkpoint_key, self.invoices[0].id)
+
+        resend_invoices_to_fakturoid()
+
+        assert [call.args[0] for call in mock_create.call_args_list] == self.invoices[1:]
+        assert self.huey.get(self.checkpoint_key, peek=True) is None
+
+    @patch("finance.tasks.create_invoice_in_fakturoid_and_save_data")
+    def test_timed_out_run_keeps_checkpoint(self, mock_create):
+        with patch(
+            "huey.api.Task.is_timed_out", new_callable=PropertyMock, side_effect=[False, True]
+        ):
+            resend_invoices_to_fakturoid()
+
+        assert [call.args[0] for call in mock_create.call_args_list] == self.invoices[:1]
+        assert self.huey.get(self.checkpoint_key, peek=True) == self.invoices[0].id
+
+    @patch("finance.tasks.create_invoice_in_fakturoid_and_save_data")
+    def test_run_is_skipped_while_previous_run_holds_lock(self, mock_create):
+        with lock_task(MAINTENANCE, "resend-invoices-to-fakturoid"):
+            resend_invoices_to_fakturoid()
+
+        mock_create.assert_not_called()
+        assert TaskRun.objects.get().state == TaskRunStateEnum.LOCKED
+
+
+class TestResendInvoicesBackoff:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.invoice = InvoiceFactory(club__fakturoid_subject_id=None)
+        Invoice.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+    def test_failed_attempt_is_postponed_exponentially(self):
+        resend_invoices_to_fakturoid()
+        self.invoice.refresh_from_db()
+        assert self.invoice.attempt_count == 1
+        first_delay = self.invoice.next_attempt_at - timezone.now()
+
+        Invoice.objects.update(next_attempt_at=timezone.now())
+        resend_invoices_to_fakturoid()
+        self.invoice.refresh_from_db()
+        assert self.invoice.attempt_count == 2
+        second_delay = self.invoice.next_attempt_at - timezone.now()
+
+        assert timedelta(minutes=14) < first_delay <= timedelta(minutes=15)
+        assert timedelta(minutes=29) < second_delay <= timedelta(minutes=30)
+        assert self.invoice.state == InvoiceStateEnum.DRAFT
+
+    @patch("finance.tasks.create_invoice_in_fakturoid_and_save_data")
+    def test_invoice_not_due_is_skipped(self, mock_create):
+        Invoice.objects.update(next_attempt_at=timezone.now() + timedelta(minutes=1))
+
+        resend_invoices_to_fakturoid()
+
+        mock_create.assert_not_called()
+
+    def test_delay_is_capped(self):
+        Invoice.objects.update(attempt_count=8)
+
+        resend_invoices_to_fakturoid()
+
+        self.invoice.refresh_from_db()
+        assert (
+            timedelta(hours=23)
+            < self.invoice.next_attempt_at - timezone.now()
+            <= timedelta(hours=24)
+        )
+
+    def test_invoice_is_dead_lettered_after_max_attempts(self):
+        Invoice.objects.update(attempt_count=9)
+
+        with patch("finance.tasks.sentry_sdk.capture_message") as mock_capture:
+            resend_invoices_to_fakturoid()
+
+        self.invoice.refresh_from_db()
+        assert self.invoice.state == InvoiceStateEnum.FAILED
+        assert self.invoice.attempt_count == 10
+        mock_capture.assert_called_once()
+
+
 @pytest.mark.parametrize(
     "status,expected_invoice_state,expected_application_state",
     [
@@ -578,8 +672,8 @@ def test_calculate_season_fees_dry_run_does_not_create_invoices_or_notifications
     assert season.name in email_body
     assert "<li>Club With Fakturoid (ID:" in email_body
     assert "<li>Club Two (ID:" in email_body
-    assert "100 CZK" in email_body  # Club 1 amount
-    assert "50 CZK" in email_body  # Club 2 amount
+    assert "100.00 CZK" in email_body  # Club 1 amount
+    assert "50.00 CZK" in email_body  # Club 2 amount
 
 
 @patch("finance.tasks.send_email")
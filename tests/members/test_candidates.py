@@ -0,0 +1,94 @@
+from contextlib import suppress
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from members.candidates import get_roster_candidates
+from members.models import MemberSexEnum
+from tournaments.models import MemberAtTournament
+
+from tests.conftest import simulate_commit
+from tests.factories import (
+    ClubFactory,
+    MemberAtTournamentFactory,
+    MemberFactory,
+    TeamAtTournamentFactory,
+    UserFactory,
+)
+
+
+def _candidate_ids(tournament, club):
+    return [candidate["id"] for candidate in get_roster_candidates(tournament, club.id)]
+
+
+class TestRosterCandidates:
+    def test_search_answers_from_cache(self, logged_in_client, django_assert_num_queries):
+        club = ClubFactory()
+        tat = TeamAtTournamentFactory(application__team__club=club)
+        members = MemberFactory.create_batch(3, club=club, sex=MemberSexEnum.FEMALE)
+        client = logged_in_client(UserFactory(), club)
+
+        response = client.get(reverse("tournaments:roster_dialog_add_form", args=[tat.id]))
+        assert response.status_code == 200
+
+        # Session, user (for the middleware and for the async login check) and tournament
+        # only, the candidates come from the cache
+        with django_assert_num_queries(4):
+            response = client.get(
+                reverse("members:search"), data={"q": "", "tournament_id": tat.tournament_id}
+            )
+        assert [result["id"] for result in response.json()["results"]] == [
+            member.id for member in members
+        ]
+
+    def test_updated_when_members_join_and_leave_rosters(self):
+        club = ClubFactory()
+        tat = TeamAtTournamentFactory(application__team__club=club)
+        members = MemberFactory.create_batch(3, club=club, sex=MemberSexEnum.FEMALE)
+        assert _candidate_ids(tat.tournament, club) == [member.id for member in members]
+
+        with simulate_commit():
+            member_at_tournament = MemberAtTournamentFactory(
+                tournament=tat.tournament, team_at_tournament=tat, member=members[1]
+            )
+        assert _candidate_ids(tat.tournament, club) == [members[0].id, members[2].id]
+
+        with simulate_commit():
+            member_at_tournament.delete()
+        assert _candidate_ids(tat.tournament, club) == [member.id for member in members]
+
+    def test_updated_by_bulk_add(self, logged_in_client):
+        club = ClubFactory()
+        tat = TeamAtTournamentFactory(application__team__club=club)
+        members = MemberFactory.create_batch(
+            3,
+            club=club,
+            sex=MemberSexEnum.FEMALE,
+            citizenship="CZ",
+            email_confirmed_at=timezone.now(),
+        )
+        assert len(_candidate_ids(tat.tournament, club)) == 3
+        client = logged_in_client(UserFactory(), club)
+
+        with simulate_commit():
+            client.post(
+                reverse("tournaments:roster_dialog_bulk_add_form", args=[tat.id]),
+                data={"member_ids": f"{members[0].id},{members[2].id}"},
+            )
+
+        assert MemberAtTournament.objects.filter(team_at_tournament=tat).count() == 2
+        assert _candidate_ids(tat.tournament, club) == [members[1].id]
+
+    def test_kept_when_roster_change_rolls_back(self):
+        club = ClubFactory()
+        tat = TeamAtTournamentFactory(application__team__club=club)
+        members = MemberFactory.create_batch(2, club=club, sex=MemberSexEnum.FEMALE)
+        assert _candidate_ids(tat.tournament, club) == [member.id for member in members]
+
+        with simulate_commit(), suppress(RuntimeError), transaction.atomic():
+            MemberAtTournamentFactory(
+                tournament=tat.tournament, team_at_tournament=tat, member=members[0]
+            )
+            raise RuntimeError
+
+        assert _candidate_ids(tat.tournament, club) == [member.id for member in members]
@@ -481,3 +481,80 @@ def test_nsa_export_activity_columns_non_coach(mock_send_email):
     assert data_row[trenerem_od_idx] == ""
     assert data_row[trener_cinnost_od_idx] == ""
     assert data_row[trener_cinnost_do_idx] == ""
+
+
+@patch("members.tasks.send_email")
+def test_nsa_export_is_split_into_club_shards(mock_send_email):
+    """Test that each club is exported as its own shard and merged into a single file"""
+    from members.models import NsaExport, NsaExportShardStateEnum
+
+    season = SeasonFactory()
+    user = UserFactory()
+
+    regular_competition = create_complete_competition(
+        season=season,
+        fee_type=CompetitionFeeTypeEnum.REGULAR,
+    )
+    members = [
+        MemberAtTournamentFactory(
+            tournament=regular_competition["tournament"],
+            team_at_tournament=regular_competition["team_at_tournament"],
+        ).member
+        for _ in range(2)
+    ]
+    assert members[0].club_id != members[1].club_id
+
+    generate_nsa_export(user, season, None)
+
+    mock_send_email.assert_called_once()
+    csv_data = mock_send_email.call_args[1]["csv_data"]
+    for member in members:
+        assert member.last_name in csv_data
+
+    export = NsaExport.objects.get()
+    shards = list(export.shards.order_by("club_id"))
+    assert [shard.club_id for shard in shards] == sorted(m.club_id for m in members)
+    assert all(shard.state == NsaExportShardStateEnum.DONE for shard in shards)
+    assert all(shard.rows == [] for shard in shards)
+    assert export.sent_at is not None
+
+
+@patch("members.tasks.send_email")
+def test_nsa_export_retried_shard_does_not_restart_export(mock_send_email):
+    """Test that re-running a pending shard only builds that club and then merges the export"""
+    from members.models import NsaExport, NsaExportShard, NsaExportShardStateEnum
+    from members.tasks import generate_nsa_export_shard
+
+    season = SeasonFactory()
+    user = UserFactory()
+
+    regular_competition = create_complete_competition(
+        season=season,
+        fee_type=CompetitionFeeTypeEnum.REGULAR,
+    )
+    done_member, pending_member = (
+        MemberAtTournamentFactory(
+            tournament=regular_competition["tournament"],
+            team_at_tournament=regular_competition["team_at_tournament"],
+        ).member
+        for _ in range(2)
+    )
+
+    export = NsaExport.objects.create(requested_by=user, season=season)
+    NsaExportShard.objects.create(
+        export=export,
+        club=done_member.club,
+        state=NsaExportShardStateEnum.DONE,
+        rows=[["Already", "Exported"]],
+    )
+    NsaExportShard.objects.create(export=export, club=pending_member.club)
+
+    with patch(
+        "members.tasks._build_nsa_export_rows", return_value=[["Freshly", "Exported"]]
+    ) as mock_build_rows:
+        generate_nsa_export_shard(export.id, pending_member.club_id)
+
+    mock_build_rows.assert_called_once_with(season, pending_member.club_id)
+    csv_data = mock_send_email.call_args[1]["csv_data"]
+    assert "Already,Exported" in csv_data
+    assert "Freshly,Exported" in csv_data
@@ -1,5 +1,3 @@
-from unittest.mock import patch
-
 import pytest
 from members.models import MemberSexEnum
 from members.services import search
@@ -9,6 +7,7 @@ from tests.factories import (
     ClubFactory,
     CompetitionFactory,
     DivisionFactory,
+    MemberAtTournamentFactory,
     MemberFactory,
     TournamentFactory,
 )
@@ -92,13 +91,9 @@ def test_search_does_not_return_players_already_in_tournament(prepared_members):
         )
     )
 
-    with patch(
-        "members.services._get_already_assigned_members_ids",
-        return_value=[
-            members[1].id,
-        ],
-    ):
-        result = search("", club, tournament)
+    MemberAtTournamentFactory(tournament=tournament, member=members[1])
+
+    result = search("", club, tournament)
 
     assert len(result) == 1
     assert set(result) == {members[2]}
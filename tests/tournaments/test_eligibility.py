@@ -0,0 +1,103 @@
+import pytest
+from django.utils import timezone
+from members.models import Member, MemberSexEnum
+from tournaments.eligibility import TournamentRosterEligibility, Verdict
+
+from tests.conftest import override_app_settings
+from tests.factories import AgeLimitFactory
+
+
+@pytest.fixture
+def team_at_tournament(team_at_tournament_factory):
+    return team_at_tournament_factory(
+        tournament__competition__division__is_male_allowed=False,
+        tournament__competition__age_limit=AgeLimitFactory(name="U20", f_min=15, f_max=19),
+    )
+
+
+def _years_ago(years):
+    return timezone.now().date() - timezone.timedelta(days=365 * years + 100)
+
+
+def _member(member_factory, team_at_tournament, **kwargs):
+    return member_factory(
+        **{
+            "citizenship": "CZ",
+            "sex": MemberSexEnum.FEMALE,
+            "birth_date": _years_ago(17),
+            "club": team_at_tournament.application.team.club,
+            "email_confirmed_at": timezone.now(),
+            **kwargs,
+        }
+    )
+
+
+class TestTournamentRosterEligibility:
+    def test_verdicts_with_reasons(
+        self, member_factory, team_at_tournament, member_at_tournament_factory
+    ):
+        eligible = _member(member_factory, team_at_tournament)
+        man = _member(member_factory, team_at_tournament, sex=MemberSexEnum.MALE)
+        too_old = _member(member_factory, team_at_tournament, birth_date=_years_ago(25))
+        unconfirmed = _member(member_factory, team_at_tournament, email_confirmed_at=None)
+        on_roster = _member(member_factory, team_at_tournament)
+        member_at_tournament_factory(tournament=team_at_tournament.tournament, member=on_roster)
+        ids = [eligible.id, man.id, too_old.id, unconfirmed.id, on_roster.id, 0]
+
+        with override_app_settings(email_verification_required=True):
+            verdicts = TournamentRosterEligibility(
+                team_at_tournament.tournament, team_at_tournament
+            ).check(ids)
+
+        assert list(verdicts) == ids
+        assert verdicts[eligible.id] == Verdict(eligible)
+        assert verdicts[eligible.id].is_eligible
+        assert {member_id: verdict.reason for member_id, verdict in verdicts.items()} == {
+            eligible.id: None,
+            man.id: "Men are not allowed in this division",
+            too_old.id: "Member does not meet age requirements",
+            unconfirmed.id: "Member has not confirmed email",
+            on_roster.id: "Member is already on a roster at this tournament",
+            0: "Member not found",
+        }
+
+    @pytest.mark.parametrize("min_age_verification_required", [True, False])
+    def test_min_age_follows_app_settings(
+        self, member_factory, team_at_tournament, min_age_verification_required
+    ):
+        too_young = _member(member_factory, team_at_tournament, birth_date=_years_ago(13))
+
+        with override_app_settings(min_age_verification_required=min_age_verification_required):
+            verdict = TournamentRosterEligibility(
+                team_at_tournament.tournament, team_at_tournament
+            ).check([too_young.id])[too_young.id]
+
+        assert verdict.is_eligible is not min_age_verification_required
+
+    def test_number_of_queries_does_not_depend_on_batch_size(
+        self, member_factory, team_at_tournament, django_assert_num_queries
+    ):
+        members = [_member(member_factory, team_at_tournament) for _ in range(10)]
+        eligibility = TournamentRosterEligibility(team_at_tournament.tournament, team_at_tournament)
+        eligibility.app_settings  # noqa: B018
+
+        # Conflicts, members and the current roster
+        with django_assert_num_queries(3):
+            eligibility.check([members[0].id])
+        with django_assert_num_queries(3):
+            eligibility.check([member.id for member in members])
+
+    def test_filter_candidates_uses_the_same_rules(
+        self, member_factory, team_at_tournament, member_at_tournament_factory
+    ):
+        eligible = _member(member_factory, team_at_tournament)
+        _member(member_factory, team_at_tournament, sex=MemberSexEnum.MALE)
+        _member(member_factory, team_at_tournament, birth_date=_years_ago(13))
+        on_roster = _member(member_factory, team_at_tournament)
+        member_at_tournament_factory(tournament=team_at_tournament.tournament, member=on_roster)
+
+        candidates = TournamentRosterEligibility(team_at_tournament.tournament).filter_candidates(
+            Member.objects.filter(club=team_at_tournament.application.team.club)
+        )
+
+        assert list(candidates) == [eligible]
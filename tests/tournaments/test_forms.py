@@ -1,7 +1,7 @@
 import pytest
 from django.utils import timezone
 from members.models import MemberSexEnum
-from tournaments.forms import AddMemberToRosterForm
+from tournaments.forms import AddMembersToRosterForm, AddMemberToRosterForm
 
 
 class TestAddMemberToRosterForm:
@@ -127,6 +127,35 @@ class TestAddMemberToRosterForm:
 
         assert form.is_valid()
 
+    def test_nationality_ratio_czech_member_rejected_when_ratio_stays_below(
+        self, member_factory, team_at_tournament, member_at_tournament_factory
+    ):
+        """Test that a Czech member is rejected when the roster stays under 51% (2 of 4)"""
+        # Setup: roster of 1 Czech and 2 foreign members (e.g. edited in the admin)
+        for citizenship in ["CZ", "US", "US"]:
+            member_at_tournament_factory(
+                team_at_tournament=team_at_tournament,
+                tournament=team_at_tournament.tournament,
+                member=member_factory(citizenship=citizenship),
+            )
+
+        czech_member = member_factory(
+            citizenship="CZ",
+            sex=MemberSexEnum.MALE,
+            club=team_at_tournament.application.team.club,
+            email_confirmed_at=timezone.now(),
+        )
+
+        form = AddMemberToRosterForm(
+            data={"member_id": czech_member.id},
+            team_at_tournament=team_at_tournament,
+        )
+
+        assert not form.is_valid()
+        assert "Nationality ratio: at least 51% must be Czech citizens" in str(
+            form.errors["member_id"]
+        )
+
     def test_nationality_ratio_50_50_split_rejected(
         self, member_factory, team_at_tournament, member_at_tournament_factory
     ):
@@ -446,3 +475,111 @@ class TestAddMemberToRosterForm:
             assert form.is_valid() == expected_valid
             if not expected_valid:
                 assert "Member does not meet age requirements" in str(form.errors["member_id"])
+
+
+class TestAddMembersToRosterForm:
+    def _member(self, member_factory, team_at_tournament, **kwargs):
+        return member_factory(
+            **{
+                "citizenship": "CZ",
+                "sex": MemberSexEnum.FEMALE,
+                "club": team_at_tournament.application.team.club,
+                "email_confirmed_at": timezone.now(),
+                **kwargs,
+            }
+        )
+
+    def test_rejects_invalid_members_one_by_one(
+        self, member_factory, team_at_tournament, member_at_tournament_factory
+    ):
+        team_at_tournament.tournament.competition.division.is_male_allowed = False
+        team_at_tournament.tournament.competition.division.save()
+        valid = [self._member(member_factory, team_at_tournament) for _ in range(2)]
+        man = self._member(member_factory, team_at_tournament, sex=MemberSexEnum.MALE)
+        on_roster = self._member(member_factory, team_at_tournament)
+        member_at_tournament_factory(
+            tournament=team_at_tournament.tournament,
+            team_at_tournament=team_at_tournament,
+            member=on_roster,
+        )
+
+        form = AddMembersToRosterForm(
+            data={"member_ids": f"{valid[0].id},{man.id},{on_roster.id},0,{valid[1].id}"},
+            team_at_tournament=team_at_tournament,
+        )
+
+        assert form.is_valid()
+        assert form.accepted_members == valid
+        assert form.member_errors == {
+            man.id: "Men are not allowed in this division",
+            on_roster.id: "Member is already on a roster at this tournament",
+            0: "Member not found",
+        }
+
+    def test_nationality_ratio_is_checked_for_the_whole_batch(
+        self, member_factory, team_at_tournament
+    ):
+        czech = [self._member(member_factory, team_at_tournament) for _ in range(2)]
+        foreign = [
+            self._member(member_factory, team_at_tournament, citizenship="SK") for _ in range(2)
+        ]
+
+        # Czech members submitted later still count for the foreign ones before them
+        form = AddMembersToRosterForm(
+            data={"member_ids": ",".join(str(m.id) for m in [*foreign, *czech])},
+            team_at_tournament=team_at_tournament,
+        )
+
+        assert form.is_valid()
+        assert form.accepted_members == [foreign[0], *czech]
+        assert form.member_errors == {
+            foreign[1].id: "Nationality ratio: at least 51% must be Czech citizens"
+        }
+
+    def test_conflict_with_another_team_in_competition(
+        self, member_factory, team_at_tournament_factory, member_at_tournament_factory
+    ):
+        tat_a = team_at_tournament_factory()
+        tat_b = team_at_tournament_factory(tournament__competition=tat_a.tournament.competition)
+        member = self._member(member_factory, tat_b)
+        member_at_tournament_factory(
+            tournament=tat_a.tournament, team_at_tournament=tat_a, member=member
+        )
+
+        form = AddMembersToRosterForm(data={"member_ids": str(member.id)}, team_at_tournament=tat_b)
+
+        assert form.is_valid()
+        assert form.accepted_members == []
+        assert form.member_errors[member.id].startswith(
+            "Member is already registered for another team in this competition"
+        )
+
+    def test_number_of_queries_does_not_depend_on_batch_size(
+        self, member_factory, team_at_tournament, django_assert_num_queries
+    ):
+        members = [self._member(member_factory, team_at_tournament) for _ in range(10)]
+
+        def validate(batch):
+            form = AddMembersToRosterForm(
+                data={"member_ids": ",".join(str(m.id) for m in batch)},
+                team_at_tournament=team_at_tournament,
+            )
+            assert form.is_valid()
+            assert form.accepted_members == batch
+
+        # App settings, conflicts, members and the current roster
+        with django_assert_num_queries(4):
+            validate(members[:1])
+        with django_assert_num_queries(4):
+            validate(members)
+
+    def test_deadline_passed(self, member_factory, team_at_tournament):
+        team_at_tournament.tournament.rosters_deadline = timezone.now() - timezone.timedelta(days=1)
+        member = self._member(member_factory, team_at_tournament)
+
+        form = AddMembersToRosterForm(
+            data={"member_ids": str(member.id)}, team_at_tournament=team_at_tournament
+        )
+
+        assert not form.is_valid()
+        assert form.errors["member_ids"] == ["The roster deadline has passed"]
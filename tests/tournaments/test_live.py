@@ -0,0 +1,89 @@
+import json
+from decimal import Decimal
+
+import fakeredis
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.urls import reverse
+from tournaments.live import CHANNEL, publish_results
+from tournaments.services import update_results
+
+from tests.conftest import simulate_commit
+from tests.helpers import create_complete_competition
+
+
+@pytest.fixture
+def objects():
+    with simulate_commit():
+        return create_complete_competition()
+
+
+def _data(event):
+    lines = dict(line.split(": ", 1) for line in event.strip().splitlines())
+    assert lines["event"] == "results"
+    return json.loads(lines["data"])
+
+
+def test_results_are_published_on_commit(objects, redis_server):
+    tournament, team_at_tournament = objects["tournament"], objects["team_at_tournament"]
+    pubsub = fakeredis.FakeRedis(server=redis_server).pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CHANNEL.format(tournament.pk))
+
+    with simulate_commit():
+        update_results(
+            tournament,
+            [{"id": team_at_tournament.pk, "final_placement": 1, "spirit_avg": Decimal("11.5")}],
+        )
+        assert pubsub.get_message() is None
+
+    message = pubsub.get_message()
+    assert json.loads(message["data"]) == {
+        "tournament_id": tournament.pk,
+        "winner_team_id": team_at_tournament.pk,
+        "sotg_winner_team_id": team_at_tournament.pk,
+        "teams": [
+            {
+                "id": team_at_tournament.pk,
+                "team_name": objects["application"].team_name,
+                "final_placement": 1,
+                "spirit_avg": "11.500",
+            }
+        ],
+    }
+
+
+def test_stream_relays_results(objects, async_client, monkeypatch):
+    monkeypatch.setattr("tournaments.live.KEEPALIVE", 0.01)
+    tournament = objects["tournament"]
+
+    @async_to_sync
+    async def read_events():
+        response = await async_client.get(
+            reverse("tournaments:results_stream", args=[tournament.pk])
+        )
+        assert response["Content-Type"] == "text/event-stream"
+        events = aiter(response.streaming_content)
+        initial = _data((await anext(events)).decode())
+        assert await anext(events) == b": keepalive\n\n"
+
+        await sync_to_async(publish_results)(tournament.pk)
+        while (event := await anext(events)) == b": keepalive\n\n":
+            pass
+        await events.aclose()
+        return initial, _data(event.decode())
+
+    initial, update = read_events()
+
+    assert initial["teams"][0]["final_placement"] is None
+    assert update == initial
+
+
+def test_stream_without_asgi_sends_results_once(objects, client):
+    response = client.get(reverse("tournaments:results_stream", args=[objects["tournament"].pk]))
+
+    [event] = response.streaming_content
+    assert "retry: 15000\n" in event.decode()
+    assert _data(event.decode().replace("retry: 15000\n", ""))["tournament_id"] == (
+        objects["tournament"].pk
+    )
+    assert client.get(reverse("tournaments:results_stream", args=[0])).status_code == 404
@@ -1,9 +1,17 @@
+from contextlib import suppress
 from datetime import datetime
 from decimal import Decimal
+from io import StringIO
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from tournaments.models import TeamAtTournament, Tournament
+
+from tests.conftest import simulate_commit
 
 
 class TestTournamentModel:
@@ -54,21 +62,24 @@ class TestTournamentWinners:
     ):
         """Test that winner_team is set when a team gets final_placement=1"""
         tournament = tournament_factory()
-        team1 = team_at_tournament_factory(tournament=tournament)
-        team2 = team_at_tournament_factory(tournament=tournament)
+        with simulate_commit():
+            team1 = team_at_tournament_factory(tournament=tournament)
+            team2 = team_at_tournament_factory(tournament=tournament)
 
         # Set team1 as winner
-        team1.final_placement = 1
-        team1.save()
+        with simulate_commit():
+            team1.final_placement = 1
+            team1.save()
 
         tournament.refresh_from_db()
         assert tournament.winner_team == team1
 
         # Change winner to team2
-        team1.final_placement = 2
-        team1.save()
-        team2.final_placement = 1
-        team2.save()
+        with simulate_commit():
+            team1.final_placement = 2
+            team1.save()
+            team2.final_placement = 1
+            team2.save()
 
         tournament.refresh_from_db()
         assert tournament.winner_team == team2
@@ -78,22 +89,24 @@ class TestTournamentWinners:
     ):
         """Test that sotg_winner_team is set based on best spirit_avg"""
         tournament = tournament_factory()
-        _team1 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=Decimal("15.500"), final_placement=2
-        )
-        team2 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=Decimal("16.200"), final_placement=1
-        )
-        team3 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=Decimal("14.800"), final_placement=3
-        )
+        with simulate_commit():
+            _team1 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=Decimal("15.500"), final_placement=2
+            )
+            team2 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=Decimal("16.200"), final_placement=1
+            )
+            team3 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=Decimal("14.800"), final_placement=3
+            )
 
         tournament.refresh_from_db()
         assert tournament.sotg_winner_team == team2  # Highest spirit_avg
 
         # Update team3 to have best spirit
-        team3.spirit_avg = Decimal("17.000")
-        team3.save()
+        with simulate_commit():
+            team3.spirit_avg = Decimal("17.000")
+            team3.save()
 
         tournament.refresh_from_db()
         assert tournament.sotg_winner_team == team3
@@ -103,12 +116,13 @@ class TestTournamentWinners:
     ):
         """Test that final_placement is used as tiebreaker when spirit_avg is equal"""
         tournament = tournament_factory()
-        _team1 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=Decimal("15.000"), final_placement=2
-        )
-        team2 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=Decimal("15.000"), final_placement=1
-        )
+        with simulate_commit():
+            _team1 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=Decimal("15.000"), final_placement=2
+            )
+            team2 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=Decimal("15.000"), final_placement=1
+            )
 
         tournament.refresh_from_db()
         # When spirit_avg is equal, team with better final_placement wins
@@ -117,12 +131,13 @@ class TestTournamentWinners:
     def test_sotg_winner_none_when_no_spirit(self, tournament_factory, team_at_tournament_factory):
         """Test that sotg_winner_team is None when no team has spirit_avg"""
         tournament = tournament_factory()
-        _team1 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=None, final_placement=2
-        )
-        _team2 = team_at_tournament_factory(
-            tournament=tournament, spirit_avg=None, final_placement=1
-        )
+        with simulate_commit():
+            _team1 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=None, final_placement=2
+            )
+            _team2 = team_at_tournament_factory(
+                tournament=tournament, spirit_avg=None, final_placement=1
+            )
 
         tournament.refresh_from_db()
         # When no team has spirit_avg, sotg_winner_team should be None
@@ -131,14 +146,16 @@ class TestTournamentWinners:
     def test_winner_cleared_when_team_deleted(self, tournament_factory, team_at_tournament_factory):
         """Test that winner_team is cleared when the winning team is deleted"""
         tournament = tournament_factory()
-        team1 = team_at_tournament_factory(tournament=tournament, final_placement=1)
-        _team2 = team_at_tournament_factory(tournament=tournament, final_placement=2)
+        with simulate_commit():
+            team1 = team_at_tournament_factory(tournament=tournament, final_placement=1)
+            _team2 = team_at_tournament_factory(tournament=tournament, final_placement=2)
 
         tournament.refresh_from_db()
         assert tournament.winner_team == team1
 
         # Delete winning team
-        team1.delete()
+        with simulate_commit():
+            team1.delete()
 
         tournament.refresh_from_db()
         # Should now be team2 if they become winner, or None if no winner
@@ -150,15 +167,17 @@ class TestTournamentWinners:
     ):
         """Test that winner_team is cleared when the winning team loses final_placement=1"""
         tournament = tournament_factory()
-        team1 = team_at_tournament_factory(tournament=tournament, final_placement=1)
-        _team2 = team_at_tournament_factory(tournament=tournament, final_placement=2)
+        with simulate_commit():
+            team1 = team_at_tournament_factory(tournament=tournament, final_placement=1)
+            _team2 = team_at_tournament_factory(tournament=tournament, final_placement=2)
 
         tournament.refresh_from_db()
         assert tournament.winner_team == team1
 
         # Remove final_placement during a results correction
-        team1.final_placement = None
-        team1.save()
+        with simulate_commit():
+            team1.final_placement = None
+            team1.save()
 
         tournament.refresh_from_db()
         # No team has final_placement=1 anymore, so winner_team must be cleared
@@ -169,16 +188,18 @@ class TestTournamentWinners:
     ):
         """Test that sotg_winner_team is cleared when no team has spirit_avg anymore"""
         tournament = tournament_factory()
-        team1 = team_at_tournament_factory(
-            tournament=tournament, final_placement=1, spirit_avg=Decimal("15.000")
-        )
+        with simulate_commit():
+            team1 = team_at_tournament_factory(
+                tournament=tournament, final_placement=1, spirit_avg=Decimal("15.000")
+            )
 
         tournament.refresh_from_db()
         assert tournament.sotg_winner_team == team1
 
         # Remove spirit_avg during a results correction
-        team1.spirit_avg = None
-        team1.save()
+        with simulate_commit():
+            team1.spirit_avg = None
+            team1.save()
 
         tournament.refresh_from_db()
         # No team has spirit_avg anymore, so sotg_winner_team must be cleared
@@ -207,3 +228,121 @@ class TestTournamentWinners:
 
         assert tournament.winner_team == team1  # final_placement=1
         assert tournament.sotg_winner_team == team2  # best spirit_avg
+
+
+class TestDeferredWinnersUpdate:
+    """Test that winner recalculation is deferred to the commit and coalesced"""
+
+    def test_batch_of_result_edits_updates_winners_once(
+        self, tournament, team_at_tournament_factory
+    ):
+        with simulate_commit():
+            teams = team_at_tournament_factory.create_batch(5, tournament=tournament)
+
+        with CaptureQueriesContext(connection) as queries, simulate_commit():
+            for placement, team in enumerate(teams, start=1):
+                team.final_placement = placement
+                team.spirit_avg = Decimal(10 + placement)
+                team.save(update_fields=["final_placement", "spirit_avg"])
+            # Nothing is recalculated until the commit
+            edit_query_count = len(queries)
+            assert not any('"tournaments_tournament"' in query["sql"] for query in queries)
+
+        # A single recalculation whatever the number of edits: the tournament, its winners,
+        # their audited save and the published results
+        assert len(queries) - edit_query_count == 13
+        tournament.refresh_from_db()
+        assert tournament.winner_team == teams[0]
+        assert tournament.sotg_winner_team == teams[4]
+
+    def test_update_scheduled_per_tournament(self, tournament_factory, team_at_tournament_factory):
+        with simulate_commit():
+            team1 = team_at_tournament_factory(tournament=tournament_factory())
+            team2 = team_at_tournament_factory(tournament=tournament_factory())
+
+        with simulate_commit():
+            team1.final_placement = team2.final_placement = 1
+            team1.save()
+            team2.save()
+
+        team1.tournament.refresh_from_db()
+        team2.tournament.refresh_from_db()
+        assert team1.tournament.winner_team == team1
+        assert team2.tournament.winner_team == team2
+
+    def test_rolled_back_savepoint_does_not_suppress_update(
+        self, tournament, team_at_tournament_factory
+    ):
+        with simulate_commit():
+            team = team_at_tournament_factory(tournament=tournament)
+
+        with simulate_commit():
+            with suppress(RuntimeError), transaction.atomic():
+                team.final_placement = 2
+                team.save()
+                raise RuntimeError
+            team.final_placement = 1
+            team.save()
+
+        tournament.refresh_from_db()
+        assert tournament.winner_team == team
+
+
+class TestTournamentCounters:
+    def test_counters_follow_teams_and_members(
+        self, tournament, team_at_tournament_factory, member_at_tournament_factory
+    ):
+        team_at_tournament = team_at_tournament_factory(tournament=tournament)
+        team_at_tournament_factory(tournament=tournament)
+        members = member_at_tournament_factory.create_batch(
+            3, tournament=tournament, team_at_tournament=team_at_tournament
+        )
+        members[0].delete()
+
+        tournament.refresh_from_db()
+        team_at_tournament.refresh_from_db()
+        assert (tournament.team_count, tournament.member_count) == (2, 2)
+        assert team_at_tournament.member_count == 2
+
+    def test_member_moved_to_another_team(
+        self, tournament, team_at_tournament_factory, member_at_tournament_factory
+    ):
+        old_team, new_team = team_at_tournament_factory.create_batch(2, tournament=tournament)
+        member_at_tournament = member_at_tournament_factory(
+            tournament=tournament, team_at_tournament=old_team
+        )
+
+        member_at_tournament.jersey_number = 7
+        member_at_tournament.save(update_fields=["jersey_number"])
+        member_at_tournament.team_at_tournament = new_team
+        member_at_tournament.save()
+
+        old_team.refresh_from_db()
+        new_team.refresh_from_db()
+        tournament.refresh_from_db()
+        assert (old_team.member_count, new_team.member_count) == (0, 1)
+        assert tournament.member_count == 1
+
+    def test_saving_stale_instance_keeps_counters(self, tournament, team_at_tournament_factory):
+        team_at_tournament_factory(tournament=tournament)
+
+        tournament.name = "Renamed"
+        tournament.save()
+
+        tournament.refresh_from_db()
+        assert tournament.name == "Renamed"
+        assert tournament.team_count == 1
+
+    def test_repair_command_fixes_drifted_counters(
+        self, tournament, team_at_tournament, member_at_tournament_factory
+    ):
+        member_at_tournament_factory(tournament=tournament, team_at_tournament=team_at_tournament)
+        Tournament.objects.update(team_count=7, member_count=0)
+        TeamAtTournament.objects.update(member_count=5)
+
+        call_command("repair_tournament_counters", stdout=StringIO())
+
+        tournament.refresh_from_db()
+        team_at_tournament.refresh_from_db()
+        assert (tournament.team_count, tournament.member_count) == (1, 1)
+        assert team_at_tournament.member_count == 1
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from tournaments.models import MemberAtTournament, RosterSnapshot, Tournament
+from tournaments.services import get_roster_snapshots
+from tournaments.tasks import freeze_past_rosters
+
+from tests.factories import MemberAtTournamentFactory, TeamAtTournamentFactory
+
+
+def _create_roster(rosters_deadline, size=2):
+    team_at_tournament = TeamAtTournamentFactory(tournament__rosters_deadline=rosters_deadline)
+    members_at_tournament = MemberAtTournamentFactory.create_batch(
+        size, tournament=team_at_tournament.tournament, team_at_tournament=team_at_tournament
+    )
+    return team_at_tournament, members_at_tournament
+
+
+def _export(client, tournament):
+    response = client.get(reverse("tournaments:export_rosters_csv", args=[tournament.id]))
+    return response.content.decode("utf-8-sig")
+
+
+class TestFreezePastRosters:
+    def test_freezes_only_tournaments_past_the_deadline(self):
+        past, past_members = _create_roster(timezone.now() - timedelta(hours=1))
+        open_, _ = _create_roster(timezone.now() + timedelta(hours=1))
+
+        freeze_past_rosters.call_local()
+
+        past.tournament.refresh_from_db()
+        open_.tournament.refresh_from_db()
+        assert past.tournament.has_frozen_rosters
+        assert open_.tournament.rosters_frozen_at is None
+        assert set(RosterSnapshot.objects.values_list("member_at_tournament_id", flat=True)) == {
+            member_at_tournament.id for member_at_tournament in past_members
+        }
+
+    def test_snapshot_copies_the_roster(self):
+        team_at_tournament, (member_at_tournament, _) = _create_roster(
+            timezone.now() - timedelta(hours=1)
+        )
+        MemberAtTournament.objects.filter(pk=member_at_tournament.pk).update(
+            is_captain=True, jersey_number=7
+        )
+
+        freeze_past_rosters.call_local()
+
+        snapshot = RosterSnapshot.objects.get(member_at_tournament=member_at_tournament)
+        member = member_at_tournament.member
+        assert snapshot.full_name == member.full_name
+        assert snapshot.birth_date == member.birth_date
+        assert snapshot.club_name == member.club.name
+        assert snapshot.team_name == team_at_tournament.application.team_name
+        assert snapshot.team_club_name == team_at_tournament.application.team.club.name
+        assert snapshot.is_captain
+        assert snapshot.jersey_number == 7
+        assert snapshot.added_at == member_at_tournament.created_at
+
+    def test_historical_readers_keep_names_from_the_tournament(self, client, staff_user):
+        team_at_tournament, (member_at_tournament, _) = _create_roster(
+            timezone.now() - timedelta(hours=1)
+        )
+        tournament = team_at_tournament.tournament
+        client.force_login(staff_user)
+        live_export = _export(client, tournament)
+
+        freeze_past_rosters.call_local()
+        assert _export(client, tournament) == live_export
+
+        member = member_at_tournament.member
+        old_name = member.full_name
+        member.last_name = "Renamed"
+        member.save()
+
+        assert "Renamed" not in _export(client, tournament)
+        response = client.get(reverse("tournaments:roster_dialog", args=[team_at_tournament.id]))
+        assert old_name in response.content.decode()
+
+    def test_roster_change_after_freeze_is_frozen_again(self):
+        team_at_tournament, (member_at_tournament, _) = _create_roster(
+            timezone.now() - timedelta(hours=1)
+        )
+        tournament = team_at_tournament.tournament
+        freeze_past_rosters.call_local()
+
+        member_at_tournament.delete()
+        tournament.refresh_from_db()
+        assert not tournament.has_frozen_rosters
+        assert len(get_roster_snapshots(tournament)) == 1
+
+        freeze_past_rosters.call_local()
+        tournament.refresh_from_db()
+        assert tournament.has_frozen_rosters
+        assert RosterSnapshot.objects.filter(tournament=tournament).count() == 1
+
+    def test_moved_deadline_reopens_rosters(self):
+        team_at_tournament, _ = _create_roster(timezone.now() - timedelta(hours=1))
+        freeze_past_rosters.call_local()
+
+        Tournament.objects.filter(pk=team_at_tournament.tournament_id).update(
+            rosters_deadline=timezone.now() + timedelta(days=1)
+        )
+        team_at_tournament.tournament.refresh_from_db()
+        assert not team_at_tournament.tournament.has_frozen_rosters
+
+        new_member_at_tournament = MemberAtTournamentFactory(
+            tournament=team_at_tournament.tournament, team_at_tournament=team_at_tournament
+        )
+        assert new_member_at_tournament.id in {
+            snapshot.member_at_tournament_id
+            for snapshot in get_roster_snapshots(team_at_tournament.tournament)
+        }
@@ -1,12 +1,16 @@
 from datetime import timedelta
 from unittest.mock import patch
 
+from auditlog.models import LogEntry
+from clubs.models import ClubNotification
+from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError
 from django.urls import reverse
 from django.utils import timezone
 from tournaments.models import MemberAtTournament
 
 from tests.factories import (
+    AgentAtClubFactory,
     ClubFactory,
     CompetitionApplicationFactory,
     CompetitionFactory,
@@ -121,6 +125,84 @@ class TestRosterDialogAddFormView:
         assert response.status_code == 400
 
 
+class TestRosterDialogBulkAddFormView:
+    def test_permission_denied_other_clubs_team(self, logged_in_client):
+        user = UserFactory()
+        club = ClubFactory()
+        _, _, _, tat = _create_tournament_setup(ClubFactory())
+        client = logged_in_client(user, club)
+
+        response = client.get(reverse("tournaments:roster_dialog_bulk_add_form", args=[tat.id]))
+
+        assert response.status_code == 403
+
+    def test_adds_members_and_notifies_each_club_once(self, logged_in_client):
+        user = UserFactory()
+        club = ClubFactory()
+        other_club = ClubFactory()
+        AgentAtClubFactory(club=other_club, is_active=True)
+        _, tournament, _, tat = _create_tournament_setup(club)
+        members = [
+            MemberFactory(
+                club=member_club,
+                citizenship="CZ",
+                default_jersey_number=number,
+                email_confirmed_at=timezone.now(),
+            )
+            for number, member_club in enumerate([club, other_club, other_club], start=1)
+        ]
+        client = logged_in_client(user, club)
+
+        response = client.post(
+            reverse("tournaments:roster_dialog_bulk_add_form", args=[tat.id]),
+            data={"member_ids": ",".join(str(member.id) for member in members)},
+        )
+
+        assert response.status_code == 204
+        assert list(
+            MemberAtTournament.objects.filter(team_at_tournament=tat)
+            .order_by("jersey_number")
+            .values_list("member_id", flat=True)
+        ) == [member.id for member in members]
+        tat.refresh_from_db()
+        tournament.refresh_from_db()
+        assert tat.member_count == tournament.member_count == 3
+        entries = LogEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(MemberAtTournament),
+            action=LogEntry.Action.CREATE,
+        )
+        assert entries.count() == 3
+        assert {entry.actor for entry in entries} == {user}
+        notification = ClubNotification.objects.get(agent_at_club__club=other_club)
+        assert members[1].full_name in notification.message
+        assert members[2].full_name in notification.message
+        assert not ClubNotification.objects.filter(agent_at_club__club=club).exists()
+
+    def test_shows_rejected_members(self, logged_in_client):
+        user = UserFactory()
+        club = ClubFactory()
+        _, _, _, tat = _create_tournament_setup(club)
+        czech = MemberFactory(club=club, citizenship="CZ", email_confirmed_at=timezone.now())
+        foreign = MemberFactory(
+            club=club, citizenship="SK", last_name="Foreigner", email_confirmed_at=timezone.now()
+        )
+        client = logged_in_client(user, club)
+
+        response = client.post(
+            reverse("tournaments:roster_dialog_bulk_add_form", args=[tat.id]),
+            data={"member_ids": f"{foreign.id},{czech.id}"},
+        )
+
+        assert response.status_code == 200
+        assert response["HX-Trigger"] == "teamsListChanged"
+        assert "Foreigner" in response.content.decode()
+        assert list(
+            MemberAtTournament.objects.filter(team_at_tournament=tat).values_list(
+                "member_id", flat=True
+            )
+        ) == [czech.id]
+
+
 class TestRosterDialogUpdateFormView:
     def test_permission_denied_other_clubs_member(self, logged_in_client):
         user = UserFactory()
@@ -0,0 +1,57 @@
+"""
+Token authentication with the token to user resolution cached, so authenticated API calls
+(e.g. result entry during a tournament) do not look the token up in the database each time.
+
+Entries are dropped when the token is deleted (rotation replaces the token, deleting the old
+one) and whenever its user is saved, so deactivation takes effect right after the commit.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AbstractBaseUser
+from django.core.cache import cache
+from django.db import router, transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+CACHE_KEY = "api-token:{}"
+
+
+def _cache_key(key: str) -> str:
+    # Tokens are credentials, they are not kept in the cache in plain text
+    return CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement of ``TokenAuthentication``, caching the user of valid tokens. Only the
+    user's fields are cached, without the password hash, and the token is not stored at all.
+    """
+
+    def authenticate_credentials(self, key: str) -> tuple[AbstractBaseUser, Token]:
+        cache_key = _cache_key(key)
+        user_fields = cache.get(cache_key)
+        if user_fields is None:
+            # Invalid tokens and inactive users are refused here and not cached
+            user, token = super().authenticate_credentials(key)
+            user_fields = {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields
+                if field.attname != "password"
+            }
+            cache.set(cache_key, user_fields, settings.API_TOKEN_CACHE_TIMEOUT)
+            return user, token
+
+        # The password is deferred, it is loaded from the database only if accessed
+        user_model = get_user_model()
+        user = user_model.from_db(
+            router.db_for_read(user_model), list(user_fields), list(user_fields.values())
+        )
+        return user, Token(key=key, user=user)
+
+
+def forget_tokens(*keys: str) -> None:
+    """Drop cached tokens once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete_many([_cache_key(key) for key in keys]))
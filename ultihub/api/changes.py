@@ -0,0 +1,160 @@
+"""
+Changefeed of the API. Upserts are read from ``updated_at`` of the synced models and
+deletions from the audit log, merged into one stream ordered by (time, source, id). The
+cursor is the position of the last change returned, so a client resumes exactly after it.
+
+``updated_at`` is set before the transaction commits, so a change becomes visible a moment
+after its time. Changes are therefore returned only once they are older than
+``SETTLE_TIME``; a younger one could still appear behind a cursor a client already holds.
+Changes made by queryset updates that do not set ``updated_at`` are not in the feed.
+"""
+
+import base64
+import heapq
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any, NamedTuple
+
+from auditlog.models import LogEntry
+from clubs.models import Club
+from competitions.models import Competition, CompetitionApplication
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Model, Q, QuerySet
+from django.utils import timezone
+from rest_framework.serializers import Serializer
+from tournaments.models import TeamAtTournament, Tournament
+
+from api.serializers import (
+    ClubSerializer,
+    CompetitionApplicationChangeSerializer,
+    CompetitionChangeSerializer,
+    TeamAtTournamentChangeSerializer,
+    TournamentChangeSerializer,
+)
+
+SETTLE_TIME = timedelta(seconds=10)
+
+
+class Source(NamedTuple):
+    name: str
+    queryset: QuerySet
+    serializer_class: type[Serializer]
+
+
+# The position of a source orders changes made at the same time, deletions come last
+SOURCES = [
+    Source(
+        "competition",
+        Competition.objects.select_related("season", "division", "age_limit"),
+        CompetitionChangeSerializer,
+    ),
+    Source(
+        "competition_application",
+        CompetitionApplication.objects.select_related("team__club"),
+        CompetitionApplicationChangeSerializer,
+    ),
+    Source("tournament", Tournament.objects.all(), TournamentChangeSerializer),
+    Source(
+        "team_at_tournament",
+        TeamAtTournament.objects.select_related("application__team"),
+        TeamAtTournamentChangeSerializer,
+    ),
+    Source("club", Club.objects.all(), ClubSerializer),
+]
+DELETIONS = len(SOURCES)
+
+
+class Cursor(NamedTuple):
+    timestamp: datetime
+    source: int
+    pk: int
+
+    def encode(self) -> str:
+        value = f"{self.timestamp.isoformat()}|{self.source}|{self.pk}"
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "Cursor":
+        """Raise ValueError for a malformed cursor."""
+        timestamp, source, pk = base64.urlsafe_b64decode(value.encode()).decode().split("|")
+        cursor = cls(datetime.fromisoformat(timestamp), int(source), int(pk))
+        if cursor.timestamp.tzinfo is None or not 0 <= cursor.source <= DELETIONS:
+            raise ValueError("Invalid cursor")
+        return cursor
+
+
+class Change(NamedTuple):
+    cursor: Cursor
+    source_name: str
+    id: int
+    instance: Model | None  # None for a deletion
+
+
+def _after(cursor: Cursor | None, source: int, field: str) -> Q:
+    """Rows of the source positioned after the cursor."""
+    if cursor is None:
+        return Q()
+    if source > cursor.source:
+        return Q(**{f"{field}__gte": cursor.timestamp})
+    if source < cursor.source:
+        return Q(**{f"{field}__gt": cursor.timestamp})
+    return Q(**{f"{field}__gt": cursor.timestamp}) | Q(
+        **{field: cursor.timestamp, "pk__gt": cursor.pk}
+    )
+
+
+def _upserts(source: int, since: Cursor | None, until: datetime, limit: int) -> Iterator[Change]:
+    name, queryset, _ = SOURCES[source]
+    for instance in queryset.filter(
+        _after(since, source, "updated_at"), updated_at__lte=until
+    ).order_by("updated_at", "pk")[:limit]:
+        yield Change(Cursor(instance.updated_at, source, instance.pk), name, instance.pk, instance)
+
+
+def _deletions(since: Cursor | None, until: datetime, limit: int) -> Iterator[Change]:
+    content_types = ContentType.objects.get_for_models(*(s.queryset.model for s in SOURCES))
+    names = {content_types[s.queryset.model].pk: s.name for s in SOURCES}
+    for entry in LogEntry.objects.filter(
+        _after(since, DELETIONS, "timestamp"),
+        action=LogEntry.Action.DELETE,
+        content_type_id__in=names,
+        timestamp__lte=until,
+    ).order_by("timestamp", "pk")[:limit]:
+        yield Change(
+            Cursor(entry.timestamp, DELETIONS, entry.pk),
+            names[entry.content_type_id],
+            int(entry.object_pk),
+            None,
+        )
+
+
+def get_changes(since: Cursor | None, limit: int) -> tuple[list[Change], bool]:
+    """Return up to ``limit`` changes after the cursor and whether there are more of them."""
+    until = timezone.now() - SETTLE_TIME
+    streams = [_upserts(source, since, until, limit + 1) for source in range(len(SOURCES))]
+    streams.append(_deletions(since, until, limit + 1))
+
+    changes = []
+    for change in heapq.merge(*streams, key=lambda change: change.cursor):
+        changes.append(change)
+        if len(changes) > limit:
+            return changes[:limit], True
+    return changes, False
+
+
+def serialize_changes(changes: list[Change]) -> list[dict[str, Any]]:
+    serializers = {source.name: source.serializer_class for source in SOURCES}
+    return [
+        {
+            "type": change.source_name,
+            "id": change.id,
+            "action": "delete" if change.instance is None else "upsert",
+            "changed_at": change.cursor.timestamp,
+            "data": (
+                None
+                if change.instance is None
+                else serializers[change.source_name](change.instance).data
+            ),
+        }
+        for change in changes
+    ]
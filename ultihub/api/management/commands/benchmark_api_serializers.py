@@ -0,0 +1,141 @@
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from clubs.models import Club
+from competitions.models import ApplicationStateEnum, Competition, CompetitionApplication, Season
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Prefetch, QuerySet
+from django.test.utils import CaptureQueriesContext
+from rest_framework.serializers import Serializer
+from tournaments.models import MemberAtTournament, TeamAtTournament, Tournament
+
+from api.serializers import (
+    ClubSerializer,
+    CompetitionSerializer,
+    SeasonSerializer,
+    TeamAtTournamentSerializer,
+    club_values,
+    competition_values,
+    season_values,
+    team_at_tournament_values,
+)
+from api.values import ValuesSerializer
+
+
+class Endpoint(NamedTuple):
+    name: str
+    queryset: QuerySet
+    # The model serializer path, as the list endpoints read rows before the values path
+    prefetched_queryset: QuerySet
+    serializer_class: type[Serializer]
+    values_serializer: ValuesSerializer
+
+
+def get_endpoints(season: Season) -> list[Endpoint]:
+    competitions = Competition.objects.filter(season=season).order_by("pk")
+    teams = TeamAtTournament.objects.filter(tournament__competition__season=season).order_by("pk")
+    return [
+        Endpoint(
+            "competitions",
+            competitions,
+            competitions.select_related("age_limit", "season", "division").prefetch_related(
+                Prefetch(
+                    "tournaments",
+                    queryset=Tournament.objects.order_by("pk"),
+                    to_attr="prefetched_tournaments",
+                ),
+                Prefetch(
+                    "applications",
+                    queryset=CompetitionApplication.objects.select_related("team__club")
+                    .filter(state=ApplicationStateEnum.ACCEPTED)
+                    .order_by("pk"),
+                    to_attr="prefetched_applications",
+                ),
+            ),
+            CompetitionSerializer,
+            competition_values,
+        ),
+        Endpoint(
+            "clubs",
+            Club.objects.order_by("pk"),
+            Club.objects.order_by("pk"),
+            ClubSerializer,
+            club_values,
+        ),
+        Endpoint(
+            "seasons",
+            Season.objects.order_by("pk"),
+            Season.objects.order_by("pk"),
+            SeasonSerializer,
+            season_values,
+        ),
+        Endpoint(
+            "teams-at-tournament",
+            teams,
+            teams.select_related("application__team").prefetch_related(
+                Prefetch(
+                    "members",
+                    queryset=MemberAtTournament.objects.select_related("member").order_by("pk"),
+                    to_attr="prefetched_members",
+                )
+            ),
+            TeamAtTournamentSerializer,
+            team_at_tournament_values,
+        ),
+    ]
+
+
+def serialize_with_model(endpoint: Endpoint) -> list:
+    return list(endpoint.serializer_class(endpoint.prefetched_queryset.all(), many=True).data)
+
+
+def serialize_values(endpoint: Endpoint) -> list:
+    return endpoint.values_serializer.serialize(
+        endpoint.values_serializer.values(endpoint.queryset)
+    )
+
+
+def _measure(
+    serialize: Callable[[Endpoint], list], endpoint: Endpoint, repeat: int
+) -> tuple[list, float, int]:
+    """Return the output, the best time of ``repeat`` runs and the number of queries."""
+    best = float("inf")
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            data = serialize(endpoint)
+            best = min(best, time.perf_counter() - started_at)
+    return data, best, len(queries)
+
+
+class Command(BaseCommand):
+    help = "Compare the model serializers and the values path of the API lists on a season"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("season", help="Name of the season, e.g. 2025")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs of each path")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        season = Season.objects.filter(name=options["season"]).first()
+        if season is None:
+            raise CommandError(f"Season {options['season']} does not exist")
+
+        for endpoint in get_endpoints(season):
+            model_data, model_time, model_queries = _measure(
+                serialize_with_model, endpoint, options["repeat"]
+            )
+            values_data, values_time, values_queries = _measure(
+                serialize_values, endpoint, options["repeat"]
+            )
+            if model_data != values_data:
+                raise CommandError(f"{endpoint.name}: the outputs differ")
+
+            self.stdout.write(
+                f"{endpoint.name}: {len(values_data)} rows, "
+                f"serializers {model_time * 1000:.1f} ms ({model_queries} queries), "
+                f"values {values_time * 1000:.1f} ms ({values_queries} queries), "
+                f"{model_time / values_time if values_time else 0:.1f}x"
+            )
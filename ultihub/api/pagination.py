@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.request import Request
+from rest_framework.views import APIView
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Cursor pagination of the list endpoints, newest rows first. Clients syncing changes can
+    page by the time of the last change with ``?ordering=updated_at`` (or ``-updated_at``).
+
+    While ``settings.API_UNPAGINATED_LISTS`` is on, requests without ``cursor`` and
+    ``page_size`` still get the whole unpaginated list, so existing clients keep working.
+    """
+
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    ordering = "-pk"
+    ordering_query_param = "ordering"
+    # The first field positions the cursor, the primary key keeps equal values in order
+    orderings = {
+        "-pk": ("-pk",),
+        "updated_at": ("updated_at", "pk"),
+        "-updated_at": ("-updated_at", "-pk"),
+    }
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: APIView | None = None
+    ) -> list | None:
+        if settings.API_UNPAGINATED_LISTS and not (
+            {self.cursor_query_param, self.page_size_query_param} & request.query_params.keys()
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(
+        self, request: Request, queryset: QuerySet, view: APIView | None
+    ) -> tuple[str, ...]:
+        ordering = request.query_params.get(self.ordering_query_param, self.ordering)
+        if ordering not in self.orderings:
+            raise ValidationError(
+                {self.ordering_query_param: f"Choose one of: {', '.join(self.orderings)}."}
+            )
+        return self.orderings[ordering]
@@ -0,0 +1,30 @@
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from typing import Any
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline delimited JSON, one item per line. Errors are rendered as a single line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: dict | None = None,
+    ) -> bytes:
+        return (json.dumps(data, cls=JSONEncoder, ensure_ascii=False) + "\n").encode()
+
+    def render_lines(self, items: Iterable[Any]) -> Iterator[bytes]:
+        for item in items:
+            yield self.render(item)
+
+    async def arender_lines(self, items: AsyncIterable[Any]) -> AsyncIterator[bytes]:
+        async for item in items:
+            yield self.render(item)
@@ -1,9 +1,17 @@
 from clubs.models import Club
-from competitions.models import Competition, CompetitionApplication, Season
+from competitions.enums import EnvironmentEnum
+from competitions.models import (
+    ApplicationStateEnum,
+    Competition,
+    CompetitionApplication,
+    Season,
+)
 from members.models import Member
 from rest_framework import serializers
 from tournaments.models import MemberAtTournament, TeamAtTournament, Tournament
 
+from api.values import Nested, Related, ValuesSerializer, column
+
 
 class SimpleClubSerializer(serializers.ModelSerializer):
     class Meta:
@@ -141,6 +149,40 @@ class TeamAtTournamentUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
+class TeamResultSerializer(TeamAtTournamentUpdateSerializer):
+    id = serializers.IntegerField()
+
+    class Meta(TeamAtTournamentUpdateSerializer.Meta):
+        fields = ["id", "final_placement", "spirit_avg"]
+
+
+class TournamentResultsSerializer(serializers.Serializer):
+    teams = TeamResultSerializer(many=True, allow_empty=False)
+
+    def validate_teams(self, value):  # type: ignore
+        tournament = self.context["tournament"]
+        ids = [result["id"] for result in value]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Each team can be listed only once.")
+
+        placements = dict(
+            tournament.teams.select_for_update().order_by("pk").values_list("id", "final_placement")
+        )
+        if unknown_ids := set(ids) - placements.keys():
+            raise serializers.ValidationError(
+                f"Teams {sorted(unknown_ids)} are not at this tournament."
+            )
+
+        # Placements are checked in the final state, including teams missing in the payload
+        for result in value:
+            if "final_placement" in result:
+                placements[result["id"]] = result["final_placement"]
+        assigned = [placement for placement in placements.values() if placement is not None]
+        if len(assigned) != len(set(assigned)):
+            raise serializers.ValidationError("Final placements must be unique.")
+        return value
+
+
 class CompetitionApplicationUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CompetitionApplication
@@ -166,3 +208,147 @@ class SeasonSerializer(serializers.ModelSerializer):
             "min_allowed_age",
             "age_reference_date",
         ]
+
+
+# Rows of the changefeed (api.changes), without the nested lists of the list endpoints
+
+
+class CompetitionChangeSerializer(CompetitionSerializer):
+    tournaments = None  # type: ignore[assignment]
+    accepted_applications = None  # type: ignore[assignment]
+
+    class Meta(CompetitionSerializer.Meta):
+        fields = ["id", "name", "environment", "division", "age_limit", "season"]
+
+
+class CompetitionApplicationChangeSerializer(CompetitionApplicationSerializer):
+    class Meta(CompetitionApplicationSerializer.Meta):
+        fields = [
+            "id",
+            "competition_id",
+            "state",
+            *CompetitionApplicationSerializer.Meta.fields[1:],
+        ]
+
+
+class TournamentChangeSerializer(TournamentSerializer):
+    class Meta(TournamentSerializer.Meta):
+        fields = ["id", "competition_id", *TournamentSerializer.Meta.fields[1:]]
+
+
+class TeamAtTournamentChangeSerializer(TeamAtTournamentSerializer):
+    members = None  # type: ignore[assignment]
+
+    class Meta(TeamAtTournamentSerializer.Meta):
+        fields = [
+            "id",
+            "tournament_id",
+            *(field for field in TeamAtTournamentSerializer.Meta.fields[1:] if field != "members"),
+        ]
+
+
+# Lean read serializers of the list endpoints (api.values), same output as the serializers above
+
+competition_values = ValuesSerializer(
+    {
+        "id": column("id"),
+        "name": column("name"),
+        "environment": column(
+            "environment", to_representation=lambda value: EnvironmentEnum(value).label
+        ),
+        "division": column("division__name"),
+        "age_limit": column("age_limit__name"),
+        "season": column("season__name"),
+        "tournaments": Related(
+            ValuesSerializer(
+                {
+                    name: column(name)
+                    for name in ["id", "name", "start_date", "end_date", "location"]
+                }
+            ),
+            Tournament.objects.all,
+            key="competition_id",
+        ),
+        "accepted_applications": Related(
+            ValuesSerializer(
+                {
+                    "id": column("id"),
+                    "team_name": column("team_name"),
+                    "final_placement": column("final_placement"),
+                    "team_id": column("team_id"),
+                    "club": Nested(
+                        {"id": column("team__club_id"), "name": column("team__club__name")}
+                    ),
+                }
+            ),
+            lambda: CompetitionApplication.objects.filter(state=ApplicationStateEnum.ACCEPTED),
+            key="competition_id",
+        ),
+    }
+)
+
+club_values = ValuesSerializer({name: column(name) for name in ClubSerializer.Meta.fields})
+
+season_values = ValuesSerializer({name: column(name) for name in SeasonSerializer.Meta.fields})
+
+member_summary = Nested(
+    {
+        "id": column("member_id"),
+        "full_name": column(
+            "member__last_name",
+            "member__first_name",
+            to_representation=lambda last_name, first_name: f"{last_name} {first_name}",
+        ),
+        "birth_year": column(
+            "member__birth_date", to_representation=lambda birth_date: birth_date.year
+        ),
+        "sex": column("member__sex"),
+    }
+)
+
+team_at_tournament_values = ValuesSerializer(
+    {
+        "id": column("id"),
+        "application_id": column("application_id"),
+        "team_id": column("application__team_id"),
+        "club_id": column("application__team__club_id"),
+        "team_name": column("application__team_name"),
+        "seeding": column("seeding"),
+        "final_placement": column("final_placement"),
+        "spirit_avg": column("spirit_avg"),
+        "members": Related(
+            ValuesSerializer(
+                {
+                    "jersey_number": column("jersey_number"),
+                    "is_captain": column("is_captain"),
+                    "is_spirit_captain": column("is_spirit_captain"),
+                    "is_coach": column("is_coach"),
+                    "member": member_summary,
+                }
+            ),
+            MemberAtTournament.objects.all,
+            key="team_at_tournament_id",
+        ),
+    }
+)
+
+# Lines of the season rosters export (/api/seasons/<id>/rosters.ndjson)
+roster_entry_values = ValuesSerializer(
+    {
+        "id": column("id"),
+        "tournament": Nested({"id": column("tournament_id"), "name": column("tournament__name")}),
+        "team": Nested(
+            {
+                "id": column("team_at_tournament_id"),
+                "team_id": column("team_at_tournament__application__team_id"),
+                "club_id": column("team_at_tournament__application__team__club_id"),
+                "name": column("team_at_tournament__application__team_name"),
+            }
+        ),
+        "member": member_summary,
+        "jersey_number": column("jersey_number"),
+        "is_captain": column("is_captain"),
+        "is_spirit_captain": column("is_spirit_captain"),
+        "is_coach": column("is_coach"),
+    }
+)
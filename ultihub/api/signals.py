@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import forget_tokens
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender: type[Token], instance: Token, **kwargs: object) -> None:
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_user_tokens(sender: type, instance: object, created: bool, **kwargs: object) -> None:
+    """Deactivation and any other change of the user replace the cached copy."""
+    if not created:
+        forget_tokens(*Token.objects.filter(user=instance).values_list("key", flat=True))
@@ -0,0 +1,121 @@
+"""
+Rate limits of the API, counted in the cache (Redis) with sliding windows. Each request
+costs ``throttle_cost`` of its view (1 by default), so expensive endpoints run out sooner.
+A client (the user, or the IP address of anonymous requests) has a budget for the whole API
+and a smaller one for each endpoint, see the ``client`` and ``endpoint`` rates in
+``DEFAULT_THROTTLE_RATES``. A refused request is not charged to either of them.
+
+A sliding window is approximated from two fixed windows: the count of the current one plus
+the count of the previous one weighted by its part still inside the sliding window. It takes
+two counters per budget and an atomic increment per request, whatever the request rate.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from ddtrace.trace import tracer
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+if TYPE_CHECKING:
+    # Throttles are imported while the views module is being set up
+    from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+
+
+@dataclass
+class Window:
+    key: str
+    limit: int
+    duration: int
+    elapsed: float = 0
+    previous: int = 0
+    current: int = 0
+
+    def charge(self, now: float, cost: int) -> float:
+        """Count the cost in and return the usage of the window, as a part of the limit."""
+        window, self.elapsed = divmod(now, self.duration)
+        current_key = f"{self.key}:{int(window)}"
+        # add() does nothing for an existing key, incr() is atomic in Redis
+        cache.add(current_key, 0, self.duration * 2)
+        self.current = cache.incr(current_key, cost)
+        self.previous = cache.get(f"{self.key}:{int(window) - 1}", 0)
+        return (self.previous * (1 - self.elapsed / self.duration) + self.current) / self.limit
+
+    def refund(self, now: float, cost: int) -> None:
+        self.current = cache.decr(f"{self.key}:{int(now // self.duration)}", cost)
+
+    def wait(self, cost: int) -> float:
+        """Seconds until the cost fits into the window again."""
+        available = self.limit - cost
+        if self.current + cost > self.limit:
+            # Only once the current window becomes the previous one
+            return (
+                self.duration
+                - self.elapsed
+                + self.duration * _part_to_expire(self.current, available)
+            )
+        return self.duration * _part_to_expire(self.previous, available - self.current) - (
+            self.elapsed
+        )
+
+
+def _part_to_expire(count: int, available: int) -> float:
+    """The part of a window to pass until a weighted ``count`` falls to ``available``."""
+    if count <= available:
+        return 0
+    return 1 - max(available, 0) / count
+
+
+class ApiThrottle(BaseThrottle):
+    timer = staticmethod(time.time)
+    rates = api_settings.DEFAULT_THROTTLE_RATES
+
+    def get_client(self, request: Request) -> str:
+        if request.user and request.user.is_authenticated:
+            return f"user-{request.user.pk}"
+        return f"ip-{self.get_ident(request)}"
+
+    def get_windows(self, request: Request, view: "APIView") -> list[Window]:
+        client = self.get_client(request)
+        keys = {
+            "client": f"api-throttle:client:{client}",
+            "endpoint": f"api-throttle:endpoint:{type(view).__name__}:{client}",
+        }
+        windows = []
+        for scope, key in keys.items():
+            if rate := self.rates.get(scope):
+                limit, period = rate.split("/")
+                windows.append(Window(key, int(limit), PERIODS[period[0]]))
+        return windows
+
+    def allow_request(self, request: Request, view: "APIView") -> bool:
+        self.cost = getattr(view, "throttle_cost", 1)
+        self.windows = self.get_windows(request, view)
+        now = self.timer()
+        usages = [window.charge(now, self.cost) for window in self.windows]
+        allowed = all(usage <= 1 for usage in usages)
+        if not allowed:
+            for window in self.windows:
+                window.refund(now, self.cost)
+            logger.warning("API request throttled: %s %s", self.get_client(request), request.path)
+        _record(usages, self.cost, allowed)
+        return allowed
+
+    def wait(self) -> float:
+        return max(window.wait(self.cost) for window in self.windows)
+
+
+def _record(usages: list[float], cost: int, allowed: bool) -> None:
+    # Exported as metrics of the request trace in production
+    if span := tracer.current_root_span():
+        span.set_metric("api.throttle.usage", max(usages, default=0))
+        span.set_metric("api.throttle.cost", cost)
+        span.set_tag("api.throttled", str(not allowed).lower())
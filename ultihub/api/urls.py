@@ -2,12 +2,15 @@ from core.views import sentry_tunnel_view
 from django.urls import path
 
 from api.views import (
+    ChangesView,
     ClubsView,
     CompetitionApplicationView,
     CompetitionsView,
+    SeasonRostersView,
     SeasonsView,
     TeamAtTournamentView,
     TeamsAtTournamentView,
+    TournamentResultsView,
 )
 
 app_name = "api"
@@ -33,6 +36,11 @@ urlpatterns = [
         TeamAtTournamentView.as_view(),
         name="team-at-tournament",
     ),
+    path(
+        "tournament/<int:pk>/results",
+        TournamentResultsView.as_view(),
+        name="tournament-results",
+    ),
     path(
         "competition-application/<int:pk>",
         CompetitionApplicationView.as_view(),
@@ -43,6 +51,16 @@ urlpatterns = [
         SeasonsView.as_view(),
         name="seasons",
     ),
+    path(
+        "seasons/<int:pk>/rosters.ndjson",
+        SeasonRostersView.as_view(),
+        name="season-rosters",
+    ),
+    path(
+        "changes",
+        ChangesView.as_view(),
+        name="changes",
+    ),
     path(
         "feedback",
         sentry_tunnel_view,
@@ -0,0 +1,192 @@
+"""
+Lean serialization of the read-only list endpoints. A ``ValuesSerializer`` declares the
+output fields as lookups of a ``.values()`` queryset, so rows are read as dictionaries and
+no model instances or DRF fields are built for them. Nested lists are fetched with one more
+``.values()`` query per relation for the whole page.
+
+The output is the same as of the ``ModelSerializer`` of the endpoint, clients pick a part of
+it with ``?fields=`` and ``?include=`` (see ``ValuesSerializer.select``). Fields left out are
+not queried at all, relations left out cost no query.
+"""
+
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import batched
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import QueryDict
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+# Rows always carry the fields the cursor pagination orders by
+PAGINATION_LOOKUPS = ("pk", "updated_at")
+
+_datetime_field = serializers.DateTimeField()
+
+
+def to_json(value: Any) -> Any:
+    """Represent a value from the database the same way as the DRF model fields do."""
+    if isinstance(value, datetime):
+        return _datetime_field.to_representation(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Decimal columns come back with the scale of the column, as DRF quantizes them
+        return str(value)
+    return value
+
+
+@dataclass(frozen=True)
+class Field:
+    """An output field computed from one or more lookups of the row."""
+
+    lookups: tuple[str, ...]
+    to_representation: Callable[..., Any] | None = None
+
+    def represent(self, row: dict[str, Any]) -> Any:
+        values = [row[lookup] for lookup in self.lookups]
+        if self.to_representation is None:
+            return to_json(values[0])
+        return self.to_representation(*values)
+
+
+def column(*lookups: str, to_representation: Callable[..., Any] | None = None) -> Field:
+    return Field(lookups, to_representation)
+
+
+@dataclass(frozen=True)
+class Nested:
+    """An output object built from lookups of the same row, e.g. a foreign key."""
+
+    fields: dict[str, Field]
+
+
+@dataclass(frozen=True)
+class Related:
+    """A list of related rows, ``key`` is the lookup of the parent id on them."""
+
+    serializer: "ValuesSerializer"
+    queryset: Callable[[], QuerySet]
+    key: str
+
+
+@dataclass(frozen=True)
+class ValuesSerializer:
+    fields: dict[str, Field | Nested | Related] = field(default_factory=dict)
+
+    @property
+    def relations(self) -> dict[str, Related]:
+        return {name: spec for name, spec in self.fields.items() if isinstance(spec, Related)}
+
+    def select(self, query_params: QueryDict) -> "ValuesSerializer":
+        """
+        Keep the fields listed in ``fields`` and the relations listed in ``include`` (both
+        comma separated). Without ``fields`` all plain fields are kept; without ``include``
+        only the relations listed in ``fields`` are. Without either, everything is kept.
+        """
+        requested_fields = _split(query_params.get("fields"))
+        requested_include = _split(query_params.get("include"))
+        if requested_fields is None and requested_include is None:
+            return self
+
+        if unknown := (requested_fields or set()) - self.fields.keys():
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}."})
+        if unknown := (requested_include or set()) - self.relations.keys():
+            raise ValidationError({"include": f"Unknown relations: {', '.join(sorted(unknown))}."})
+
+        if requested_fields is None:
+            requested_fields = self.fields.keys() - self.relations.keys()
+        selected = requested_fields | (requested_include or set())
+        return ValuesSerializer(
+            {name: spec for name, spec in self.fields.items() if name in selected}
+        )
+
+    def lookups(self) -> list[str]:
+        lookups = dict.fromkeys(PAGINATION_LOOKUPS)
+        for spec in self.fields.values():
+            if isinstance(spec, Field):
+                lookups.update(dict.fromkeys(spec.lookups))
+            elif isinstance(spec, Nested):
+                for nested in spec.fields.values():
+                    lookups.update(dict.fromkeys(nested.lookups))
+        return list(lookups)
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        return queryset.values(*self.lookups())
+
+    def serialize(self, rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+        rows = list(rows)
+        related_rows = {
+            name: self._fetch_related(relation, [row["pk"] for row in rows])
+            for name, relation in self.relations.items()
+        }
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, spec in self.fields.items():
+                if isinstance(spec, Field):
+                    item[name] = spec.represent(row)
+                elif isinstance(spec, Nested):
+                    item[name] = {key: nested.represent(row) for key, nested in spec.fields.items()}
+                else:
+                    item[name] = related_rows[name].get(row["pk"], [])
+            data.append(item)
+        return data
+
+    def stream(self, queryset: QuerySet, chunk_size: int) -> Iterator[dict[str, Any]]:
+        """
+        Serialize the rows one chunk at a time from a server-side cursor, so memory stays
+        constant however many rows there are. Relations cost one query per chunk.
+        """
+        for rows in batched(self.values(queryset).iterator(chunk_size=chunk_size), chunk_size):
+            yield from self.serialize(rows)
+
+    async def astream(self, queryset: QuerySet, chunk_size: int) -> AsyncIterator[dict[str, Any]]:
+        """
+        ``stream`` for ASGI, where a sync iterator would be read whole before the response
+        starts. Each chunk is fetched in a thread by a keyset query after the last pk, so no
+        cursor stays open between chunks. The queryset must be ordered by pk.
+        """
+        last_pk = None
+        while True:
+            rows, items = await sync_to_async(self._fetch_chunk)(queryset, last_pk, chunk_size)
+            for item in items:
+                yield item
+            if len(rows) < chunk_size:
+                return
+            last_pk = rows[-1]["pk"]
+
+    def _fetch_chunk(
+        self, queryset: QuerySet, after: int | None, chunk_size: int
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        rows = list(self.values(queryset)[:chunk_size])
+        return rows, self.serialize(rows)
+
+    @staticmethod
+    def _fetch_related(relation: Related, ids: list[int]) -> dict[int, list[dict[str, Any]]]:
+        if not ids:
+            return {}
+        rows = list(
+            relation.queryset()
+            .filter(**{f"{relation.key}__in": ids})
+            .values(*dict.fromkeys([relation.key, *relation.serializer.lookups()]))
+            .order_by("pk")
+        )
+        grouped = defaultdict(list)
+        for row, item in zip(rows, relation.serializer.serialize(rows), strict=True):
+            grouped[row[relation.key]].append(item)
+        return grouped
+
+
+def _split(value: str | None) -> set[str] | None:
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
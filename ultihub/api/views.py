@@ -1,14 +1,33 @@
-from clubs.models import Club
-from competitions.models import ApplicationStateEnum, Competition, CompetitionApplication, Season
+from collections.abc import AsyncIterator, Callable, Iterator
+
+from clubs.models import Club, Team
+from competitions.models import (
+    AgeLimit,
+    Competition,
+    CompetitionApplication,
+    Division,
+    Season,
+)
+from core.conditional import conditional_response
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Prefetch, QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from django.utils.decorators import method_decorator
 from django_filters.rest_framework import CharFilter, DjangoFilterBackend, FilterSet
+from members.models import Member
 from rest_framework.exceptions import ValidationError
-from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView
+from rest_framework.generics import GenericAPIView, ListAPIView, RetrieveUpdateAPIView
 from rest_framework.permissions import AllowAny, BasePermission, IsAuthenticated
 from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 from tournaments.models import MemberAtTournament, TeamAtTournament, Tournament
+from tournaments.services import update_results
 
+from .changes import Cursor, get_changes, serialize_changes
+from .renderers import NDJSONRenderer
 from .serializers import (
     ClubSerializer,
     CompetitionApplicationSerializer,
@@ -17,7 +36,18 @@ from .serializers import (
     SeasonSerializer,
     TeamAtTournamentSerializer,
     TeamAtTournamentUpdateSerializer,
+    TeamResultSerializer,
+    TournamentResultsSerializer,
+    club_values,
+    competition_values,
+    roster_entry_values,
+    season_values,
+    team_at_tournament_values,
 )
+from .values import ValuesSerializer
+
+# Rows read from the server-side cursor at once by the streaming exports
+STREAM_CHUNK_SIZE = 2000
 
 
 class CompetitionsFilter(FilterSet):
@@ -28,38 +58,77 @@ class CompetitionsFilter(FilterSet):
         fields = ["season"]
 
 
-class CompetitionsView(ListAPIView):
-    queryset = (
-        Competition.objects.select_related("age_limit", "season", "division")
-        .prefetch_related(
-            Prefetch(
-                "tournaments",
-                queryset=Tournament.objects.all(),
-                to_attr="prefetched_tournaments",
-            ),
-            Prefetch(
-                "applications",
-                queryset=CompetitionApplication.objects.select_related("team", "team__club").filter(
-                    state=ApplicationStateEnum.ACCEPTED
-                ),
-                to_attr="prefetched_applications",
-            ),
-        )
-        .order_by("-pk")
+def api_conditional_response(get_querysets: Callable[..., list[QuerySet] | None]) -> Callable:
+    """Conditional GET of public read endpoints, cacheable by proxies for a short time."""
+    return method_decorator(
+        conditional_response(get_querysets, public=True, max_age=settings.API_CACHE_MAX_AGE),
+        name="get",
     )
+
+
+class ValuesListMixin:
+    """
+    List rows read by ``values_serializer`` (see ``api.values``), with ``?fields=`` and
+    ``?include=`` picking a part of them. ``serializer_class`` only describes the output.
+    """
+
+    values_serializer: ValuesSerializer
+
+    def list(self, request: Request, *args: object, **kwargs: object) -> Response:
+        serializer = self.values_serializer.select(request.query_params)
+        rows = serializer.values(self.filter_queryset(self.get_queryset()))  # type: ignore[attr-defined]
+        page = self.paginate_queryset(rows)  # type: ignore[attr-defined]
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))  # type: ignore[attr-defined]
+        return Response(serializer.serialize(rows))
+
+
+def _teams_at_tournament_querysets(request: HttpRequest) -> list[QuerySet] | None:
+    tournament_id = request.GET.get("tournament_id", "")
+    if not tournament_id.isdigit():
+        return None
+    return [
+        TeamAtTournament.objects.filter(tournament_id=tournament_id),
+        CompetitionApplication.objects.filter(teamattournament__tournament_id=tournament_id),
+        Team.objects.filter(applications__teamattournament__tournament_id=tournament_id),
+        MemberAtTournament.objects.filter(tournament_id=tournament_id),
+        Member.objects.filter(memberattournament__tournament_id=tournament_id),
+    ]
+
+
+@api_conditional_response(
+    lambda request: [
+        Competition.objects.all(),
+        Tournament.objects.all(),
+        CompetitionApplication.objects.all(),
+        Club.objects.all(),
+        Season.objects.all(),
+        Division.objects.all(),
+        AgeLimit.objects.all(),
+    ]
+)
+class CompetitionsView(ValuesListMixin, ListAPIView):
+    queryset = Competition.objects.order_by("-pk")
     serializer_class = CompetitionSerializer
+    values_serializer = competition_values
+    throttle_cost = 10
     filterset_class = CompetitionsFilter
 
 
-class ClubsView(ListAPIView):
+@api_conditional_response(lambda request: [Club.objects.all()])
+class ClubsView(ValuesListMixin, ListAPIView):
     queryset = Club.objects.all()
     serializer_class = ClubSerializer
+    values_serializer = club_values
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["id"]
 
 
-class TeamsAtTournamentView(ListAPIView):
+@api_conditional_response(_teams_at_tournament_querysets)
+class TeamsAtTournamentView(ValuesListMixin, ListAPIView):
     serializer_class = TeamAtTournamentSerializer
+    values_serializer = team_at_tournament_values
+    throttle_cost = 3
 
     def get_queryset(self) -> QuerySet:
         tournament_id = self.request.GET.get("tournament_id")
@@ -67,17 +136,7 @@ class TeamsAtTournamentView(ListAPIView):
         if not tournament_id:
             raise ValidationError({"tournament_id": "This parameter is required."})
 
-        return (
-            TeamAtTournament.objects.select_related("application", "application__team")
-            .prefetch_related(
-                Prefetch(
-                    "members",
-                    queryset=MemberAtTournament.objects.select_related("member"),
-                    to_attr="prefetched_members",
-                )
-            )
-            .filter(tournament_id=tournament_id)
-        )
+        return TeamAtTournament.objects.filter(tournament_id=tournament_id)
 
 
 class HttpMethodPermissionsMixin:
@@ -110,6 +169,27 @@ class TeamAtTournamentView(HttpMethodPermissionsMixin, RetrieveUpdateAPIView):
         return TeamAtTournamentSerializer
 
 
+class TournamentResultsView(GenericAPIView):
+    """Set final placements and spirit averages of many teams at the tournament at once."""
+
+    queryset = Tournament.objects.all()
+    serializer_class = TournamentResultsSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ["post", "options"]
+
+    def post(self, request: Request, *args: object, **kwargs: object) -> Response:
+        tournament = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data, context={**self.get_serializer_context(), "tournament": tournament}
+        )
+        # The placements are validated against locked teams, so concurrent uploads cannot
+        # both pass and no team disappears before it is saved
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            teams = update_results(tournament, serializer.validated_data["teams"])
+        return Response({"teams": TeamResultSerializer(teams, many=True).data})
+
+
 class CompetitionApplicationView(HttpMethodPermissionsMixin, RetrieveUpdateAPIView):
     # Only GET and PATCH are exposed; PUT is intentionally excluded.
     http_method_names = ["get", "patch", "options", "head"]
@@ -121,6 +201,71 @@ class CompetitionApplicationView(HttpMethodPermissionsMixin, RetrieveUpdateAPIVi
         return CompetitionApplicationSerializer
 
 
-class SeasonsView(ListAPIView):
+@api_conditional_response(lambda request: [Season.objects.all()])
+class SeasonsView(ValuesListMixin, ListAPIView):
     queryset = Season.objects.all()
     serializer_class = SeasonSerializer
+    values_serializer = season_values
+
+
+class ChangesView(GenericAPIView):
+    """
+    Changes of competitions, applications, tournaments, teams at tournaments and clubs
+    after the ``since`` cursor, oldest first (see ``api.changes``).
+    """
+
+    permission_classes = [AllowAny]
+    http_method_names = ["get", "options", "head"]
+    throttle_cost = 3
+
+    def get(self, request: Request, *args: object, **kwargs: object) -> Response:
+        since = None
+        if value := request.query_params.get("since"):
+            try:
+                since = Cursor.decode(value)
+            except ValueError:
+                raise ValidationError({"since": "Invalid cursor."}) from None
+
+        page_size = request.query_params.get("page_size", "")
+        limit = min(int(page_size), settings.API_MAX_PAGE_SIZE) if page_size.isdigit() else 0
+        changes, has_more = get_changes(since, limit or settings.API_PAGE_SIZE)
+
+        next_cursor = changes[-1].cursor.encode() if changes else value or None
+        return Response(
+            {"results": serialize_changes(changes), "next": next_cursor, "has_more": has_more}
+        )
+
+
+class SeasonRostersView(GenericAPIView):
+    """
+    All roster entries of the season's tournaments as newline delimited JSON, one entry per
+    line in the order of ids. An interrupted download is resumed with ``?after=<last id>``.
+    """
+
+    queryset = Season.objects.all()
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [NDJSONRenderer]
+    throttle_cost = 30
+    http_method_names = ["get", "options", "head"]
+
+    def get(self, request: Request, *args: object, **kwargs: object) -> StreamingHttpResponse:
+        season = self.get_object()
+        after = request.query_params.get("after", "0")
+        if not after.isdigit():
+            raise ValidationError({"after": "A roster entry id is required."})
+
+        entries = MemberAtTournament.objects.filter(
+            tournament__competition__season=season, pk__gt=int(after)
+        ).order_by("pk")
+        renderer = NDJSONRenderer()
+        content: Iterator[bytes] | AsyncIterator[bytes]
+        if isinstance(request._request, ASGIRequest):
+            content = renderer.arender_lines(
+                roster_entry_values.astream(entries, STREAM_CHUNK_SIZE)
+            )
+        else:
+            content = renderer.render_lines(roster_entry_values.stream(entries, STREAM_CHUNK_SIZE))
+        response = StreamingHttpResponse(content, content_type=NDJSONRenderer.media_type)
+        # Let the proxy pass the lines on as they come
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,26 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clubs", "0015_alter_club_email"),
+        ("users", "0005_agent_notification_delivery"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clubnotification",
+            name="is_digest_pending",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="clubnotification",
+            index=models.Index(
+                condition=models.Q(("is_digest_pending", True)),
+                fields=["agent_at_club"],
+                name="club_notification_digest_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 6.0.6 on 2026-10-19 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clubs", "0016_clubnotification_is_digest_pending"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="club",
+            index=models.Index(fields=["updated_at", "id"], name="club_updated_at_idx"),
+        ),
+    ]
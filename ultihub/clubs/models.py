@@ -52,6 +52,8 @@ class Club(AuditModel):
 
     class Meta:
         permissions = (("manage_club", "Can manage club"),)
+        # Changefeed of the API (api.changes)
+        indexes = [models.Index(fields=["updated_at", "id"], name="club_updated_at_idx")]
 
     def __str__(self) -> str:
         return self.short_name_or_name
@@ -120,6 +122,17 @@ class ClubNotification(AuditModel):
     subject = models.CharField(max_length=64)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
+    # Waiting to be emailed in the next digest of an agent with digest delivery
+    is_digest_pending = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["agent_at_club"],
+                condition=models.Q(is_digest_pending=True),
+                name="club_notification_digest_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"<ClubNotification({self.pk}, agent={self.agent_at_club})>"
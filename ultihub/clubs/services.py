@@ -1,7 +1,10 @@
 import logging
+from collections import defaultdict
 
 from core.tasks import send_email
-from users.models import AgentAtClub
+from django.db.models import Q
+from django.template.loader import render_to_string
+from users.models import Agent, AgentAtClub, NotificationDeliveryEnum
 
 from clubs.models import Club, ClubNotification
 
@@ -11,16 +14,74 @@ logger = logging.getLogger(__name__)
 def notify_club(club: Club, subject: str, message: str) -> None:
     logger.info("Notifying club %s about %s", club.name, subject)
 
-    club_agents = AgentAtClub.objects.filter(club=club, is_active=True)
+    club_agents = list(
+        AgentAtClub.objects.filter(club=club, is_active=True).select_related("agent__user")
+    )
     ClubNotification.objects.bulk_create(
         [
-            ClubNotification(agent_at_club=agent_at_club, subject=subject, message=message)
+            ClubNotification(
+                agent_at_club=agent_at_club,
+                subject=subject,
+                message=message,
+                is_digest_pending=(
+                    agent_at_club.agent.has_email_notifications_enabled
+                    and agent_at_club.agent.notification_delivery
+                    != NotificationDeliveryEnum.IMMEDIATE
+                ),
+            )
             for agent_at_club in club_agents
         ]
     )
 
-    agents_with_email = club_agents.filter(
-        agent__has_email_notifications_enabled=True
-    ).select_related("agent__user")
-    for agent_at_club in agents_with_email:
-        send_email(subject, message, to=[agent_at_club.agent.user.email])
+    for agent_at_club in club_agents:
+        agent = agent_at_club.agent
+        if (
+            agent.has_email_notifications_enabled
+            and agent.notification_delivery == NotificationDeliveryEnum.IMMEDIATE
+        ):
+            send_email(subject, message, to=[agent.user.email])
+
+
+def send_notification_digests(delivery: NotificationDeliveryEnum) -> int:
+    """
+    Email one digest per agent with all notifications collected since the last digest.
+    Returns the number of sent digests.
+    """
+    # Agents who turned digests off since get none, their collected notifications are dropped
+    ClubNotification.objects.filter(is_digest_pending=True).filter(
+        Q(agent_at_club__agent__notification_delivery=NotificationDeliveryEnum.IMMEDIATE)
+        | Q(agent_at_club__agent__has_email_notifications_enabled=False)
+    ).update(is_digest_pending=False)
+
+    notifications = (
+        ClubNotification.objects.filter(
+            is_digest_pending=True,
+            agent_at_club__agent__notification_delivery=delivery,
+            agent_at_club__agent__has_email_notifications_enabled=True,
+        )
+        .select_related("agent_at_club__agent__user", "agent_at_club__club")
+        .order_by("created_at")
+    )
+
+    notifications_by_agent: dict[Agent, list[ClubNotification]] = defaultdict(list)
+    for notification in notifications:
+        notifications_by_agent[notification.agent_at_club.agent].append(notification)
+
+    for agent, agent_notifications in notifications_by_agent.items():
+        body = render_to_string(
+            "emails/notification_digest.html", {"notifications": agent_notifications}
+        )
+        send_email(
+            f"Notifications digest ({len(agent_notifications)})", body, to=[agent.user.email]
+        )
+        ClubNotification.objects.filter(
+            pk__in=[notification.pk for notification in agent_notifications]
+        ).update(is_digest_pending=False)
+
+    logger.info(
+        "Sent %d %s emails with %d notifications",
+        len(notifications_by_agent),
+        NotificationDeliveryEnum(delivery).label.lower(),
+        sum(len(items) for items in notifications_by_agent.values()),
+    )
+    return len(notifications_by_agent)
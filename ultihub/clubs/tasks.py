@@ -0,0 +1,15 @@
+from core.queues import MAINTENANCE, db_periodic_task
+from huey import crontab
+from users.models import NotificationDeliveryEnum
+
+from clubs.services import send_notification_digests
+
+
+@db_periodic_task(crontab(minute="0"), queue=MAINTENANCE)
+def send_hourly_notification_digests() -> None:
+    send_notification_digests(NotificationDeliveryEnum.HOURLY_DIGEST)
+
+
+@db_periodic_task(crontab(minute="0", hour="7"), queue=MAINTENANCE)
+def send_daily_notification_digests() -> None:
+    send_notification_digests(NotificationDeliveryEnum.DAILY_DIGEST)
@@ -9,12 +9,14 @@ from django.db.models import QuerySet, Subquery
 from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import URLPattern, path, reverse
+from django.utils import timezone
 from finance.tasks import (
     calculate_season_fees_and_generate_invoices,
     calculate_season_fees_for_check,
 )
 from members.tasks import generate_nsa_export
 from tournaments.models import TeamAtTournament, Tournament
+from tournaments.services import update_counters
 
 from competitions.enums import ApplicationStateEnum
 from competitions.forms import AddTeamsToTournamentForm
@@ -250,6 +252,9 @@ class CompetitionApplicationAdmin(AuditlogMixin, admin.ModelAdmin):
                     )
                     return HttpResponseRedirect(request.get_full_path())
 
+                # bulk_create skips the signals maintaining the counter
+                update_counters(Tournament, tournament_id, team_count=len(created_instances))
+
                 logger.info(
                     "Applications %s (%s) added to tournament %s",
                     application_ids,
@@ -282,10 +287,10 @@ class CompetitionApplicationAdmin(AuditlogMixin, admin.ModelAdmin):
     @transaction.atomic
     @admin.display(description="Approve selected applications")
     def approve(self, request: HttpRequest, queryset: QuerySet) -> None:
-        queryset.update(state=ApplicationStateEnum.ACCEPTED)
+        queryset.update(state=ApplicationStateEnum.ACCEPTED, updated_at=timezone.now())
         self.message_user(request, "Applications approved")
 
     @admin.display(description="Decline selected applications")
     def decline(self, request: HttpRequest, queryset: QuerySet) -> None:
-        queryset.update(state=ApplicationStateEnum.DECLINED)
+        queryset.update(state=ApplicationStateEnum.DECLINED, updated_at=timezone.now())
         self.message_user(request, "Applications declined")
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.6 on 2026-10-19 15:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clubs", "0017_updated_at_indexes"),
+        ("competitions", "0014_competition_allow_team_transfers"),
+        ("finance", "0009_invoice_resend_backoff"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="competition",
+            index=models.Index(fields=["updated_at", "id"], name="competition_updated_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="competitionapplication",
+            index=models.Index(fields=["updated_at", "id"], name="application_updated_at_idx"),
+        ),
+    ]
@@ -142,6 +142,8 @@ class Competition(AuditModel):
 
     class Meta:
         unique_together = ("name", "season", "environment", "division", "age_limit")
+        # Changefeed of the API (api.changes)
+        indexes = [models.Index(fields=["updated_at", "id"], name="competition_updated_at_idx")]
 
     def __str__(self) -> str:
         name = f"BEACH {self.name}" if self.environment == EnvironmentEnum.BEACH else self.name
@@ -202,6 +204,8 @@ class CompetitionApplication(AuditModel):
 
     class Meta:
         unique_together = ("competition", "team")
+        # Changefeed of the API (api.changes)
+        indexes = [models.Index(fields=["updated_at", "id"], name="application_updated_at_idx")]
 
     def __str__(self) -> str:
         return f"{self.team_name} ({self.competition})"
@@ -5,7 +5,7 @@ from django.contrib import admin
 from django.http import HttpRequest
 from solo.admin import SingletonModelAdmin
 
-from core.models import AppSettings
+from core.models import AppSettings, OutgoingEmail, TaskRun
 
 
 class AuditlogMixin(AuditlogHistoryAdminMixin):
@@ -28,3 +28,18 @@ class ReadOnlyModelAdmin(admin.ModelAdmin):
 @admin.register(AppSettings)
 class AppSettingsAdmin(SingletonModelAdmin):
     pass
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(ReadOnlyModelAdmin):
+    list_display = ("id", "subject", "to", "attempts", "created_at", "sent_at", "failed_at")
+    exclude = ("body", "csv_data")
+    ordering = ("-id",)
+
+
+@admin.register(TaskRun)
+class TaskRunAdmin(ReadOnlyModelAdmin):
+    list_display = ("id", "name", "queue", "state", "duration", "queue_wait", "created_at")
+    list_filter = ("queue", "state", "name")
+    search_fields = ("name", "task_id")
+    ordering = ("-id",)
@@ -0,0 +1,106 @@
+"""
+Conditional GET. The validators of a response (ETag and Last-Modified) are derived from the
+latest ``updated_at`` and the row count of the querysets the response is built from, all
+fetched in one aggregate query. A client or a proxy holding a current copy gets
+``304 Not Modified`` before the view queries and renders anything.
+
+The row count catches deletions, which leave no ``updated_at`` behind. Changes made by
+queryset updates are only seen when they set ``updated_at`` too.
+"""
+
+import hashlib
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from functools import wraps
+from typing import Any, NamedTuple
+
+from django.contrib.messages import get_messages
+from django.db.models import Count, IntegerField, Max, QuerySet, Value
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from core.helpers import get_current_club_or_none
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+
+def get_validators(querysets: Iterable[QuerySet], *extra: Any) -> Validators:
+    """
+    Return the validators of a response built from ``querysets``. ``extra`` are other values
+    the response depends on (e.g. the current user).
+    """
+    parts = [
+        # Without GROUP BY, each part is a single row even for an empty queryset
+        queryset.order_by()
+        .annotate(position=Value(position, output_field=IntegerField()))
+        .values("position")
+        .annotate(last_updated_at=Max("updated_at"), count=Count("pk"))
+        .values_list("position", "last_updated_at", "count")
+        for position, queryset in enumerate(querysets)
+    ]
+    rows = sorted(parts[0].union(*parts[1:], all=True)) if parts else []
+
+    digest = hashlib.sha256(repr((rows, extra)).encode()).hexdigest()
+    last_modified = max((row[1] for row in rows if row[1] is not None), default=None)
+    return Validators(etag=digest[:32], last_modified=last_modified)
+
+
+def conditional_response(
+    get_querysets: Callable[..., Iterable[QuerySet] | None],
+    *,
+    vary_on_user: bool = False,
+    **cache_control: Any,
+) -> Callable:
+    """
+    Answer conditional GET requests of the decorated view. ``get_querysets`` takes the
+    arguments of the view and returns the querysets its response is built from, or None
+    when the request cannot be answered conditionally. Pages rendered differently for
+    each user pass ``vary_on_user``; such a page is not answered conditionally while flash
+    messages wait to be shown on it. ``cache_control`` is added to the ``Cache-Control``
+    header of every response, including 304.
+    """
+
+    def get_request_validators(
+        request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> Validators | None:
+        # Django asks for the ETag and Last-Modified separately, the query runs only once
+        if not hasattr(request, "_conditional_validators"):
+            # The length does not mark the messages as shown
+            if vary_on_user and len(get_messages(request)):
+                querysets = None
+            else:
+                querysets = get_querysets(request, *args, **kwargs)
+            extra: tuple[Any, ...] = ()
+            if vary_on_user:
+                club = get_current_club_or_none(request)
+                extra = (request.user.pk, club.id if club else None)
+            request._conditional_validators = (  # type: ignore[attr-defined]
+                None if querysets is None else get_validators(querysets, *extra)
+            )
+        return request._conditional_validators  # type: ignore[attr-defined]
+
+    def etag(request: HttpRequest, *args: Any, **kwargs: Any) -> str | None:
+        validators = get_request_validators(request, *args, **kwargs)
+        return validators.etag if validators else None
+
+    def last_modified(request: HttpRequest, *args: Any, **kwargs: Any) -> datetime | None:
+        validators = get_request_validators(request, *args, **kwargs)
+        return validators.last_modified if validators else None
+
+    def decorator(view: Callable) -> Callable:
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def inner(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+            response = conditional_view(request, *args, **kwargs)
+            if cache_control and response.status_code in (200, 304):
+                patch_cache_control(response, **cache_control)
+            return response
+
+        return inner
+
+    return decorator
@@ -23,6 +23,10 @@ def get_current_club(request: HttpRequest) -> SessionClub:
     return SessionClub(**request.session.get("club", {}))
 
 
+async def aget_current_club(request: HttpRequest) -> SessionClub:
+    return SessionClub(**await request.session.aget("club", {}))
+
+
 def get_current_club_or_none(request: HttpRequest) -> SessionClub | None:
     try:
         return get_current_club(request)
@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from core.queues import QUEUES, get_queue_stats
+
+
+class Command(BaseCommand):
+    help = "Show the depth and the age of the oldest pending task of each Huey queue"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.stdout.write(f"{'Queue':<14}{'Pending':>10}{'Scheduled':>12}{'Oldest':>12}")
+        for name, huey in QUEUES.items():
+            stats = get_queue_stats(huey)
+            oldest = "-" if stats["oldest_age"] is None else f"{stats['oldest_age']:.0f}s"
+            self.stdout.write(
+                f"{name:<14}{stats['pending']:>10}{stats['scheduled']:>12}{oldest:>12}"
+            )
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import statistics
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from typing import Any
+
+import httpx
+from django.core.management.base import BaseCommand
+
+DEFAULT_PATHS = ["/api/competitions", "/api/clubs", "/api/seasons"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a running server with concurrent GET requests and report its throughput, "
+        "e.g. to compare SERVER_MODE=wsgi and asgi with the same number of workers. Raise "
+        "the API throttle rates of the server first, all requests come from one address."
+    )
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("base_url", help="e.g. http://localhost:8000")
+        parser.add_argument("--path", action="append", dest="paths", help="Repeatable")
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--duration", type=float, default=30, help="Seconds")
+        parser.add_argument("--workers", type=int, default=1, help="Workers of the server")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        # httpx logs every request at INFO
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        latencies, statuses = asyncio.run(
+            _run(
+                options["base_url"],
+                options["paths"] or DEFAULT_PATHS,
+                options["concurrency"],
+                options["duration"],
+            )
+        )
+        # The percentiles need at least two latencies
+        if len(latencies) < 2:
+            self.stdout.write(f"Too few requests finished ({len(latencies)}), run longer")
+            return
+
+        throughput = len(latencies) / options["duration"]
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"{len(latencies)} requests, {throughput:.1f} req/s, "
+            f"{throughput / options['workers']:.1f} req/s per worker"
+        )
+        self.stdout.write(
+            f"latency p50 {quantiles[49] * 1000:.0f} ms, p95 {quantiles[94] * 1000:.0f} ms, "
+            f"max {max(latencies) * 1000:.0f} ms"
+        )
+        self.stdout.write(
+            "statuses: " + ", ".join(f"{status}: {count}" for status, count in statuses.items())
+        )
+
+
+async def _run(
+    base_url: str, paths: list[str], concurrency: int, duration: float
+) -> tuple[list[float], Counter]:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async def client_loop(client: httpx.AsyncClient, offset: int) -> None:
+        request_number = offset
+        while time.monotonic() < deadline:
+            started_at = time.monotonic()
+            try:
+                response = await client.get(paths[request_number % len(paths)])
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as error:
+                statuses[type(error).__name__] += 1
+                continue
+            finally:
+                request_number += 1
+            latencies.append(time.monotonic() - started_at)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await asyncio.gather(*(client_loop(client, offset) for offset in range(concurrency)))
+    return latencies, statuses
@@ -0,0 +1,48 @@
+import logging
+from argparse import ArgumentParser
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+from huey.consumer_options import ConsumerConfig, OptionParserHandler
+
+from core.queues import QUEUES
+
+
+class Command(BaseCommand):
+    help = "Run the consumer of one named Huey queue (see core.queues)"
+
+    def add_arguments(self, parser: ArgumentParser) -> None:
+        parser.add_argument("queue", choices=list(QUEUES))
+        option_handler = OptionParserHandler()
+        for short, full, kwargs in [
+            *option_handler.get_logging_options(),
+            *option_handler.get_worker_options(),
+            *option_handler.get_scheduler_options(),
+        ]:
+            if short == "-v":
+                short, full = "-V", "--huey-verbose"
+            if "type" in kwargs:
+                kwargs["type"] = {"int": int, "float": float}[kwargs["type"]]
+            kwargs.setdefault("default", None)
+            parser.add_argument(full, short, **kwargs)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        queue = options.pop("queue")
+        consumer_options = dict(settings.HUEY_QUEUES[queue])
+        for key, value in options.items():
+            if value is not None:
+                consumer_options[key] = value
+        consumer_options.setdefault("verbose", consumer_options.pop("huey_verbose", None))
+
+        # Tasks register themselves on their queue when their module is imported
+        autodiscover_modules("tasks")
+
+        config = ConsumerConfig(**consumer_options)
+        config.validate()
+        logger = logging.getLogger("huey")
+        if not logger.handlers:
+            config.setup_logger(logger)
+
+        QUEUES[queue].create_consumer(**config.values).run()
@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from core.sentry_tunnel import BUFFER_SIZE, get_stats
+
+
+class Command(BaseCommand):
+    help = "Show the buffer of the Sentry tunnel and the counts of forwarded and dropped envelopes"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stats = get_stats()
+        self.stdout.write(f"{'buffered':<22}{stats.pop('buffered'):>8} / {BUFFER_SIZE}")
+        for name, count in stats.items():
+            self.stdout.write(f"{name:<22}{count:>8}")
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("task_id", models.CharField(max_length=36)),
+                ("name", models.CharField(max_length=128)),
+                ("queue", models.CharField(max_length=16)),
+                (
+                    "state",
+                    models.IntegerField(choices=[(1, "Complete"), (2, "Retrying"), (3, "Failed")]),
+                ),
+                (
+                    "queue_wait",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Seconds between enqueueing and the start of the run",
+                        null=True,
+                    ),
+                ),
+                ("duration", models.FloatField(help_text="Seconds")),
+                ("retries_left", models.PositiveSmallIntegerField(default=0)),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["name", "-id"], name="task_run_name_idx")],
+            },
+        ),
+    ]
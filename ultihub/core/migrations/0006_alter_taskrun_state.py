@@ -0,0 +1,19 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_taskrun"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="taskrun",
+            name="state",
+            field=models.IntegerField(
+                choices=[(1, "Complete"), (2, "Retrying"), (3, "Failed"), (4, "Skipped (locked)")]
+            ),
+        ),
+    ]
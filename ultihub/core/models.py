@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from solo.models import SingletonModel
 
 
@@ -10,6 +11,61 @@ class AuditModel(models.Model):
         abstract = True
 
 
+class OutgoingEmail(AuditModel):
+    """An email waiting in the outbox, delivered in batches by ``flush_email_outbox``."""
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    to = models.JSONField(default=list)
+    csv_data = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True, failed_at__isnull=True),
+                name="outgoing_email_pending_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"<OutgoingEmail({self.pk}, to={self.to})>"
+
+
+class TaskRunStateEnum(models.IntegerChoices):
+    COMPLETE = 1, "Complete"
+    RETRYING = 2, "Retrying"
+    FAILED = 3, "Failed"
+    LOCKED = 4, "Skipped (locked)"
+
+
+class TaskRun(AuditModel):
+    """One execution of a Huey task; only the last ``TASK_RUN_HISTORY`` runs per task are kept."""
+
+    task_id = models.CharField(max_length=36)
+    name = models.CharField(max_length=128)
+    queue = models.CharField(max_length=16)
+    state = models.IntegerField(choices=TaskRunStateEnum.choices)
+    queue_wait = models.FloatField(
+        null=True, blank=True, help_text="Seconds between enqueueing and the start of the run"
+    )
+    duration = models.FloatField(help_text="Seconds")
+    retries_left = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["name", "-id"], name="task_run_name_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"<TaskRun({self.pk}, name={self.name})>"
+
+
 class AppSettings(SingletonModel):
     email_required = models.BooleanField(
         default=False,
@@ -0,0 +1,177 @@
+"""
+Named Huey queues. Each queue is a separate Huey instance with its own consumer, so a long
+bulk job (an export, a season-wide invoicing run) cannot delay an interactive email.
+
+- interactive: short tasks a user is waiting for (emails)
+- bulk: long-running, user-triggered jobs (exports, fee calculations)
+- maintenance: periodic housekeeping (backups, Fakturoid sync, digests)
+
+The interactive queue is the djhuey instance configured by ``settings.HUEY``; the others
+share its connection and are configured by ``settings.HUEY_QUEUES``.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator, Sequence
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Model, QuerySet
+from huey import signals
+from huey.api import Huey, Task, TaskLock
+from huey.contrib.djhuey import HUEY
+
+from core.task_args import ModelRefTask, resolve_model_refs
+from core.telemetry import finish_task_run, start_task_run
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+MAINTENANCE = "maintenance"
+
+# Task messages carry no enqueue time, so it is stored next to them for queue wait metrics
+ENQUEUED_AT_KEY = "enqueued-at:{}"
+CHECKPOINT_KEY = "checkpoint:{}"
+
+
+def _create_queue(name: str) -> Huey:
+    return HUEY.__class__(
+        f"{HUEY.name}-{name}",
+        immediate=HUEY.immediate,
+        **settings.HUEY.get("connection", {}),
+    )
+
+
+QUEUES: dict[str, Huey] = {
+    name: HUEY if name == INTERACTIVE else _create_queue(name) for name in settings.HUEY_QUEUES
+}
+
+
+def _close_db(huey: Huey, fn: Callable) -> Callable:
+    @wraps(fn)
+    def inner(*args: Any, **kwargs: Any) -> Any:
+        if not huey.immediate:
+            close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if not huey.immediate:
+                close_old_connections()
+
+    return inner
+
+
+def db_task(
+    *, queue: str, select_related: dict[str, Sequence[str]] | None = None, **kwargs: Any
+) -> Callable:
+    """
+    Same as djhuey's ``db_task``, but the task is routed to the given named queue and model
+    instances are passed by reference (see ``core.task_args``). ``select_related`` maps
+    argument names to the relations fetched along with the instance in the worker.
+    """
+
+    def decorator(fn: Callable) -> Any:
+        huey = QUEUES[queue]
+        task = huey.task(task_base=ModelRefTask, **kwargs)(
+            _close_db(huey, resolve_model_refs(fn, select_related))
+        )
+        task.call_local = fn
+        return task
+
+    return decorator
+
+
+def db_periodic_task(validate_datetime: Callable, *, queue: str, **kwargs: Any) -> Callable:
+    """
+    Same as djhuey's ``db_periodic_task``, but the task is routed to the given named queue.
+    """
+
+    def decorator(fn: Callable) -> Any:
+        huey = QUEUES[queue]
+        task = huey.periodic_task(validate_datetime, **kwargs)(_close_db(huey, fn))
+        task.call_local = fn
+        return task
+
+    return decorator
+
+
+def lock_task(queue: str, name: str) -> TaskLock:
+    """
+    Huey's ``lock_task`` on the given queue. A run that finds the lock taken is skipped.
+    Locks of a crashed run are released when the queue consumer starts (``flush_locks``).
+    """
+    return QUEUES[queue].lock_task(name)
+
+
+def checkpointed[M: Model](queue: str, task: Task, queryset: QuerySet[M]) -> Iterator[M]:
+    """
+    Iterate over ``queryset`` in id order, remembering the last processed id. When the task
+    times out, the iteration stops and the next run resumes after the remembered id; once
+    the queryset is exhausted, the next run starts from the beginning again.
+    """
+    huey = QUEUES[queue]
+    key = CHECKPOINT_KEY.format(task.name)
+    last_id = huey.get(key, peek=True)
+    if last_id is not None:
+        logger.info("Task %s resumes after id %s", task.name, last_id)
+        queryset = queryset.filter(id__gt=last_id)
+
+    for obj in queryset.order_by("id"):
+        if task.is_timed_out:
+            logger.warning("Task %s timed out, stopped before id %s", task.name, obj.pk)
+            return
+        yield obj
+        huey.put(key, obj.pk)
+
+    huey.get(key)
+
+
+def get_enqueued_at(huey: Huey, task_id: str) -> float | None:
+    return huey.get(ENQUEUED_AT_KEY.format(task_id), peek=True)
+
+
+def _connect_signals(name: str, huey: Huey) -> None:
+    @huey.signal(signals.SIGNAL_ENQUEUED)
+    def record_enqueued_at(signal: str, task: Task, *args: Any, **kwargs: Any) -> None:
+        huey.put(ENQUEUED_AT_KEY.format(task.id), time.time())
+
+    @huey.signal(signals.SIGNAL_EXECUTING)
+    def start_run(signal: str, task: Task, *args: Any, **kwargs: Any) -> None:
+        enqueued_at = huey.get(ENQUEUED_AT_KEY.format(task.id))
+        start_task_run(name, task, None if enqueued_at is None else time.time() - enqueued_at)
+
+    @huey.signal(signals.SIGNAL_REVOKED, signals.SIGNAL_EXPIRED, signals.SIGNAL_CANCELED)
+    def clear_enqueued_at(signal: str, task: Task, *args: Any, **kwargs: Any) -> None:
+        huey.get(ENQUEUED_AT_KEY.format(task.id))
+
+    @huey.signal(signals.SIGNAL_LOCKED)
+    def log_lock_contention(signal: str, task: Task, *args: Any, **kwargs: Any) -> None:
+        logger.warning("Task %s skipped, its previous run still holds the lock", task.name)
+
+    @huey.post_execute()
+    def finish_run(task: Task, task_value: Any, exception: Exception | None) -> None:
+        finish_task_run(name, task, exception)
+
+
+for _name, _huey in QUEUES.items():
+    _connect_signals(_name, _huey)
+
+
+def get_queue_stats(huey: Huey) -> dict[str, Any]:
+    """
+    Return the number of pending and scheduled tasks and the age (in seconds) of the oldest
+    pending task, i.e. the one the consumer picks up next.
+    """
+    oldest_age = None
+    if oldest := huey.pending(limit=1):
+        enqueued_at = get_enqueued_at(huey, oldest[0].id)
+        if enqueued_at is not None:
+            oldest_age = time.time() - enqueued_at
+    return {
+        "pending": huey.pending_count(),
+        "scheduled": huey.scheduled_count(),
+        "oldest_age": oldest_age,
+    }
@@ -0,0 +1,140 @@
+"""
+Sentry tunnel of the browser SDK. ``sentry_tunnel_view`` only validates an envelope and
+appends it to a bounded Redis buffer, ``forward_envelopes`` sends the buffer to Sentry from a
+Huey task over one kept-alive connection. A burst of errors or a slow Sentry therefore holds
+neither a web worker nor the browser.
+
+Under overload envelopes are shed rather than queued without limit: above ``SAMPLE_FROM``
+buffered envelopes a new one is kept with a probability falling to zero at ``BUFFER_SIZE``,
+and the browser of a dropped one is told to back off. Dropped and forwarded envelopes are
+counted in ``COUNTERS_KEY``, see ``get_stats`` and the ``sentry_tunnel`` management command.
+"""
+
+import logging
+import random
+from collections import Counter
+from functools import cache
+from typing import Any, cast
+from urllib.parse import urlparse
+
+import httpx
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = "sentry-tunnel:buffer"
+COUNTERS_KEY = "sentry-tunnel:counters"
+BUFFER_SIZE = 200  # envelopes
+SAMPLE_FROM = BUFFER_SIZE // 2
+MAX_ENVELOPE_SIZE = 256 * 1024  # bytes, browser error envelopes take a few kB
+SHED_RETRY_AFTER = 60  # seconds a browser waits after its envelope was dropped
+FORWARD_BATCH_SIZE = 20
+SENTRY_TIMEOUT = 5  # seconds
+
+
+@cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+@cache
+def get_http_client() -> httpx.Client:
+    # One client per worker process, its connection to Sentry is kept alive between runs
+    return httpx.Client(timeout=SENTRY_TIMEOUT)
+
+
+def get_upstream_url(dsn: str) -> str:
+    parsed = urlparse(dsn)
+    return f"https://{parsed.hostname}/api/{parsed.path.strip('/')}/envelope/"
+
+
+def buffer_envelope(envelope: bytes) -> int | None:
+    """
+    Append the envelope to the buffer. Return the number of buffered envelopes including it,
+    or None when it was dropped. Called through ``sync_to_async`` from the async view, so
+    the connection pool of ``get_redis`` is shared by all requests of the worker.
+    """
+    client = get_redis()
+    length = cast(int, client.llen(BUFFER_KEY))
+    if length >= BUFFER_SIZE:
+        client.hincrby(COUNTERS_KEY, "dropped_full")
+        return None
+    keep_ratio = min(1, (BUFFER_SIZE - length) / (BUFFER_SIZE - SAMPLE_FROM))
+    if random.random() >= keep_ratio:  # noqa: S311  # Sampling, not cryptography
+        client.hincrby(COUNTERS_KEY, "dropped_sampled")
+        return None
+
+    # Other envelopes may have been appended since, the trim keeps the bound in any case
+    with client.pipeline(transaction=True) as pipeline:
+        pipeline.rpush(BUFFER_KEY, envelope)
+        pipeline.ltrim(BUFFER_KEY, 0, BUFFER_SIZE - 1)
+        length, _ = pipeline.execute()
+    if length > BUFFER_SIZE:
+        client.hincrby(COUNTERS_KEY, "dropped_full")
+        return None
+    return length
+
+
+def forward_envelopes() -> Counter:
+    """
+    Send the buffered envelopes to Sentry, oldest first, until the buffer is empty. Envelopes
+    Sentry rejects are dropped. When Sentry rate limits the tunnel or fails, the run stops
+    and the rest is left for the next one. Must not run concurrently (see ``core.tasks``).
+    """
+    client = get_redis()
+    url = get_upstream_url(settings.SENTRY_DSN)
+    outcomes: Counter = Counter()
+
+    while envelopes := cast(list[bytes], client.lrange(BUFFER_KEY, 0, FORWARD_BATCH_SIZE - 1)):
+        batch: Counter = Counter()
+        stop = False
+        for envelope in envelopes:
+            outcome = _send(url, envelope)
+            if outcome != "failed":
+                batch[outcome] += 1
+            if outcome in ("failed", "dropped_rate_limited"):
+                stop = True
+                break
+
+        # Only appends happen at the other end, so the head still holds the sent envelopes
+        with client.pipeline(transaction=True) as pipeline:
+            pipeline.ltrim(BUFFER_KEY, batch.total(), -1)
+            for outcome, count in batch.items():
+                pipeline.hincrby(COUNTERS_KEY, outcome, count)
+            pipeline.execute()
+        outcomes.update(batch)
+        if stop:
+            break
+
+    return outcomes
+
+
+def _send(url: str, envelope: bytes) -> str:
+    try:
+        response = get_http_client().post(
+            url, content=envelope, headers={"Content-Type": "application/x-sentry-envelope"}
+        )
+    except httpx.HTTPError:
+        logger.warning("Failed to forward envelope to Sentry", exc_info=True)
+        return "failed"
+
+    if response.status_code == 429:
+        return "dropped_rate_limited"
+    if response.status_code >= 500:
+        logger.warning("Sentry failed to accept envelope: %s", response.status_code)
+        return "failed"
+    if response.status_code >= 400:
+        logger.warning("Sentry rejected envelope: %s", response.status_code)
+        return "dropped_rejected"
+    return "forwarded"
+
+
+def get_stats() -> dict[str, Any]:
+    """Return the number of buffered envelopes and the counters since the Redis start."""
+    client = get_redis()
+    counters = cast(dict[bytes, bytes], client.hgetall(COUNTERS_KEY))
+    return {
+        "buffered": client.llen(BUFFER_KEY),
+        **{key.decode(): int(value) for key, value in sorted(counters.items())},
+    }
@@ -0,0 +1,70 @@
+"""
+Model instances passed to tasks are stored in the queue as ``(model label, pk)`` references
+and fetched again in the worker. The payload stays small and the task works with the row as
+it is when the task runs, not as it was when the task was enqueued.
+"""
+
+import inspect
+from collections.abc import Callable, Sequence
+from functools import wraps
+from typing import Any, NamedTuple
+
+from django.apps import apps
+from django.db.models import Model
+from huey.api import Task
+
+
+class ModelRef(NamedTuple):
+    label: str
+    pk: Any
+
+    def get(self, select_related: Sequence[str] = ()) -> Model:
+        model = apps.get_model(self.label)
+        return model.objects.select_related(*select_related).get(pk=self.pk)
+
+
+def dump_task_arg(value: Any) -> Any:
+    if isinstance(value, Model):
+        if value.pk is None:
+            raise ValueError(f"Unsaved {value._meta.label} instance can't be passed to a task")
+        return ModelRef(value._meta.label_lower, value.pk)
+    return value
+
+
+class ModelRefTask(Task):
+    """Huey task which replaces model instances in its arguments with ``ModelRef``."""
+
+    def __init__(
+        self,
+        args: Sequence[Any] | None = None,
+        kwargs: dict[str, Any] | None = None,
+        *task_args: Any,
+        **task_kwargs: Any,
+    ) -> None:
+        super().__init__(
+            tuple(dump_task_arg(arg) for arg in args or ()),
+            {key: dump_task_arg(value) for key, value in (kwargs or {}).items()},
+            *task_args,
+            **task_kwargs,
+        )
+
+
+def resolve_model_refs(
+    fn: Callable, select_related: dict[str, Sequence[str]] | None = None
+) -> Callable:
+    """
+    Fetch the instances referenced by ``ModelRef`` arguments before calling ``fn``.
+    ``select_related`` maps argument names to the relations fetched along with them.
+    """
+    signature = inspect.signature(fn)
+    select_related = select_related or {}
+
+    @wraps(fn)
+    def inner(*args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind(*args, **kwargs)
+        for name, value in bound.arguments.items():
+            if isinstance(value, ModelRef):
+                bound.arguments[name] = value.get(select_related.get(name, ()))
+        return fn(*bound.args, **bound.kwargs)
+
+    return inner
@@ -1,50 +1,187 @@
 import logging
-from typing import Any
+import time
+from datetime import timedelta
 
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
 from huey import crontab
-from huey.contrib.djhuey import db_periodic_task, task
 from ultihub.settings import ENVIRONMENT
 
+from core import sentry_tunnel
+from core.models import OutgoingEmail
+from core.queues import INTERACTIVE, MAINTENANCE, QUEUES, db_periodic_task, db_task, lock_task
+
 logger = logging.getLogger(__name__)
 
+# Messages queued within this window are delivered together over one SMTP connection
+EMAIL_BATCH_WINDOW = 10  # seconds
+EMAIL_BATCH_SIZE = 50
+# One attempt plus three retries a minute apart. Failed attempts with retries left are only
+# logged as warnings, so Sentry reports just the final failure.
+EMAIL_MAX_ATTEMPTS = 4
+EMAIL_RETRY_DELAY = timedelta(seconds=60)
+# Longer than sending a whole batch takes, a flush claims its batch for this long
+EMAIL_CLAIM_TIMEOUT = timedelta(minutes=10)
+EMAIL_FLUSH_SCHEDULED_KEY = "email-outbox-flush-scheduled"
+# Envelopes reaching an empty tunnel buffer within this window are forwarded together
+SENTRY_FORWARD_WINDOW = 5  # seconds
 
-class RetriableEmailError(Exception):
-    """Raised when an email send fails but can be retried.
 
-    Sentry ignores this exception — only the final failure (original exception)
-    is reported.
+def send_email(subject: str, body: str, to: list[str], csv_data: str | None = None) -> None:
+    """
+    Queue an HTML email in the outbox. It is sent by ``flush_email_outbox`` together with
+    the other messages queued within ``EMAIL_BATCH_WINDOW``.
     """
-
-
-@task(retries=3, retry_delay=60, context=True)
-def send_email(
-    subject: str, body: str, to: list[str], csv_data: str | None = None, *, task: Any = None
-) -> None:
     if ENVIRONMENT in ["prod"]:
-        logger.info("Sending email to %s", to)
-        email = EmailMessage(subject=subject, body=body, to=to)
-        email.content_subtype = "html"
-        if csv_data:
-            email.attach("data.csv", csv_data, "text/csv")
-        try:
-            email.send()
-        except Exception as exc:
-            retries_left = task.retries if task else 0
-            if retries_left > 0:
-                logger.warning("Email to %s failed, %d retries remaining", to, retries_left)
-                raise RetriableEmailError(
-                    f"Email to {to} failed, {retries_left} retries remaining"
-                ) from exc
-            logger.exception("Email to %s failed after all retries", to)
-            raise
-        logger.info("Email sent to %s", to)
+        logger.info("Queueing email to %s", to)
+        OutgoingEmail.objects.create(subject=subject, body=body, to=to, csv_data=csv_data or "")
+        # Flush only after the message is committed, otherwise the worker cannot see it
+        transaction.on_commit(_schedule_email_flush)
     else:
         logger.warning("Email to %s not sent due to environment", to)
 
 
-@db_periodic_task(crontab(hour=3, minute=0))
+def _schedule_email_flush() -> None:
+    # Only the first message of a window schedules a flush, the others ride along with it
+    if QUEUES[INTERACTIVE].put_if_empty(EMAIL_FLUSH_SCHEDULED_KEY, "1"):
+        flush_email_outbox.schedule(delay=EMAIL_BATCH_WINDOW)
+
+
+def _build_email_message(outgoing_email: OutgoingEmail) -> EmailMessage:
+    email = EmailMessage(
+        subject=outgoing_email.subject, body=outgoing_email.body, to=outgoing_email.to
+    )
+    email.content_subtype = "html"
+    if outgoing_email.csv_data:
+        email.attach("data.csv", outgoing_email.csv_data, "text/csv")
+    return email
+
+
+def _send_email_batch(batch: list[OutgoingEmail]) -> int:
+    """Send the batch over a single SMTP connection. Returns the number of sent emails."""
+    sent_count = 0
+    attempted: set[int] = set()
+    try:
+        with get_connection() as connection:
+            for outgoing_email in batch:
+                # Send one by one on the shared connection, so a failing recipient only
+                # affects its own message and not the rest of the batch.
+                try:
+                    connection.send_messages([_build_email_message(outgoing_email)])
+                except Exception:
+                    _record_email_failure(outgoing_email)
+                else:
+                    outgoing_email.sent_at = timezone.now()
+                    outgoing_email.save(update_fields=["sent_at", "updated_at"])
+                    sent_count += 1
+                attempted.add(outgoing_email.pk)
+    except Exception:
+        # The connection itself failed (open or close), every unsent message counts an attempt
+        for outgoing_email in batch:
+            if outgoing_email.pk not in attempted:
+                _record_email_failure(outgoing_email)
+    return sent_count
+
+
+def _record_email_failure(outgoing_email: OutgoingEmail) -> None:
+    outgoing_email.attempts += 1
+    retries_left = EMAIL_MAX_ATTEMPTS - outgoing_email.attempts
+    if retries_left > 0:
+        logger.warning("Email to %s failed, %d retries remaining", outgoing_email.to, retries_left)
+        outgoing_email.next_attempt_at = timezone.now() + EMAIL_RETRY_DELAY
+    else:
+        logger.exception("Email to %s failed after all retries", outgoing_email.to)
+        outgoing_email.failed_at = timezone.now()
+    outgoing_email.save(update_fields=["attempts", "next_attempt_at", "failed_at", "updated_at"])
+
+
+def _claim_email_batch() -> list[OutgoingEmail]:
+    """
+    Claim the next batch of due emails by moving their next attempt past the claim timeout.
+    The claim commits before the batch is sent, so no row stays locked during the SMTP
+    exchange, and a batch left by a killed worker is sent again once the claim expires.
+    """
+    with transaction.atomic():
+        # skip_locked lets a concurrent flush (e.g. the periodic one) claim other messages
+        # instead of waiting for this claim
+        batch = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                sent_at__isnull=True,
+                failed_at__isnull=True,
+                next_attempt_at__lte=timezone.now(),
+            )
+            .order_by("pk")[:EMAIL_BATCH_SIZE]
+        )
+        now = timezone.now()
+        OutgoingEmail.objects.filter(pk__in=[outgoing_email.pk for outgoing_email in batch]).update(
+            next_attempt_at=now + EMAIL_CLAIM_TIMEOUT, updated_at=now
+        )
+    return batch
+
+
+@db_task(queue=INTERACTIVE)
+def flush_email_outbox() -> None:
+    """Deliver all due emails from the outbox in batches, one SMTP connection per batch."""
+    # Open a new window, messages queued from now on schedule another flush
+    QUEUES[INTERACTIVE].get(EMAIL_FLUSH_SCHEDULED_KEY)
+
+    started = time.monotonic()
+    sent_count = failed_count = 0
+
+    while batch := _claim_email_batch():
+        batch_sent_count = _send_email_batch(batch)
+        sent_count += batch_sent_count
+        failed_count += len(batch) - batch_sent_count
+
+    if sent_count or failed_count:
+        duration = time.monotonic() - started
+        logger.info(
+            "Email outbox flushed: %d sent, %d failed in %.2f s (%.1f emails/s)",
+            sent_count,
+            failed_count,
+            duration,
+            sent_count / duration if duration else 0,
+        )
+
+
+@db_periodic_task(crontab(minute="*"), queue=MAINTENANCE)
+def retry_email_outbox() -> None:
+    """
+    Periodic task that delivers emails due for a retry, and any message whose scheduled
+    flush was lost (e.g. the worker restarted in the meantime).
+    """
+    if OutgoingEmail.objects.filter(
+        sent_at__isnull=True, failed_at__isnull=True, next_attempt_at__lte=timezone.now()
+    ).exists():
+        flush_email_outbox()
+
+
+@db_task(queue=MAINTENANCE)
+@lock_task(MAINTENANCE, "forward-sentry-envelopes")
+def forward_sentry_envelopes() -> None:
+    """Forward the envelopes buffered by the Sentry tunnel (see ``core.sentry_tunnel``)."""
+    if outcomes := sentry_tunnel.forward_envelopes():
+        logger.info("Sentry envelopes forwarded: %s", dict(outcomes))
+
+
+def schedule_sentry_forwarding() -> None:
+    forward_sentry_envelopes.schedule(delay=SENTRY_FORWARD_WINDOW)
+
+
+@db_periodic_task(crontab(minute="*"), queue=MAINTENANCE)
+def retry_sentry_forwarding() -> None:
+    """
+    Periodic task that forwards envelopes left in the tunnel buffer by a run stopped by
+    Sentry, or whose scheduled run was lost.
+    """
+    if sentry_tunnel.get_redis().llen(sentry_tunnel.BUFFER_KEY):
+        forward_sentry_envelopes()
+
+
+@db_periodic_task(crontab(hour=3, minute=0), queue=MAINTENANCE)
 def backup_database() -> None:
     """
     Periodic task to back up the database. It uploads the backup to Dropbox.
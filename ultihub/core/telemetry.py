@@ -0,0 +1,77 @@
+"""
+Telemetry of Huey task runs, wired to every queue by ``core.queues``. Each run is traced as
+a Datadog span (in production, where ddtrace is set up) and stored as a ``TaskRun``.
+"""
+
+import time
+from typing import Any
+
+from ddtrace.trace import tracer
+from django.conf import settings
+from huey.api import Task
+from huey.exceptions import TaskLockedException
+
+from core.models import TaskRun, TaskRunStateEnum
+
+TASK_RUN_HISTORY = 100  # runs kept per task
+
+
+def start_task_run(queue: str, task: Task, queue_wait: float | None) -> None:
+    task.telemetry = {
+        "started_at": time.monotonic(),
+        "queue_wait": queue_wait,
+        "span": (
+            tracer.trace("huey.task", resource=task.name, span_type="worker")
+            if settings.ENVIRONMENT == "prod"
+            else None
+        ),
+    }
+
+
+def finish_task_run(queue: str, task: Task, exception: Exception | None) -> None:
+    telemetry: dict[str, Any] | None = getattr(task, "telemetry", None)
+    if telemetry is None:
+        return
+
+    duration = time.monotonic() - telemetry["started_at"]
+    if exception is None:
+        state = TaskRunStateEnum.COMPLETE
+    elif isinstance(exception, TaskLockedException):
+        state = TaskRunStateEnum.LOCKED
+    elif task.retries:
+        state = TaskRunStateEnum.RETRYING
+    else:
+        state = TaskRunStateEnum.FAILED
+
+    if span := telemetry["span"]:
+        span.set_tag("huey.queue", queue)
+        span.set_tag("huey.state", state.label.lower())
+        span.set_metric("huey.retries_left", task.retries)
+        if telemetry["queue_wait"] is not None:
+            span.set_metric("huey.queue_wait", telemetry["queue_wait"])
+        if exception is not None:
+            span.set_exc_info(type(exception), exception, exception.__traceback__)
+        span.finish()
+
+    run = TaskRun.objects.create(
+        task_id=task.id,
+        name=f"{task.__module__}.{task.name}",
+        queue=queue,
+        state=state,
+        queue_wait=telemetry["queue_wait"],
+        duration=duration,
+        retries_left=task.retries,
+        error=repr(exception) if exception is not None else "",
+    )
+    _prune_task_runs(run.name)
+
+
+def _prune_task_runs(name: str) -> None:
+    oldest_kept = (
+        TaskRun.objects.filter(name=name)
+        .order_by("-id")
+        .values_list("id", flat=True)[TASK_RUN_HISTORY - 1 : TASK_RUN_HISTORY]
+        .first()
+    )
+    if oldest_kept is not None:
+        TaskRun.objects.filter(name=name, id__lt=oldest_kept).delete()
@@ -1,15 +1,15 @@
 import json
-import logging
 from urllib.parse import urlparse
 
-import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET, require_POST, require_safe
 
-logger = logging.getLogger(__name__)
+from core.sentry_tunnel import MAX_ENVELOPE_SIZE, SHED_RETRY_AFTER, buffer_envelope
+from core.tasks import schedule_sentry_forwarding
 
 
 @require_safe
@@ -29,7 +29,7 @@ def privacy_policy_view(request: HttpRequest) -> HttpResponse:
 
 @csrf_exempt
 @require_POST
-def sentry_tunnel_view(request: HttpRequest) -> HttpResponse:
+async def sentry_tunnel_view(request: HttpRequest) -> HttpResponse:
     if not settings.SENTRY_DSN:
         return HttpResponse(status=404)
 
@@ -56,17 +56,16 @@ def sentry_tunnel_view(request: HttpRequest) -> HttpResponse:
     if parsed_dsn.hostname != parsed_allowed.hostname or project_id != allowed_project_id:
         return HttpResponse("Forbidden", status=403)
 
-    upstream_url = f"https://{parsed_dsn.hostname}/api/{project_id}/envelope/"
-
-    try:
-        resp = requests.post(
-            upstream_url,
-            data=body,
-            headers={"Content-Type": "application/x-sentry-envelope"},
-            timeout=5,
-        )
-    except requests.RequestException:
-        logger.exception("Failed to forward envelope to Sentry")
-        return HttpResponse("Upstream error", status=502)
-
-    return HttpResponse(status=resp.status_code)
+    if len(body) > MAX_ENVELOPE_SIZE:
+        return HttpResponse("Envelope too large", status=413)
+
+    # The envelope is forwarded in the background (see core.sentry_tunnel)
+    length = await sync_to_async(buffer_envelope)(body)
+    if length is None:
+        # The browser SDK backs off on a rate limit, which eases the overload
+        response = HttpResponse("Too many envelopes", status=429)
+        response["Retry-After"] = str(SHED_RETRY_AFTER)
+        return response
+    if length == 1:
+        await sync_to_async(schedule_sentry_forwarding)()
+    return HttpResponse(status=202)
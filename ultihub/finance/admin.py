@@ -1,7 +1,10 @@
 from core.admin import AuditlogMixin
 from django.contrib import admin
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from django.utils import timezone
 
-from finance.models import Invoice, InvoiceRelatedObject
+from finance.models import Invoice, InvoiceRelatedObject, InvoiceStateEnum
 
 
 class InvoiceRelatedObjectInline(admin.TabularInline):
@@ -13,6 +16,29 @@ class InvoiceRelatedObjectInline(admin.TabularInline):
 
 @admin.register(Invoice)
 class InvoiceAdmin(AuditlogMixin, admin.ModelAdmin):
-    list_display = ("id", "club__name", "state", "type", "amount")
+    list_display = (
+        "id",
+        "club__name",
+        "state",
+        "type",
+        "amount",
+        "attempt_count",
+        "next_attempt_at",
+    )
+    list_filter = ("state",)
     ordering = ("-created_at",)
     inlines = [InvoiceRelatedObjectInline]
+    actions = ["retry_sending_to_fakturoid"]
+
+    @admin.action(description="Retry sending failed invoices to Fakturoid")
+    def retry_sending_to_fakturoid(self, request: HttpRequest, queryset: QuerySet) -> None:
+        invoices = queryset.filter(state=InvoiceStateEnum.FAILED)
+        for invoice in invoices:
+            # Saved one by one so the change is recorded in the audit log
+            invoice.state = InvoiceStateEnum.DRAFT
+            invoice.attempt_count = 0
+            invoice.next_attempt_at = timezone.now()
+            invoice.save(update_fields=["state", "attempt_count", "next_attempt_at", "updated_at"])
+        self.message_user(
+            request, f"{len(invoices)} invoice(s) will be sent with the next resend run."
+        )
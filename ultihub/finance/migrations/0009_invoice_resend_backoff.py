@@ -0,0 +1,41 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("clubs", "0016_clubnotification_is_digest_pending"),
+        ("finance", "0008_alter_invoice_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invoice",
+            name="attempt_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="invoice",
+            name="next_attempt_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name="invoice",
+            name="state",
+            field=models.IntegerField(
+                choices=[(1, "Draft"), (2, "Open"), (3, "Paid"), (4, "Canceled"), (5, "Failed")],
+                db_index=True,
+                default=1,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invoice",
+            index=models.Index(
+                condition=models.Q(("state", 1)),
+                fields=["next_attempt_at"],
+                name="invoice_resend_due_idx",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 
 class InvoiceStateEnum(models.IntegerChoices):
@@ -14,6 +15,7 @@ class InvoiceStateEnum(models.IntegerChoices):
     OPEN = 2  # Sent to Fakturoid
     PAID = 3  # Paid in Fakturoid
     CANCELED = 4  # Canceled in Fakturoid
+    FAILED = 5  # Sending to Fakturoid was given up, needs a manual fix and retry
 
 
 class InvoiceTypeEnum(models.IntegerChoices):
@@ -64,6 +66,22 @@ class Invoice(AuditModel):
         blank=True,
         null=True,
     )
+    # Sending of DRAFT invoices to Fakturoid, see resend_invoices_to_fakturoid
+    attempt_count = models.PositiveSmallIntegerField(
+        default=0,
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(state=InvoiceStateEnum.DRAFT),
+                name="invoice_resend_due_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"<Invoice({self.pk}, amount={self.amount})>"
@@ -2,12 +2,14 @@ import logging
 from collections import defaultdict
 from datetime import timedelta
 from decimal import Decimal
+from typing import Any
 
 import sentry_sdk
 from clubs.models import Club
 from clubs.services import notify_club
 from competitions.models import ApplicationStateEnum, CompetitionApplication, Season
 from core.helpers import create_csv
+from core.queues import BULK, MAINTENANCE, checkpointed, db_periodic_task, db_task, lock_task
 from core.tasks import send_email
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
@@ -16,7 +18,6 @@ from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.html import format_html, format_html_join
 from huey import crontab
-from huey.contrib.djhuey import db_periodic_task, db_task
 
 from finance.clients.fakturoid import InvoiceDetails, NotFoundError, fakturoid_client
 from finance.models import Invoice, InvoiceStateEnum, InvoiceTypeEnum
@@ -29,6 +30,11 @@ from finance.services import (
 
 logger = logging.getLogger(__name__)
 
+# Backoff of DRAFT invoices failing to be sent to Fakturoid: 15 min, 30 min, 1 h, ... 24 h
+INVOICE_RESEND_BASE_DELAY = timedelta(minutes=15)
+INVOICE_RESEND_MAX_DELAY = timedelta(hours=24)
+INVOICE_RESEND_MAX_ATTEMPTS = 10
+
 
 @transaction.atomic
 def _update_invoice(invoice: Invoice, details: InvoiceDetails) -> None:
@@ -48,7 +54,7 @@ def _update_invoice(invoice: Invoice, details: InvoiceDetails) -> None:
                         content_type_id=ContentType.objects.get_for_model(CompetitionApplication).id
                     ).values_list("object_id", flat=True),
                     state=ApplicationStateEnum.AWAITING_PAYMENT,
-                ).update(state=ApplicationStateEnum.PAID)
+                ).update(state=ApplicationStateEnum.PAID, updated_at=timezone.now())
             logger.info("Invoice %s was paid", invoice.id)
 
         elif status in ("cancelled", "uncollectible"):
@@ -66,17 +72,24 @@ def _update_invoice(invoice: Invoice, details: InvoiceDetails) -> None:
     invoice.save()
 
 
-@db_periodic_task(crontab(minute="0", hour="5,17"))
-def check_fakturoid_invoices() -> None:
+@db_periodic_task(
+    crontab(minute="0", hour="5,17"), queue=MAINTENANCE, context=True, timeout=60 * 60
+)
+@lock_task(MAINTENANCE, "check-fakturoid-invoices")
+def check_fakturoid_invoices(*, task: Any = None) -> None:
     """
     Periodic task to check invoices in Fakturoid.
     Syncs status, total, and due_on from Fakturoid.
     """
     logger.info("Start regular check of invoices in Fakturoid")
 
-    for invoice in Invoice.objects.filter(
-        state=InvoiceStateEnum.OPEN,
-        created_at__gte=timezone.now() - timedelta(days=180),
+    for invoice in checkpointed(
+        MAINTENANCE,
+        task,
+        Invoice.objects.filter(
+            state=InvoiceStateEnum.OPEN,
+            created_at__gte=timezone.now() - timedelta(days=180),
+        ),
     ):
         # Process each invoice in isolation so a single failing invoice cannot abort the
         # whole run and get stuck blocking every subsequent run on the same record.
@@ -105,31 +118,64 @@ def check_fakturoid_invoices() -> None:
     logger.info("End regular check of invoices in Fakturoid")
 
 
-@db_periodic_task(crontab(minute="*/15", hour="*"))
-def resend_invoices_to_fakturoid() -> None:
+@db_periodic_task(
+    crontab(minute="*/15", hour="*"), queue=MAINTENANCE, context=True, timeout=10 * 60
+)
+@lock_task(MAINTENANCE, "resend-invoices-to-fakturoid")
+def resend_invoices_to_fakturoid(*, task: Any = None) -> None:
+    """
+    Periodic task to send DRAFT invoices to Fakturoid. Only invoices due for an attempt are
+    selected; each failure postpones the next attempt exponentially and after
+    ``INVOICE_RESEND_MAX_ATTEMPTS`` the invoice is moved to the FAILED (dead-letter) state.
+    """
     logger.info("Start trying to resend invoices to Fakturoid")
 
-    for invoice in Invoice.objects.filter(
-        state=InvoiceStateEnum.DRAFT,
-        created_at__lte=timezone.now() - timedelta(seconds=60),
+    now = timezone.now()
+    for invoice in checkpointed(
+        MAINTENANCE,
+        task,
+        Invoice.objects.filter(
+            state=InvoiceStateEnum.DRAFT,
+            next_attempt_at__lte=now,
+            created_at__lte=now - timedelta(seconds=60),
+        ).select_related("club"),
     ):
         # Process each invoice in isolation so a single failing invoice cannot abort the
         # whole run and block every subsequent DRAFT invoice from ever being sent.
         try:
             create_invoice_in_fakturoid_and_save_data(invoice)
-        except NoSubjectIdError as ex:
-            # DRAFT invoice whose club has no Fakturoid subject_id set. It can never be sent
-            # automatically, so skip it and report it instead of crashing the run.
+        except NoSubjectIdError:
+            # DRAFT invoice whose club has no Fakturoid subject_id set. It can't be sent
+            # until the subject_id is filled in, so back off instead of crashing the run.
             logger.warning("Invoice %s skipped, club has no Fakturoid subject_id", invoice.id)
-            sentry_sdk.capture_exception(ex)
-        except Exception as ex:
+        except Exception:
             logger.exception("Failed to resend invoice %s to Fakturoid", invoice.id)
-            sentry_sdk.capture_exception(ex)
+
+        if invoice.state == InvoiceStateEnum.DRAFT:
+            _postpone_invoice_resend(invoice)
 
     logger.info("End trying to resend invoices to Fakturoid")
 
 
-@db_task()
+def _postpone_invoice_resend(invoice: Invoice) -> None:
+    invoice.attempt_count += 1
+    if invoice.attempt_count >= INVOICE_RESEND_MAX_ATTEMPTS:
+        invoice.state = InvoiceStateEnum.FAILED
+        logger.error(
+            "Invoice %s not sent to Fakturoid after %s attempts, giving up",
+            invoice.id,
+            invoice.attempt_count,
+        )
+        sentry_sdk.capture_message(
+            f"Invoice {invoice.id} could not be sent to Fakturoid", level="error"
+        )
+    else:
+        delay = INVOICE_RESEND_BASE_DELAY * 2 ** (invoice.attempt_count - 1)
+        invoice.next_attempt_at = timezone.now() + min(delay, INVOICE_RESEND_MAX_DELAY)
+    invoice.save(update_fields=["attempt_count", "next_attempt_at", "state", "updated_at"])
+
+
+@db_task(queue=BULK)
 @transaction.atomic()
 def calculate_season_fees_for_check(user: User, season: Season) -> None:
     logger.info(f"Calculating fees (check) for season {season.name}")
@@ -161,7 +207,7 @@ def calculate_season_fees_for_check(user: User, season: Season) -> None:
     )
 
 
-@db_task()
+@db_task(queue=BULK)
 def calculate_season_fees_and_generate_invoices(
     season: Season, dry_run: bool = False, dry_run_user: User | None = None
 ) -> None:
@@ -346,7 +392,7 @@ def _format_overdue_reminder_message(invoices_data: list[tuple[Invoice, int]]) -
     )
 
 
-@db_periodic_task(crontab(minute="0", hour="8"))
+@db_periodic_task(crontab(minute="0", hour="8"), queue=MAINTENANCE)
 def send_overdue_invoice_reminders() -> None:
     """
     Send reminder notifications for overdue invoices.
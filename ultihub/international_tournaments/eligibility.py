@@ -0,0 +1,34 @@
+from django.db.models import OuterRef, QuerySet, Subquery
+from members.models import Member
+from tournaments.eligibility import RosterEligibility
+
+from international_tournaments.models import (
+    MemberAtInternationalTournament,
+    TeamAtInternationalTournament,
+)
+
+
+class InternationalRosterEligibility(RosterEligibility):
+    """Rules of international tournaments: a member plays for one team per tournament."""
+
+    def __init__(self, team_at_tournament: TeamAtInternationalTournament) -> None:
+        self.team_at_tournament = team_at_tournament
+
+    def annotate(self, queryset: QuerySet[Member]) -> QuerySet[Member]:
+        roster_record = MemberAtInternationalTournament.objects.filter(
+            tournament_id=self.team_at_tournament.tournament_id, member=OuterRef("pk")
+        )
+        return queryset.annotate(
+            roster_team_id=Subquery(roster_record.values("team_at_tournament_id")[:1]),
+            roster_team_name=Subquery(roster_record.values("team_at_tournament__team_name")[:1]),
+        )
+
+    def get_reason(self, member: Member) -> str | None:
+        if member.roster_team_id == self.team_at_tournament.pk:  # type: ignore[attr-defined]
+            return "Member is already in this team roster"
+        if member.roster_team_id is not None:  # type: ignore[attr-defined]
+            return (
+                "Member is already in another team at this tournament: "
+                f"{member.roster_team_name}"  # type: ignore[attr-defined]
+            )
+        return None
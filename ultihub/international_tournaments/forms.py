@@ -4,6 +4,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from members.models import Member
 
+from international_tournaments.eligibility import InternationalRosterEligibility
 from international_tournaments.models import MemberAtInternationalTournament
 
 
@@ -21,34 +22,13 @@ class AddMemberToInternationalRosterForm(forms.Form):
             return {}
 
         if self.team_at_tournament and cleaned_data.get("member_id"):
-            tournament = self.team_at_tournament.tournament
-
-            try:
-                member = Member.objects.get(pk=cleaned_data["member_id"])
-            except Member.DoesNotExist as err:
-                raise ValidationError({"member_id": "Member not found"}) from err
+            eligibility = InternationalRosterEligibility(self.team_at_tournament)
+            verdict = eligibility.check([cleaned_data["member_id"]])[cleaned_data["member_id"]]
+            if not verdict.is_eligible:
+                raise ValidationError({"member_id": verdict.reason})
 
             # Store for later use to avoid re-fetching
-            self.validated_member = member
-
-            # Check if member is already in this team at this tournament
-            if MemberAtInternationalTournament.objects.filter(
-                team_at_tournament=self.team_at_tournament, member=member
-            ).exists():
-                raise ValidationError({"member_id": "Member is already in this team roster"})
-
-            # Check if member is already in another team at this tournament
-            if roster_record := MemberAtInternationalTournament.objects.filter(
-                tournament=tournament, member=member
-            ).first():
-                raise ValidationError(
-                    {
-                        "member_id": (
-                            "Member is already in another team at this tournament: "
-                            f"{roster_record.team_at_tournament.team_name}"
-                        )
-                    }
-                )
+            self.validated_member = verdict.member
 
         return cleaned_data
 
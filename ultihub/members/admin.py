@@ -3,7 +3,7 @@ from typing import Any, cast
 
 from core.admin import AuditlogMixin, ReadOnlyModelAdmin
 from django.contrib import admin
-from django.db.models import Exists, OuterRef, QuerySet
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
 from django.http import HttpRequest, HttpResponse
 from django.utils.timezone import localtime, now
 from django_countries.fields import Country
@@ -11,7 +11,16 @@ from rangefilter.filters import DateRangeFilterBuilder
 from tournaments.admin import MemberAtTournamentInline
 
 from members.helpers import approve_transfer
-from members.models import CoachLicence, Member, MemberSexEnum, Transfer, TransferStateEnum
+from members.models import (
+    CoachLicence,
+    Member,
+    MemberSexEnum,
+    NsaExport,
+    NsaExportShard,
+    NsaExportShardStateEnum,
+    Transfer,
+    TransferStateEnum,
+)
 
 
 class CoachLicenceInline(admin.TabularInline):
@@ -298,3 +307,39 @@ class TransferAdmin(AuditlogMixin, ReadOnlyModelAdmin):
                 "approved_by",
             )
         )
+
+
+class NsaExportShardInline(admin.TabularInline):
+    model = NsaExportShard
+    fields = ("club", "state", "attempts", "updated_at")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request: HttpRequest, obj: Any | None = None) -> bool:
+        return False
+
+
+@admin.register(NsaExport)
+class NsaExportAdmin(ReadOnlyModelAdmin):
+    list_display = ("id", "season", "club", "requested_by", "progress", "created_at", "sent_at")
+    list_filter = ["season"]
+    ordering = ["-id"]
+    inlines = [NsaExportShardInline]
+
+    @admin.display(description="Progress")
+    def progress(self, obj: NsaExport) -> str:
+        return f"{obj.finished_shards_count}/{obj.shards_count}"  # type: ignore
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet:
+        return (
+            super()
+            .get_queryset(request)
+            .select_related("season", "club", "requested_by")
+            .annotate(
+                shards_count=Count("shards"),
+                finished_shards_count=Count(
+                    "shards", filter=~Q(shards__state=NsaExportShardStateEnum.PENDING)
+                ),
+            )
+        )
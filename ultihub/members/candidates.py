@@ -0,0 +1,96 @@
+"""
+Cache of roster candidates for the member search. With an empty query, the search offers all
+members of the current club who may join a roster at the tournament (see
+``TournamentRosterEligibility.filter_candidates``). The list is built once per tournament and
+club, when the roster dialog opens, and updated once members added to or removed from rosters
+are committed, so the typeahead does not run the eligibility query on every request.
+
+The list only suggests members, the roster forms still check every member they add. Edits
+of members (e.g. a transfer) are picked up when the cached list expires.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from functools import partial
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+from tournaments.eligibility import TournamentRosterEligibility
+from tournaments.models import Tournament
+
+from members.models import Member
+from members.services import search, serialize_search_result
+
+CANDIDATES_KEY = "roster-candidates:{}:{}"
+CANDIDATES_TIMEOUT = 10 * 60  # seconds
+
+
+def _sort_key(tournament: Tournament) -> Callable[[dict[str, Any]], Any]:
+    # The same order as the search: men first in open division
+    if "open" in tournament.competition.division.name.lower():
+        return lambda candidate: (-candidate["sex"], candidate["id"])
+    return lambda candidate: candidate["id"]
+
+
+def get_roster_candidates(tournament: Tournament, club_id: int) -> list[dict[str, Any]]:
+    """Return the search results of all roster candidates from the club, build them if needed."""
+    key = CANDIDATES_KEY.format(tournament.pk, club_id)
+    candidates = cache.get(key)
+    if candidates is None:
+        candidates = sorted(
+            (
+                serialize_search_result(member)
+                for member in search("", club_id, tournament, limit=None)
+            ),
+            key=_sort_key(tournament),
+        )
+        cache.set(key, candidates, CANDIDATES_TIMEOUT)
+    return candidates
+
+
+def remove_roster_candidates(tournament_id: int, members: Iterable[Member]) -> None:
+    """
+    Remove members who joined a roster at the tournament from the cached candidates, once
+    the transaction commits.
+    """
+    member_ids_by_club = defaultdict(set)
+    for member in members:
+        member_ids_by_club[member.club_id].add(member.pk)
+    transaction.on_commit(partial(_remove_roster_candidates, tournament_id, member_ids_by_club))
+
+
+def _remove_roster_candidates(tournament_id: int, member_ids_by_club: dict[int, set[int]]) -> None:
+    for club_id, member_ids in member_ids_by_club.items():
+        key = CANDIDATES_KEY.format(tournament_id, club_id)
+        if (candidates := cache.get(key)) is not None:
+            cache.set(
+                key,
+                [candidate for candidate in candidates if candidate["id"] not in member_ids],
+                CANDIDATES_TIMEOUT,
+            )
+
+
+def add_roster_candidate(tournament: Tournament, member: Member) -> None:
+    """
+    Put a member who left a roster at the tournament back to the cached candidates, once the
+    transaction commits.
+    """
+    transaction.on_commit(partial(_add_roster_candidate, tournament, member))
+
+
+def _add_roster_candidate(tournament: Tournament, member: Member) -> None:
+    key = CANDIDATES_KEY.format(tournament.pk, member.club_id)
+    if (candidates := cache.get(key)) is None:
+        return
+
+    eligibility = TournamentRosterEligibility(tournament)
+    candidate = (
+        eligibility.filter_candidates(Member.objects.select_related("club"))
+        .filter(pk=member.pk, club_id=member.club_id, is_active=True)
+        .first()
+    )
+    if candidate is not None:
+        candidates = [other for other in candidates if other["id"] != candidate.pk]
+        candidates.append(serialize_search_result(candidate))
+        cache.set(key, sorted(candidates, key=_sort_key(tournament)), CANDIDATES_TIMEOUT)
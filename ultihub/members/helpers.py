@@ -8,6 +8,7 @@ from competitions.models import Season
 from core.tasks import send_email
 from django.conf import settings
 from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.template.loader import render_to_string
 from django.utils import timezone
 from django.utils.html import format_html
@@ -166,7 +167,7 @@ def reject_transfer(transfer: Transfer) -> None:
     )
 
 
-def get_member_participation_counts(season: Season) -> Counter[int]:
+def get_member_participation_counts(season: Season, club_id: int | None = None) -> Counter[int]:
     # Calculate days for domestic tournaments
     tournament_lengths: dict[int, int] = {}
     for tournament in Tournament.objects.filter(competition__season=season):
@@ -182,7 +183,8 @@ def get_member_participation_counts(season: Season) -> Counter[int]:
     # Sum up days for each member from domestic tournaments
     member_participation: Counter[int] = Counter()
     for member_at_tournament in MemberAtTournament.objects.filter(
-        tournament_id__in=tournament_lengths.keys()
+        Q(tournament_id__in=tournament_lengths.keys()),
+        Q(member__club_id=club_id) if club_id else Q(),
     ):
         member_participation[member_at_tournament.member_id] += tournament_lengths[
             member_at_tournament.tournament_id
@@ -190,7 +192,8 @@ def get_member_participation_counts(season: Season) -> Counter[int]:
 
     # Add days from international tournaments
     for member_at_int_tournament in MemberAtInternationalTournament.objects.filter(
-        tournament_id__in=international_tournament_lengths.keys()
+        Q(tournament_id__in=international_tournament_lengths.keys()),
+        Q(member__club_id=club_id) if club_id else Q(),
     ):
         member_participation[member_at_int_tournament.member_id] += (
             international_tournament_lengths[member_at_int_tournament.tournament_id]
@@ -7,6 +7,7 @@ from core.fields import ValidatedEmailField
 from core.helpers import get_app_settings
 from core.models import AuditModel
 from core.tasks import send_email
+from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
@@ -47,6 +48,12 @@ class TransferStateEnum(models.IntegerChoices):
     CANCELLED = 5, "Cancelled"
 
 
+class NsaExportShardStateEnum(models.IntegerChoices):
+    PENDING = 1, "Pending"
+    DONE = 2, "Done"
+    FAILED = 3, "Failed"
+
+
 class MemberQuerySet(QuerySet):
     def annotate_age(self, age_reference_date: date) -> QuerySet:
         return self.annotate(
@@ -444,3 +451,67 @@ class FavouriteMember(AuditModel):
 
     def __str__(self) -> str:
         return f"<FavouriteMember(agent={self.agent_id}, member={self.member_id})>"
+
+
+class NsaExport(AuditModel):
+    """A requested NSA export, generated as one shard per club and merged into a single file.
+
+    The shards run as independent tasks, so progress can be followed per club and a failed
+    club is retried on its own without restarting the whole export.
+    """
+
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.PROTECT,
+    )
+    season = models.ForeignKey(
+        "competitions.Season",
+        on_delete=models.PROTECT,
+    )
+    club = models.ForeignKey(
+        "clubs.Club",
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        help_text="Empty for an export of all clubs",
+    )
+    merge_enqueued_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+
+    def __str__(self) -> str:
+        return f"<NsaExport({self.pk}, season={self.season_id}, club={self.club_id})>"
+
+
+class NsaExportShard(AuditModel):
+    export = models.ForeignKey(
+        NsaExport,
+        on_delete=models.CASCADE,
+        related_name="shards",
+    )
+    club = models.ForeignKey(
+        "clubs.Club",
+        on_delete=models.PROTECT,
+    )
+    state = models.IntegerField(
+        choices=NsaExportShardStateEnum.choices,
+        default=NsaExportShardStateEnum.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+    )
+    # CSV rows of the shard, kept only until the export is merged and sent
+    rows = models.JSONField(
+        default=list,
+    )
+
+    class Meta:
+        unique_together = ("export", "club")
+
+    def __str__(self) -> str:
+        return f"<NsaExportShard({self.pk}, export={self.export_id}, club={self.club_id})>"
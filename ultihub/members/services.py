@@ -1,23 +1,20 @@
 import logging
+from typing import Any, cast
 
-from django.db.models import Q, QuerySet
-from tournaments.models import MemberAtTournament, Tournament
+from django.db.models import Q
+from django_countries.fields import Country
+from tournaments.eligibility import TournamentRosterEligibility
+from tournaments.models import Tournament
 
-from members.models import Member, MemberSexEnum
+from members.models import Member
 
 logger = logging.getLogger(__name__)
 
-
-def _get_already_assigned_members_ids(
-    tournament: Tournament,
-) -> QuerySet[MemberAtTournament, int]:
-    return MemberAtTournament.objects.filter(tournament=tournament).values_list(
-        "member_id", flat=True
-    )
+SEARCH_LIMIT = 20
 
 
 def search(
-    query: str, club_id: int, tournament: Tournament | None, limit: int = 20
+    query: str, club_id: int, tournament: Tournament | None, limit: int | None = SEARCH_LIMIT
 ) -> list[Member]:
     query_length = len(query)
     qs = Member.objects.select_related("club")
@@ -48,33 +45,26 @@ def search(
         query_filter &= Q(is_active=True)
 
         if tournament:
-            division = tournament.competition.division
-            season = tournament.competition.season
-
-            if division.is_male_allowed != division.is_female_allowed:
-                sex_filter = (
-                    MemberSexEnum.MALE if division.is_male_allowed else MemberSexEnum.FEMALE
-                )
-                query_filter &= Q(sex=sex_filter)
-
-            if "open" in division.name.lower():
+            if "open" in tournament.competition.division.name.lower():
                 # Prefer men in open division
                 qs = qs.order_by("-sex", "id")
 
-            qs = qs.annotate_age(season.age_reference_date)  # type: ignore
-
-            if age_limit := tournament.competition.age_limit:
-                query_filter &= Q(
-                    sex=MemberSexEnum.MALE,
-                    age__range=(age_limit.m_min, age_limit.m_max),
-                ) | Q(
-                    sex=MemberSexEnum.FEMALE,
-                    age__range=(age_limit.f_min, age_limit.f_max),
-                )
-            else:
-                query_filter &= Q(age__gte=season.min_allowed_age)
-
-            query_filter &= ~Q(id__in=_get_already_assigned_members_ids(tournament))
+            qs = TournamentRosterEligibility(tournament).filter_candidates(qs)
 
     # TODO: add higher weight to members who already played for the club in this competition
     return list(qs.filter(query_filter)[:limit])
+
+
+def serialize_search_result(member: Member) -> dict[str, Any]:
+    return {
+        "id": member.id,
+        "full_name": f"{member.first_name} {member.last_name}",
+        "birth_year": member.birth_date.year,
+        "sex": member.sex,
+        "club": {
+            "id": member.club.id,
+            "name": member.club.name,
+        },
+        "default_jersey_number": member.default_jersey_number,
+        "flag": cast(Country, member.citizenship).unicode_flag,
+    }
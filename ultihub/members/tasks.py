@@ -1,20 +1,30 @@
 import logging
 from datetime import date
-from typing import cast
+from typing import Any, cast
 
 from clubs.models import Club
 from competitions.models import Season
 from core.helpers import create_csv
+from core.queues import BULK, db_task
 from core.tasks import send_email
 from django.contrib.auth.models import User
-from django.db.models import Exists, OuterRef, Subquery
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils.html import format_html
 from django.utils.timezone import now
 from django_countries.fields import Country
 from finance.services import calculate_season_fees
-from huey.contrib.djhuey import db_task
+from international_tournaments.models import MemberAtInternationalTournament
+from tournaments.models import MemberAtTournament
 
 from members.helpers import get_member_participation_counts
-from members.models import CoachLicence, Member
+from members.models import (
+    CoachLicence,
+    Member,
+    NsaExport,
+    NsaExportShard,
+    NsaExportShardStateEnum,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,29 +34,44 @@ def _format_date(date_: date) -> str:
     return f"{date_.day}.{date_.month}.{date_.year}"
 
 
-@db_task()
-def generate_nsa_export(user: User, season: Season, club: Club | None) -> None:
-    # https://rejstriksportu.cz/dashboard/public/dokumentace
+# fmt: off
+NSA_EXPORT_HEADER = [
+    "JMENO", "PRIJMENI", "TITUL_PRED", "TITUL_ZA",
+    "RODNE_CISLO", "OBCANSTVI", "DATUM_NAROZENI", "POHLAVI",
+    "NAZEV_OBCE", "NAZEV_CASTI_OBCE", "NAZEV_ULICE", "CISLO_POPISNE", "CISLO_ORIENTACNI", "PSC",
+    "SPORTOVEC", "SPORTOVCEM_OD", "SPORTOVCEM_DO", "SPORTOVEC_CETNOST", "SPORTOVEC_DRUH_SPORTU",
+    "SPORTOVEC_CINNOST_OD", "SPORTOVEC_CINNOST_DO", "SPORTOVEC_UCAST_SOUTEZE_POCET",
+    "TRENER", "TRENEREM_OD", "TRENEREM_DO", "TRENER_CETNOST", "TRENER_DRUH_SPORTU",
+    "TRENER_CINNOST_OD", "TRENER_CINNOST_DO", "SVAZ_ICO_SKTJ",
+]
+# fmt: on
 
-    logger.info(f"User {user.email} requested NSA export for {club.name if club else 'all clubs'}")
+
+def _get_participating_club_ids(season: Season) -> list[int]:
+    """Return ids of clubs whose members played at any tournament of the season."""
+    domestic = MemberAtTournament.objects.filter(
+        tournament__competition__season=season
+    ).values_list("member__club_id", flat=True)
+    international = MemberAtInternationalTournament.objects.filter(
+        tournament__season=season
+    ).values_list("member__club_id", flat=True)
+    return sorted(set(domestic.distinct()) | set(international.distinct()))
+
+
+def _build_nsa_export_rows(season: Season, club_id: int) -> list[list]:
     current_date = now().date()
 
-    logger.info("Calculating participation counts for active members")
-    member_participation = get_member_participation_counts(season)
-    logger.info(f"Participation counts calculated for {len(member_participation)} members")
+    member_participation = get_member_participation_counts(season, club_id)
 
     # Calculate season fees to filter out members who only played in free tournaments
-    logger.info("Calculating season fees to filter free-only players")
-    season_fees = calculate_season_fees(season, club.id if club else None)
-    members_with_fees = set(season_fees.keys())
-    logger.info(f"Found {len(members_with_fees)} members with season fees")
+    season_fees = calculate_season_fees(season, club_id)
+    members_with_fees = {m.id for m in season_fees}
 
     # Filter members: must have participation AND season fees (not free-only)
-    eligible_member_ids = set(member_participation.keys()) & {m.id for m in members_with_fees}
-    logger.info(f"Eligible members for NSA export: {len(eligible_member_ids)}")
+    eligible_member_ids = set(member_participation.keys()) & members_with_fees
 
     members_qs = (
-        Member.objects.filter(id__in=eligible_member_ids)
+        Member.objects.filter(id__in=eligible_member_ids, club_id=club_id)
         .select_related("club")
         .annotate(
             has_coach_licence=Exists(
@@ -64,9 +89,6 @@ def generate_nsa_export(user: User, season: Season, club: Club | None) -> None:
         )
     )
 
-    if club:
-        members_qs = members_qs.filter(club=club)
-
     data = []
     for member in members_qs:
         data.append(
@@ -112,24 +134,115 @@ def generate_nsa_export(user: User, season: Season, club: Club | None) -> None:
             ]
         )
 
-    # fmt: off
-    header = [
-        "JMENO", "PRIJMENI", "TITUL_PRED", "TITUL_ZA",
-        "RODNE_CISLO", "OBCANSTVI", "DATUM_NAROZENI", "POHLAVI",
-        "NAZEV_OBCE", "NAZEV_CASTI_OBCE", "NAZEV_ULICE", "CISLO_POPISNE", "CISLO_ORIENTACNI", "PSC",
-        "SPORTOVEC", "SPORTOVCEM_OD", "SPORTOVCEM_DO", "SPORTOVEC_CETNOST", "SPORTOVEC_DRUH_SPORTU",
-        "SPORTOVEC_CINNOST_OD", "SPORTOVEC_CINNOST_DO", "SPORTOVEC_UCAST_SOUTEZE_POCET",
-        "TRENER", "TRENEREM_OD", "TRENEREM_DO", "TRENER_CETNOST", "TRENER_DRUH_SPORTU",
-        "TRENER_CINNOST_OD", "TRENER_CINNOST_DO", "SVAZ_ICO_SKTJ",
-    ]
-    # fmt: on
+    return data
+
+
+@db_task(queue=BULK)
+def generate_nsa_export(user: User, season: Season, club: Club | None) -> None:
+    """
+    Start an NSA export. The export is split into one shard per club; the shards run
+    concurrently on the task queue and the last finished one enqueues the merge step.
+    """
+    # https://rejstriksportu.cz/dashboard/public/dokumentace
+
+    logger.info(f"User {user.email} requested NSA export for {club.name if club else 'all clubs'}")
+
+    club_ids = [club.id] if club else _get_participating_club_ids(season)
+
+    with transaction.atomic():
+        export = NsaExport.objects.create(requested_by=user, season=season, club=club)
+        NsaExportShard.objects.bulk_create(
+            [NsaExportShard(export=export, club_id=club_id) for club_id in club_ids]
+        )
+    logger.info(f"NSA export {export.id} split into {len(club_ids)} club shards")
 
-    csv_data = create_csv(header=header, data=data)
+    if not club_ids:
+        _complete_nsa_export_shard(export.id)
+        return
 
-    if club:
-        body = f"Hi. Here is the NSA export for the season {season.name} and club {club.name}."
+    # All shards exist before the first one is enqueued, so none of them can see
+    # the export as finished too early.
+    for club_id in club_ids:
+        generate_nsa_export_shard(export.id, club_id)
+
+
+@db_task(queue=BULK, retries=3, retry_delay=60, context=True)
+def generate_nsa_export_shard(export_id: int, club_id: int, *, task: Any = None) -> None:
+    shard = NsaExportShard.objects.select_related("export__season").get(
+        export_id=export_id, club_id=club_id
+    )
+    if shard.state != NsaExportShardStateEnum.PENDING:
+        logger.info(f"NSA export {export_id} shard for club {club_id} already finished, skipping")
+        return
+
+    NsaExportShard.objects.filter(pk=shard.pk).update(attempts=F("attempts") + 1)
+
+    try:
+        rows = _build_nsa_export_rows(shard.export.season, club_id)
+    except Exception:
+        retries_left = task.retries if task else 0
+        if retries_left > 0:
+            logger.warning(
+                f"NSA export {export_id} shard for club {club_id} failed,"
+                f" {retries_left} retries remaining"
+            )
+            raise
+        logger.exception(f"NSA export {export_id} shard for club {club_id} failed after retries")
+        NsaExportShard.objects.filter(pk=shard.pk).update(state=NsaExportShardStateEnum.FAILED)
+        _complete_nsa_export_shard(export_id)
+        raise
+
+    NsaExportShard.objects.filter(pk=shard.pk).update(state=NsaExportShardStateEnum.DONE, rows=rows)
+    logger.info(f"NSA export {export_id} shard for club {club_id} done with {len(rows)} members")
+    _complete_nsa_export_shard(export_id)
+
+
+def _complete_nsa_export_shard(export_id: int) -> None:
+    """Enqueue the merge step once, after the last shard of the export has finished."""
+    with transaction.atomic():
+        export = NsaExport.objects.select_for_update().get(pk=export_id)
+        shards = list(export.shards.values_list("state", flat=True))
+        finished = sum(1 for state in shards if state != NsaExportShardStateEnum.PENDING)
+        logger.info(f"NSA export {export_id} progress: {finished}/{len(shards)} clubs")
+
+        if finished < len(shards) or export.merge_enqueued_at is not None:
+            return
+
+        export.merge_enqueued_at = now()
+        export.save(update_fields=["merge_enqueued_at"])
+
+    merge_nsa_export(export_id)
+
+
+@db_task(queue=BULK)
+def merge_nsa_export(export_id: int) -> None:
+    export = NsaExport.objects.select_related("requested_by", "season", "club").get(pk=export_id)
+    shards = list(export.shards.select_related("club").order_by("club_id"))
+
+    data = [
+        row for shard in shards if shard.state == NsaExportShardStateEnum.DONE for row in shard.rows
+    ]
+    csv_data = create_csv(header=NSA_EXPORT_HEADER, data=data)
+
+    if export.club:
+        body = (
+            f"Hi. Here is the NSA export for the season {export.season.name}"
+            f" and club {export.club.name}."
+        )
     else:
-        body = f"Hi. Here is the NSA export for the season {season.name}."
+        body = f"Hi. Here is the NSA export for the season {export.season.name}."
+
+    if failed_clubs := [
+        shard.club.name for shard in shards if shard.state == NsaExportShardStateEnum.FAILED
+    ]:
+        body += format_html(
+            " <b>The export is incomplete</b>, these clubs failed: {}.", ", ".join(failed_clubs)
+        )
+
+    send_email("NSA export", body=body, to=[export.requested_by.email], csv_data=csv_data)
 
-    send_email("NSA export", body=body, to=[user.email], csv_data=csv_data)
-    logger.info(f"NSA export sent to {user.email}")
+    # The rows hold personal data, so keep them only until the file is sent
+    export.shards.update(rows=[])
+    export.sent_at = now()
+    export.save(update_fields=["sent_at"])
+    logger.info(f"NSA export {export_id} sent to {export.requested_by.email}")
@@ -2,20 +2,22 @@ import logging
 from typing import cast
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
 from clubs.models import Club
 from competitions.models import Season
-from core.helpers import get_current_club
+from core.helpers import aget_current_club, get_current_club
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
 from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import get_object_or_404, render
+from django.shortcuts import aget_object_or_404, get_object_or_404, render
 from django.urls import reverse
 from django.utils.timezone import now
 from django.views.decorators.http import require_GET, require_POST
 from django_countries.fields import Country
 from tournaments.models import Tournament
 
+from members.candidates import get_roster_candidates
 from members.forms import (
     MemberConfirmEmailForm,
     MemberForm,
@@ -31,6 +33,7 @@ from members.helpers import (
     revoke_transfer,
 )
 from members.models import CoachLicence, FavouriteMember, Member, Transfer
+from members.services import SEARCH_LIMIT, serialize_search_result
 from members.services import search as search_service
 from members.tasks import generate_nsa_export
 
@@ -128,8 +131,8 @@ def confirm_email(request: HttpRequest, token: UUID) -> HttpResponse:
 
 
 @login_required
-def search(request: HttpRequest) -> JsonResponse:
-    current_club = get_current_club(request)
+async def search(request: HttpRequest) -> JsonResponse:
+    current_club = await aget_current_club(request)
     query = request.GET.get("q", "").strip()
     tournament_id = request.GET.get("tournament_id")
     member_id = request.GET.get("member_id")
@@ -139,7 +142,9 @@ def search(request: HttpRequest) -> JsonResponse:
     if not tournament_id or tournament_id == "null":
         tournament = None
     else:
-        tournament = get_object_or_404(Tournament, pk=tournament_id)
+        tournament = await aget_object_or_404(
+            Tournament.objects.select_related("competition__division"), pk=tournament_id
+        )
 
     logger.info(
         f"Searching for members with query: {query},"
@@ -148,31 +153,16 @@ def search(request: HttpRequest) -> JsonResponse:
 
     if member_id:
         # If member_id is provided, return that specific member
-        try:
-            members = [Member.objects.select_related("club").get(pk=member_id)]
-        except Member.DoesNotExist:
-            members = []
+        member = await Member.objects.select_related("club").filter(pk=member_id).afirst()
+        results = [serialize_search_result(member)] if member else []
+    elif not query and tournament:
+        candidates = await sync_to_async(get_roster_candidates)(tournament, current_club.id)
+        results = candidates[:SEARCH_LIMIT]
     else:
-        members = search_service(query, current_club.id, tournament)
-
-    return JsonResponse(
-        {
-            "results": [
-                {
-                    "id": member.id,
-                    "full_name": f"{member.first_name} {member.last_name}",
-                    "birth_year": member.birth_date.year,
-                    "club": {
-                        "id": member.club.id,
-                        "name": member.club.name,
-                    },
-                    "default_jersey_number": member.default_jersey_number,
-                    "flag": cast(Country, member.citizenship).unicode_flag,
-                }
-                for member in members
-            ]
-        }
-    )
+        members = await sync_to_async(search_service)(query, current_club.id, tournament)
+        results = [serialize_search_result(member) for member in members]
+
+    return JsonResponse({"results": results})
 
 
 @login_required
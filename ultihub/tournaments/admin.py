@@ -52,7 +52,7 @@ class TournamentAdmin(AuditlogMixin, admin.ModelAdmin):
         "sotg_winner_team",
     )
     list_select_related = ("competition", "winner_team", "sotg_winner_team")
-    readonly_fields = ("winner_team", "sotg_winner_team")
+    readonly_fields = ("winner_team", "sotg_winner_team", "rosters_frozen_at")
     ordering = ("-created_at",)
     inlines = [TeamAtTournamentInline]
 
@@ -0,0 +1,216 @@
+"""
+Roster eligibility. The rules for adding members to a roster are evaluated for a whole set
+of members at once, in a constant number of queries, and shared by the roster forms (single
+and bulk) and the member search.
+"""
+
+import operator
+from collections.abc import Iterable
+from functools import cached_property, reduce
+from typing import NamedTuple
+
+from core.helpers import get_app_settings
+from core.models import AppSettings
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, QuerySet
+from members.models import Member, MemberSexEnum
+
+from tournaments.models import MemberAtTournament, TeamAtTournament, Tournament
+
+
+class Verdict(NamedTuple):
+    member: Member | None
+    reason: str | None = None
+
+    @property
+    def is_eligible(self) -> bool:
+        return self.reason is None
+
+
+class RosterEligibility:
+    """
+    Base of the eligibility rules of a roster. ``check`` fetches all the members with the
+    annotations from ``annotate`` in one query, and collects the verdicts from ``get_reason``
+    and ``check_batch``. Any other data is fetched for the whole batch in ``prepare``.
+    """
+
+    def check(self, member_ids: Iterable[int]) -> dict[int, Verdict]:
+        """Return a verdict for every member id, in the given order without duplicates."""
+        member_ids = list(dict.fromkeys(member_ids))
+        self.prepare(member_ids)
+        members = self.annotate(Member.objects.select_related("club")).in_bulk(member_ids)
+
+        verdicts = {}
+        for member_id in member_ids:
+            if (member := members.get(member_id)) is None:
+                verdicts[member_id] = Verdict(None, "Member not found")
+            else:
+                verdicts[member_id] = Verdict(member, self.get_reason(member))
+        self.check_batch(verdicts)
+        return verdicts
+
+    def prepare(self, member_ids: list[int]) -> None:
+        """Fetch whatever the rules need about the members, before they are checked."""
+
+    def annotate(self, queryset: QuerySet[Member]) -> QuerySet[Member]:
+        return queryset
+
+    def get_reason(self, member: Member) -> str | None:
+        return None
+
+    def check_batch(self, verdicts: dict[int, Verdict]) -> None:
+        """Reject members by rules that depend on the other members of the batch."""
+
+
+class TournamentRosterEligibility(RosterEligibility):
+    """
+    Rules of domestic tournaments: email confirmation, sex allowed in the division, age
+    limits at the season reference date, one roster per tournament, no team changes within
+    a competition (unless allowed) and at least 51% of Czech citizens.
+
+    Without ``team_at_tournament`` only the rules independent of the team are available,
+    which is the case of the member search.
+    """
+
+    def __init__(
+        self, tournament: Tournament, team_at_tournament: TeamAtTournament | None = None
+    ) -> None:
+        self.tournament = tournament
+        self.team_at_tournament = team_at_tournament
+        self.competition = tournament.competition
+
+    @cached_property
+    def app_settings(self) -> AppSettings:
+        return get_app_settings()
+
+    def _sex_q(self) -> Q:
+        division = self.competition.division
+        allowed = [
+            sex
+            for sex, is_allowed in (
+                (MemberSexEnum.MALE, division.is_male_allowed),
+                (MemberSexEnum.FEMALE, division.is_female_allowed),
+            )
+            if is_allowed
+        ]
+        return Q(sex__in=allowed)
+
+    def _age_q(self, check_min_age: bool) -> Q:
+        limits: dict[MemberSexEnum, tuple[int, int | None]]
+        if age_limit := self.competition.age_limit:
+            limits = {
+                MemberSexEnum.MALE: (age_limit.m_min, age_limit.m_max),
+                MemberSexEnum.FEMALE: (age_limit.f_min, age_limit.f_max),
+            }
+        else:
+            limits = dict.fromkeys(MemberSexEnum, (self.competition.season.min_allowed_age, None))
+
+        age_qs = []
+        for sex, (min_age, max_age) in limits.items():
+            sex_q = Q(sex=sex)
+            if check_min_age:
+                sex_q &= Q(age__gte=min_age)
+            if max_age is not None:
+                sex_q &= Q(age__lte=max_age)
+            age_qs.append(sex_q)
+        return reduce(operator.or_, age_qs)
+
+    def _annotate_age(self, queryset: QuerySet[Member]) -> QuerySet[Member]:
+        return queryset.annotate_age(self.competition.season.age_reference_date)  # type: ignore[attr-defined]
+
+    def _assigned_members(self) -> QuerySet[MemberAtTournament]:
+        return MemberAtTournament.objects.filter(tournament=self.tournament)
+
+    def filter_candidates(self, queryset: QuerySet[Member]) -> QuerySet[Member]:
+        """
+        Narrow the queryset down to members allowed by the division and age limits who are
+        not on any roster at the tournament yet. The minimum age is always applied here, so
+        the search does not offer members who need an exception.
+        """
+        return (
+            self._annotate_age(queryset)
+            .filter(self._sex_q(), self._age_q(check_min_age=True))
+            .exclude(id__in=self._assigned_members().values("member_id"))
+        )
+
+    def annotate(self, queryset: QuerySet[Member]) -> QuerySet[Member]:
+        return self._annotate_age(queryset).annotate(
+            is_sex_allowed=ExpressionWrapper(self._sex_q(), output_field=BooleanField()),
+            is_age_allowed=ExpressionWrapper(
+                self._age_q(check_min_age=self.app_settings.min_age_verification_required),
+                output_field=BooleanField(),
+            ),
+            is_at_tournament=Exists(self._assigned_members().filter(member=OuterRef("pk"))),
+        )
+
+    def prepare(self, member_ids: list[int]) -> None:
+        self._conflicts: dict[int, MemberAtTournament] = {}
+        if self.team_at_tournament is None or self.competition.allow_team_transfers:
+            return
+        conflicts = (
+            MemberAtTournament.objects.filter(
+                tournament__competition=self.competition, member_id__in=member_ids
+            )
+            .exclude(tournament=self.tournament)
+            .exclude(team_at_tournament__application__team=self.team_at_tournament.application.team)
+            .select_related("team_at_tournament__application", "tournament")
+            .order_by("-pk")
+        )
+        # The earliest registration is reported
+        self._conflicts = {conflict.member_id: conflict for conflict in conflicts}
+
+    def get_reason(self, member: Member) -> str | None:
+        if self.app_settings.email_verification_required and not member.has_email_confirmed:
+            return "Member has not confirmed email"
+        if not member.is_sex_allowed:  # type: ignore[attr-defined]
+            if member.sex == MemberSexEnum.MALE:
+                return "Men are not allowed in this division"
+            return "Women are not allowed in this division"
+        # A player can be on only one roster per tournament, regardless of the
+        # allow_team_transfers setting (transfers apply across tournaments, not within one).
+        if member.is_at_tournament:  # type: ignore[attr-defined]
+            return "Member is already on a roster at this tournament"
+        if conflict := self._conflicts.get(member.pk):
+            return (
+                "Member is already registered for another team in this competition: "
+                f"{conflict.team_at_tournament.application.team_name} ({conflict.tournament.name})"
+            )
+        if not member.is_age_allowed:  # type: ignore[attr-defined]
+            return "Member does not meet age requirements"
+        return None
+
+    def check_batch(self, verdicts: dict[int, Verdict]) -> None:
+        """
+        Keep at least 51% of Czech citizens on the roster. All eligible Czech members are
+        accepted first, then the foreign ones in the given order while the ratio allows it.
+        Czech members are refused too when the roster would still be under 51% with all of
+        them, as a single member always was.
+        """
+        if self.team_at_tournament is None:
+            return
+
+        citizenships = MemberAtTournament.objects.filter(
+            team_at_tournament=self.team_at_tournament
+        ).values_list("member__citizenship", flat=True)
+        czech_count = sum(1 for citizenship in citizenships if citizenship == "CZ")
+        foreign_count = len(citizenships) - czech_count
+        eligible = [
+            verdict.member
+            for verdict in verdicts.values()
+            if verdict.member is not None and verdict.is_eligible
+        ]
+        czech_count += sum(1 for member in eligible if member.citizenship == "CZ")
+
+        for member in eligible:
+            if member.citizenship == "CZ":
+                # Not even all the Czech members bring the roster to the ratio
+                if czech_count / (czech_count + foreign_count) * 100 < 51:
+                    verdicts[member.pk] = Verdict(
+                        member, "Nationality ratio: at least 51% must be Czech citizens"
+                    )
+                continue
+            if czech_count / (czech_count + foreign_count + 1) * 100 < 51:
+                verdicts[member.pk] = Verdict(
+                    member, "Nationality ratio: at least 51% must be Czech citizens"
+                )
+            else:
+                foreign_count += 1
@@ -1,11 +1,12 @@
-from typing import Any
+from typing import Any, cast
 
-from core.helpers import get_app_settings
 from django import forms
+from django.contrib.postgres.forms import SimpleArrayField
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from members.models import Member, MemberSexEnum
+from members.models import Member
 
+from tournaments.eligibility import TournamentRosterEligibility
 from tournaments.models import MemberAtTournament
 
 
@@ -22,138 +23,70 @@ class AddMemberToRosterForm(forms.Form):
         if cleaned_data is None:
             return {}
 
-        app_settings = get_app_settings()
-
         if self.team_at_tournament and cleaned_data.get("member_id"):
             tournament = self.team_at_tournament.tournament
             if tournament.rosters_deadline < timezone.now():
                 raise ValidationError({"member_id": "The roster deadline has passed"})
 
-            # Load member with age annotation for efficient age validation
-            try:
-                member = (
-                    Member.objects.get_queryset()
-                    .annotate_age(tournament.competition.season.age_reference_date)
-                    .get(pk=cleaned_data["member_id"])
-                )
-            except Member.DoesNotExist as err:
-                raise ValidationError({"member_id": "Member not found"}) from err
+            eligibility = TournamentRosterEligibility(tournament, self.team_at_tournament)
+            verdict = eligibility.check([cleaned_data["member_id"]])[cleaned_data["member_id"]]
+            if not verdict.is_eligible:
+                raise ValidationError({"member_id": verdict.reason})
 
             # Store for later use to avoid re-fetching
-            self.validated_member = member
-
-            if member:
-                if app_settings.email_verification_required and not member.has_email_confirmed:
-                    raise ValidationError({"member_id": "Member has not confirmed email"})
-
-                if (
-                    member.sex == MemberSexEnum.MALE
-                    and not tournament.competition.division.is_male_allowed
-                ):
-                    raise ValidationError({"member_id": "Men are not allowed in this division"})
-
-                if (
-                    member.sex == MemberSexEnum.FEMALE
-                    and not tournament.competition.division.is_female_allowed
-                ):
-                    raise ValidationError({"member_id": "Women are not allowed in this division"})
-
-                # A player can be on only one roster per tournament, regardless of
-                # the allow_team_transfers setting (transfers apply across tournaments,
-                # not within a single one).
-                if MemberAtTournament.objects.filter(
-                    tournament_id=tournament.id, member_id=member.id
-                ).exists():
-                    raise ValidationError(
-                        {"member_id": "Member is already on a roster at this tournament"}
-                    )
-
-                # Check if member is registered for another team in this competition
-                if not tournament.competition.allow_team_transfers:
-                    current_team = self.team_at_tournament.application.team
-                    if conflict := (
-                        MemberAtTournament.objects.filter(
-                            tournament__competition=tournament.competition,
-                            member_id=member.id,
-                        )
-                        .exclude(tournament=tournament)
-                        .exclude(team_at_tournament__application__team=current_team)
-                        .select_related(
-                            "team_at_tournament__application",
-                            "tournament",
-                        )
-                        .first()
-                    ):
-                        raise ValidationError(
-                            {
-                                "member_id": (
-                                    "Member is already registered for another team"
-                                    f" in this competition: "
-                                    f"{conflict.team_at_tournament.application.team_name}"
-                                    f" ({conflict.tournament.name})"
-                                )
-                            }
-                        )
-
-                if tournament.competition.age_limit:
-                    if member.sex == MemberSexEnum.MALE and (
-                        (
-                            app_settings.min_age_verification_required
-                            and member.age < tournament.competition.age_limit.m_min
-                        )
-                        or member.age > tournament.competition.age_limit.m_max
-                    ):
-                        raise ValidationError(
-                            {"member_id": "Member does not meet age requirements"}
-                        )
-
-                    if member.sex == MemberSexEnum.FEMALE and (
-                        (
-                            app_settings.min_age_verification_required
-                            and member.age < tournament.competition.age_limit.f_min
-                        )
-                        or member.age > tournament.competition.age_limit.f_max
-                    ):
-                        raise ValidationError(
-                            {"member_id": "Member does not meet age requirements"}
-                        )
-
-                else:
-                    if (
-                        app_settings.min_age_verification_required
-                        and member.age < tournament.competition.season.min_allowed_age
-                    ):
-                        raise ValidationError(
-                            {"member_id": "Member does not meet age requirements"}
-                        )
-
-                # Check nationality ratio (minimum 51% Czech citizens)
-                current_roster = MemberAtTournament.objects.filter(
-                    team_at_tournament=self.team_at_tournament
-                ).select_related("member")
-
-                # Count current nationality split
-                czech_count = sum(1 for mat in current_roster if mat.member.citizenship == "CZ")
-                foreign_count = len(current_roster) - czech_count
-
-                # Add the new member to counts
-                if member.citizenship == "CZ":
-                    czech_count += 1
-                else:
-                    foreign_count += 1
-
-                total_count = czech_count + foreign_count
-
-                # Check ratio (minimum 51% Czech citizens)
-                if total_count > 0:
-                    czech_percentage = (czech_count / total_count) * 100
-                    if czech_percentage < 51:
-                        msg = "Nationality ratio: at least 51% must be Czech citizens"
-                        raise ValidationError({"member_id": msg})
+            self.validated_member = verdict.member
 
         return cleaned_data
 
 
+class AddMembersToRosterForm(forms.Form):
+    """
+    Add many members to a roster at once. Members failing a check are rejected one by one,
+    so the rest of the batch can still be added.
+    """
+
+    member_ids = SimpleArrayField(forms.IntegerField(), widget=forms.HiddenInput())
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.team_at_tournament = kwargs.pop("team_at_tournament", None)
+        self.accepted_members: list[Member] = []
+        self.member_errors: dict[int, str] = {}
+        self.members: dict[int, Member] = {}
+        super().__init__(*args, **kwargs)
+
+    def clean(self) -> dict[str, Any]:
+        cleaned_data = super().clean()
+        if cleaned_data is None:
+            return {}
+
+        if self.team_at_tournament and cleaned_data.get("member_ids"):
+            tournament = self.team_at_tournament.tournament
+            if tournament.rosters_deadline < timezone.now():
+                raise ValidationError({"member_ids": "The roster deadline has passed"})
+
+            eligibility = TournamentRosterEligibility(tournament, self.team_at_tournament)
+            for member_id, verdict in eligibility.check(cleaned_data["member_ids"]).items():
+                if verdict.member is not None:
+                    self.members[member_id] = verdict.member
+                    if verdict.is_eligible:
+                        self.accepted_members.append(verdict.member)
+                        continue
+                self.member_errors[member_id] = cast(str, verdict.reason)
+
+        return cleaned_data
+
+    def get_member_errors_display(self) -> list[tuple[str, str]]:
+        return [
+            (
+                self.members[member_id].full_name
+                if member_id in self.members
+                else f"Member #{member_id}",
+                error,
+            )
+            for member_id, error in self.member_errors.items()
+        ]
+
+
 class UpdateMemberToRosterForm(forms.ModelForm):
     class Meta:
         model = MemberAtTournament
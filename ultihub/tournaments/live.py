@@ -0,0 +1,88 @@
+"""
+Live results of tournaments. Once a change of results commits, the current results are
+published to a Redis channel of the tournament (see ``services.schedule_winners_update``).
+``stream_results`` relays them to a watcher as server-sent events, from an async view, so
+spectators and scoreboards hold an idle connection instead of polling the pages.
+"""
+
+import json
+import logging
+from collections.abc import AsyncIterator
+from functools import cache
+from typing import Any
+
+import redis
+import redis.asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from tournaments.models import TeamAtTournament, Tournament
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "tournament-results:{}"
+KEEPALIVE = 15  # seconds between comments keeping an idle connection open
+RECONNECT_AFTER = 15  # seconds, where the connection cannot be held
+
+
+@cache
+def get_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    # A client is bound to the event loop it is used in, so each stream has its own
+    return redis.asyncio.Redis.from_url(settings.REDIS_URL)
+
+
+def get_results(tournament_id: int) -> dict[str, Any]:
+    winners = Tournament.objects.filter(pk=tournament_id).values(
+        "winner_team_id", "sotg_winner_team_id"
+    )
+    teams = (
+        TeamAtTournament.objects.filter(tournament_id=tournament_id)
+        .values("id", "final_placement", "spirit_avg", team_name=F("application__team_name"))
+        .order_by("final_placement", "seeding", "pk")
+    )
+    return {"tournament_id": tournament_id, **winners.get(), "teams": list(teams)}
+
+
+def publish_results(tournament_id: int) -> None:
+    """Publish the current results. Watchers are not worth failing the caller for."""
+    try:
+        results = json.dumps(get_results(tournament_id), cls=DjangoJSONEncoder)
+        get_redis().publish(CHANNEL.format(tournament_id), results)
+    except redis.RedisError:
+        logger.exception("Failed to publish results of tournament %s", tournament_id)
+
+
+def get_results_event(tournament_id: int, **fields: Any) -> str:
+    return _event(json.dumps(get_results(tournament_id), cls=DjangoJSONEncoder), **fields)
+
+
+async def stream_results(tournament_id: int) -> AsyncIterator[str]:
+    """Server-sent events with the current results and then each of their changes."""
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    try:
+        # Subscribed before reading the results, so no change in between is missed
+        await pubsub.subscribe(CHANNEL.format(tournament_id))
+        yield await sync_to_async(get_results_event)(tournament_id)
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE)
+            if message is None:
+                yield ": keepalive\n\n"
+            else:
+                yield _event(message["data"].decode())
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+def _event(data: str, retry: int | None = None) -> str:
+    event = f"event: results\ndata: {data}\n"
+    if retry is not None:
+        event += f"retry: {retry * 1000}\n"
+    return event + "\n"
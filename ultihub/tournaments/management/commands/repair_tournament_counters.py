@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from tournaments.services import repair_tournament_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized team and member counters of tournaments"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        fixed = repair_tournament_counters()
+        self.stdout.write(f"Fixed counters of {fixed} tournaments and teams")
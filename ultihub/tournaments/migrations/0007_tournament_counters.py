@@ -0,0 +1,56 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:39
+
+from typing import Any
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps: Any, schema_editor: Any) -> None:
+    """Populate team_count and member_count for existing tournaments and teams."""
+    Tournament = apps.get_model("tournaments", "Tournament")
+    TeamAtTournament = apps.get_model("tournaments", "TeamAtTournament")
+    MemberAtTournament = apps.get_model("tournaments", "MemberAtTournament")
+
+    def count(model: Any, field: str) -> Coalesce:
+        return Coalesce(
+            Subquery(
+                model.objects.filter(**{field: OuterRef("pk")})
+                .values(field)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+
+    Tournament.objects.update(
+        team_count=count(TeamAtTournament, "tournament"),
+        member_count=count(MemberAtTournament, "tournament"),
+    )
+    TeamAtTournament.objects.update(member_count=count(MemberAtTournament, "team_at_tournament"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tournaments", "0006_populate_tournament_winners"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teamattournament",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tournament",
+            name="team_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
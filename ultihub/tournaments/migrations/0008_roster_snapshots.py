@@ -0,0 +1,67 @@
+# Generated by Django 6.0.6 on 2026-10-19 15:08
+
+import django.db.models.deletion
+import django_countries.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tournaments", "0007_tournament_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tournament",
+            name="rosters_frozen_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name="RosterSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("first_name", models.CharField(max_length=32)),
+                ("last_name", models.CharField(max_length=32)),
+                ("birth_date", models.DateField()),
+                ("sex", models.IntegerField(choices=[(1, "Female"), (2, "Male")])),
+                ("citizenship", django_countries.fields.CountryField(max_length=2)),
+                ("club_name", models.CharField(max_length=48)),
+                ("team_name", models.CharField(max_length=48)),
+                ("team_club_name", models.CharField(max_length=48)),
+                ("is_captain", models.BooleanField(default=False)),
+                ("is_spirit_captain", models.BooleanField(default=False)),
+                ("is_coach", models.BooleanField(default=False)),
+                ("jersey_number", models.IntegerField(blank=True, null=True)),
+                ("added_at", models.DateTimeField()),
+                (
+                    "member_at_tournament",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot",
+                        to="tournaments.memberattournament",
+                    ),
+                ),
+                (
+                    "team_at_tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roster_snapshots",
+                        to="tournaments.teamattournament",
+                    ),
+                ),
+                (
+                    "tournament",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roster_snapshots",
+                        to="tournaments.tournament",
+                    ),
+                ),
+            ],
+        ),
+    ]
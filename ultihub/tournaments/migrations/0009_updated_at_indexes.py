@@ -0,0 +1,21 @@
+# Generated by Django 6.0.6 on 2026-10-19 15:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("competitions", "0015_updated_at_indexes"),
+        ("tournaments", "0008_roster_snapshots"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="teamattournament",
+            index=models.Index(fields=["updated_at", "id"], name="team_at_tournament_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tournament",
+            index=models.Index(fields=["updated_at", "id"], name="tournament_updated_at_idx"),
+        ),
+    ]
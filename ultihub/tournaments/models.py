@@ -1,14 +1,43 @@
 from datetime import datetime
 from decimal import Decimal
+from typing import Any
 
 from core.models import AuditModel
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models, transaction
 from django.utils import timezone
+from django_countries.fields import CountryField
+from members.models import MemberSexEnum
 
 
-class Tournament(AuditModel):
+class CounterFieldsMixin(models.Model):
+    """
+    Counter fields are only written by atomic updates (``tournaments.services.update_counters``),
+    so saving a stale instance must not overwrite them. The same applies to other fields kept
+    up to date by queryset updates.
+
+    A save of an existing instance therefore always passes ``update_fields``: every other
+    column is written on each save, and saving an instance whose row was deleted raises
+    ``DatabaseError`` ("did not affect any rows") instead of inserting the row again.
+    """
+
+    counter_fields: tuple[str, ...] = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class Tournament(CounterFieldsMixin, AuditModel):
     competition = models.ForeignKey(
         "competitions.Competition",
         on_delete=models.PROTECT,
@@ -33,10 +62,29 @@ class Tournament(AuditModel):
         blank=True,
         related_name="sotg_won_tournaments",
     )
+    counter_fields = ("team_count", "member_count", "rosters_frozen_at")
+
+    # Denormalized counts maintained by tournaments.signals, fixed by repair_tournament_counters
+    team_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    member_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    # Set when the rosters are copied to RosterSnapshot, cleared by any later roster change
+    rosters_frozen_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         unique_together = ("competition", "name")
         app_label = "tournaments"
+        # Changefeed of the API (api.changes)
+        indexes = [models.Index(fields=["updated_at", "id"], name="tournament_updated_at_idx")]
 
     def clean(self) -> None:
         super().clean()
@@ -62,7 +110,8 @@ class Tournament(AuditModel):
                     }
                 )
 
-    def __str__(self) -> str:
+    # Kept below clean(), ruff reports the order only since the model has a local base class
+    def __str__(self) -> str:  # noqa: DJ012
         return f"{self.name} ({self.competition})"
 
     @transaction.atomic
@@ -83,14 +132,22 @@ class Tournament(AuditModel):
             .order_by(F("spirit_avg").desc(), "final_placement", "pk")
             .first()
         )
-        self.save(update_fields=["winner_team", "sotg_winner_team"])
+        # updated_at too, the API changefeed and conditional GETs rely on it
+        self.save(update_fields=["winner_team", "sotg_winner_team", "updated_at"])
 
     @property
     def has_open_rosters(self) -> bool:
         return self.rosters_deadline > timezone.now()
 
+    @property
+    def has_frozen_rosters(self) -> bool:
+        # Moving the deadline after the freeze reopens the rosters
+        return (
+            self.rosters_frozen_at is not None and self.rosters_frozen_at >= self.rosters_deadline
+        )
+
 
-class TeamAtTournament(AuditModel):
+class TeamAtTournament(CounterFieldsMixin, AuditModel):
     tournament = models.ForeignKey(
         Tournament,
         on_delete=models.PROTECT,
@@ -117,6 +174,13 @@ class TeamAtTournament(AuditModel):
         blank=True,
         validators=[MinValueValidator(1)],
     )
+    counter_fields = ("member_count",)
+
+    # Denormalized roster size, see Tournament.member_count
+    member_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         unique_together = (
@@ -124,6 +188,8 @@ class TeamAtTournament(AuditModel):
             ("tournament", "seeding"),
         )
         app_label = "tournaments"
+        # Changefeed of the API (api.changes)
+        indexes = [models.Index(fields=["updated_at", "id"], name="team_at_tournament_updated_idx")]
 
     def __str__(self) -> str:
         return f"{self.application.team_name}"
@@ -172,3 +238,47 @@ class MemberAtTournament(AuditModel):
 
     def __str__(self) -> str:
         return f"{self.member}"
+
+
+class RosterSnapshot(models.Model):
+    """
+    A member on a roster, copied with everything the historical readers need once the roster
+    deadline passes (see ``tournaments.services.freeze_rosters``). Past rosters are then read
+    from this table alone. Names and clubs are kept as they were at the tournament.
+    """
+
+    member_at_tournament = models.OneToOneField(
+        MemberAtTournament,
+        on_delete=models.CASCADE,
+        related_name="snapshot",
+    )
+    tournament = models.ForeignKey(
+        Tournament,
+        on_delete=models.CASCADE,
+        related_name="roster_snapshots",
+    )
+    team_at_tournament = models.ForeignKey(
+        TeamAtTournament,
+        on_delete=models.CASCADE,
+        related_name="roster_snapshots",
+    )
+    first_name = models.CharField(max_length=32)
+    last_name = models.CharField(max_length=32)
+    birth_date = models.DateField()
+    sex = models.IntegerField(choices=MemberSexEnum.choices)
+    citizenship = CountryField()
+    club_name = models.CharField(max_length=48)
+    team_name = models.CharField(max_length=48)
+    team_club_name = models.CharField(max_length=48)
+    is_captain = models.BooleanField(default=False)
+    is_spirit_captain = models.BooleanField(default=False)
+    is_coach = models.BooleanField(default=False)
+    jersey_number = models.IntegerField(null=True, blank=True)
+    added_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return self.full_name
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.last_name} {self.first_name}"
@@ -0,0 +1,267 @@
+import threading
+from collections import defaultdict
+from collections.abc import Sequence
+from functools import partial
+from typing import Any
+
+from auditlog.diff import model_instance_diff
+from auditlog.models import LogEntry
+from clubs.models import Club
+from clubs.services import notify_club
+from django.db import transaction
+from django.db.models import Count, F, Model, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from members.candidates import remove_roster_candidates
+from members.models import Member
+
+from tournaments.live import publish_results
+from tournaments.models import MemberAtTournament, RosterSnapshot, TeamAtTournament, Tournament
+
+
+def update_counters(model: type[Model], pk: int, **deltas: int) -> None:
+    """Atomically add ``deltas`` to the counter fields of one row, never going below zero."""
+    model._default_manager.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    )
+
+
+def _count_subquery(model: type[Model], field: str) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            model._default_manager.filter(**{field: OuterRef("pk")})
+            .values(field)
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+def repair_tournament_counters() -> int:
+    """Recompute the denormalized team/member counters, return the number of fixed rows."""
+    fixed = 0
+
+    for tournament in Tournament.objects.annotate(
+        actual_team_count=_count_subquery(TeamAtTournament, "tournament"),
+        actual_member_count=_count_subquery(MemberAtTournament, "tournament"),
+    ).exclude(team_count=F("actual_team_count"), member_count=F("actual_member_count")):
+        Tournament.objects.filter(pk=tournament.pk).update(
+            team_count=tournament.actual_team_count,
+            member_count=tournament.actual_member_count,
+        )
+        fixed += 1
+
+    for team_at_tournament in TeamAtTournament.objects.annotate(
+        actual_member_count=_count_subquery(MemberAtTournament, "team_at_tournament"),
+    ).exclude(member_count=F("actual_member_count")):
+        # Updated in the queryset to skip the winners recalculation signal
+        TeamAtTournament.objects.filter(pk=team_at_tournament.pk).update(
+            member_count=team_at_tournament.actual_member_count
+        )
+        fixed += 1
+
+    return fixed
+
+
+# Tournaments whose winners update is scheduled on commit. Thread local, like the connection
+# the callbacks are registered on.
+_scheduled_winners_updates = threading.local()
+
+
+def _get_scheduled_winners_updates() -> set[int]:
+    if not hasattr(_scheduled_winners_updates, "tournament_ids"):
+        _scheduled_winners_updates.tournament_ids = set()
+    return _scheduled_winners_updates.tournament_ids
+
+
+def _update_winners(tournament_id: int) -> None:
+    scheduled = _get_scheduled_winners_updates()
+    if tournament_id not in scheduled:
+        # Already updated by an earlier callback of the same commit
+        return
+    scheduled.remove(tournament_id)
+    if tournament := Tournament.objects.filter(pk=tournament_id).first():
+        tournament.update_winners()
+        publish_results(tournament_id)
+
+
+def schedule_winners_update(tournament_id: int) -> None:
+    """
+    Recalculate the tournament winners once the current transaction commits and publish the
+    results to live watchers. Result edits of many teams in one transaction (an admin inline,
+    a bulk upload) trigger a single update.
+    """
+    # Every edit registers a callback, so one dropped with a rolled back savepoint (or
+    # transaction) leaves the others in place. Only the first to run does the update.
+    _get_scheduled_winners_updates().add(tournament_id)
+    transaction.on_commit(partial(_update_winners, tournament_id))
+
+
+def update_results(tournament: Tournament, results: list[dict[str, Any]]) -> list[TeamAtTournament]:
+    """
+    Set ``final_placement`` and ``spirit_avg`` of many teams at the tournament at once.
+    Each result holds the ``id`` of the team at tournament and the fields to set. The teams
+    are saved one by one, so each change is audited, and the winners are recalculated once.
+    Validate the results in the same transaction (see ``TournamentResultsView``).
+    """
+    with transaction.atomic():
+        teams = tournament.teams.select_for_update().in_bulk([result["id"] for result in results])
+        for result in results:
+            team = teams[result["id"]]
+            fields = [field for field in ("final_placement", "spirit_avg") if field in result]
+            for field in fields:
+                setattr(team, field, result[field])
+            # Each save schedules the same winners update, which runs once on commit
+            team.save(update_fields=[*fields, "updated_at"])
+    return [teams[result["id"]] for result in results]
+
+
+def add_members_to_roster(
+    team_at_tournament: TeamAtTournament, members: list[Member], tournament_url: str
+) -> list[MemberAtTournament]:
+    """
+    Add already validated members to the roster in one insert. Clubs of members coming
+    from another club get one notification listing all their players.
+    """
+    with transaction.atomic():
+        members_at_tournament = MemberAtTournament.objects.bulk_create(
+            [
+                MemberAtTournament(
+                    tournament_id=team_at_tournament.tournament_id,
+                    team_at_tournament=team_at_tournament,
+                    member=member,
+                    jersey_number=member.default_jersey_number,
+                )
+                for member in members
+            ]
+        )
+        # bulk_create sends no post_save signal, so the rows are audited and the counters
+        # and candidates are updated here
+        for member_at_tournament in members_at_tournament:
+            LogEntry.objects.log_create(
+                member_at_tournament,
+                action=LogEntry.Action.CREATE,
+                changes=model_instance_diff(None, member_at_tournament),
+            )
+        update_counters(Tournament, team_at_tournament.tournament_id, member_count=len(members))
+        update_counters(TeamAtTournament, team_at_tournament.pk, member_count=len(members))
+        remove_roster_candidates(team_at_tournament.tournament_id, members)
+
+    home_club = team_at_tournament.application.team.club
+    players_by_club: dict[Club, list[Member]] = defaultdict(list)
+    for member in members:
+        if member.club != home_club:
+            players_by_club[member.club].append(member)
+
+    for club, players in players_by_club.items():
+        notify_club(
+            club=club,
+            subject="Roster announcement",
+            message=format_html(
+                "Your {} {} {} been registered on the <b>{}</b> roster"
+                ' for the <a href="{}">{}</a> tournament.',
+                "player" if len(players) == 1 else "players",
+                format_html_join(", ", "<b>{}</b>", ((player.full_name,) for player in players)),
+                "has" if len(players) == 1 else "have",
+                team_at_tournament.application.team_name,
+                tournament_url,
+                team_at_tournament.tournament,
+            ),
+        )
+    return members_at_tournament
+
+
+def build_roster_snapshots(
+    members_at_tournament: QuerySet[MemberAtTournament],
+) -> list[RosterSnapshot]:
+    """Copy the members on rosters to (unsaved) snapshots, in the order of the queryset."""
+    return [
+        RosterSnapshot(
+            member_at_tournament=member_at_tournament,
+            tournament_id=member_at_tournament.tournament_id,
+            team_at_tournament_id=member_at_tournament.team_at_tournament_id,
+            first_name=member_at_tournament.member.first_name,
+            last_name=member_at_tournament.member.last_name,
+            birth_date=member_at_tournament.member.birth_date,
+            sex=member_at_tournament.member.sex,
+            citizenship=member_at_tournament.member.citizenship,
+            club_name=member_at_tournament.member.club.name,
+            team_name=member_at_tournament.team_at_tournament.application.team_name,
+            team_club_name=member_at_tournament.team_at_tournament.application.team.club.name,
+            is_captain=member_at_tournament.is_captain,
+            is_spirit_captain=member_at_tournament.is_spirit_captain,
+            is_coach=member_at_tournament.is_coach,
+            jersey_number=member_at_tournament.jersey_number,
+            added_at=member_at_tournament.created_at,
+        )
+        for member_at_tournament in members_at_tournament.select_related(
+            "member__club", "team_at_tournament__application__team__club"
+        )
+    ]
+
+
+def get_tournaments_to_freeze() -> QuerySet[Tournament]:
+    """Tournaments past the roster deadline whose rosters are not frozen (or were changed)."""
+    return Tournament.objects.filter(rosters_deadline__lte=timezone.now()).filter(
+        Q(rosters_frozen_at__isnull=True) | Q(rosters_frozen_at__lt=F("rosters_deadline"))
+    )
+
+
+def freeze_rosters(tournament_id: int) -> int:
+    """
+    Replace the roster snapshots of the tournament with its current rosters and return the
+    number of members. The tournament row is locked, so a concurrent roster change either
+    waits and is included, or clears the freeze once this transaction commits.
+    """
+    with transaction.atomic():
+        Tournament.objects.select_for_update().filter(pk=tournament_id).exists()
+        RosterSnapshot.objects.filter(tournament_id=tournament_id).delete()
+        snapshots = RosterSnapshot.objects.bulk_create(
+            build_roster_snapshots(
+                MemberAtTournament.objects.filter(tournament_id=tournament_id).order_by("pk")
+            )
+        )
+        Tournament.objects.filter(pk=tournament_id).update(rosters_frozen_at=timezone.now())
+    return len(snapshots)
+
+
+def thaw_rosters(tournament_id: int) -> None:
+    """Fall back to the live rosters until the tournament is frozen again."""
+    Tournament.objects.filter(pk=tournament_id, rosters_frozen_at__isnull=False).update(
+        rosters_frozen_at=None
+    )
+
+
+# Fields of RosterSnapshot mapped to the lookups of MemberAtTournament they are copied from
+_LIVE_ROSTER_ORDERING = {
+    "team_name": "team_at_tournament__application__team_name",
+    "first_name": "member__first_name",
+    "last_name": "member__last_name",
+    "added_at": "created_at",
+}
+
+
+def get_roster_snapshots(
+    tournament: Tournament,
+    team_at_tournament: TeamAtTournament | None = None,
+    order_by: Sequence[str] = ("added_at",),
+) -> list[RosterSnapshot]:
+    """
+    Members on the rosters of the tournament, or of one team at it. Frozen rosters are read
+    from the snapshots, open ones are built from the live rosters. ``order_by`` takes fields
+    of ``RosterSnapshot`` listed in ``_LIVE_ROSTER_ORDERING``.
+    """
+    if tournament.has_frozen_rosters:
+        snapshots = RosterSnapshot.objects.filter(tournament=tournament)
+        if team_at_tournament is not None:
+            snapshots = snapshots.filter(team_at_tournament=team_at_tournament)
+        return list(snapshots.order_by(*order_by, "pk"))
+
+    members_at_tournament = MemberAtTournament.objects.filter(tournament=tournament)
+    if team_at_tournament is not None:
+        members_at_tournament = members_at_tournament.filter(team_at_tournament=team_at_tournament)
+    return build_roster_snapshots(
+        members_at_tournament.order_by(*(_LIVE_ROSTER_ORDERING[field] for field in order_by), "pk")
+    )
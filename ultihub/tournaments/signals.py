@@ -1,7 +1,9 @@
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
+from members import candidates as roster_candidates
 
-from tournaments.models import TeamAtTournament
+from tournaments.models import MemberAtTournament, TeamAtTournament, Tournament
+from tournaments.services import schedule_winners_update, thaw_rosters, update_counters
 
 
 @receiver(post_save, sender=TeamAtTournament)
@@ -9,9 +11,8 @@ def update_tournament_winners_on_save(
     sender: type[TeamAtTournament], instance: TeamAtTournament, **kwargs: object
 ) -> None:
     """Update tournament winners when a team's results are modified."""
-    # Only update if final_placement or spirit_avg might have changed
-    # We update on every save to keep it simple and consistent
-    instance.tournament.update_winners()
+    # Deferred to the commit, so a batch of result edits recalculates winners only once
+    schedule_winners_update(instance.tournament_id)
 
 
 @receiver(post_delete, sender=TeamAtTournament)
@@ -19,4 +20,104 @@ def update_tournament_winners_on_delete(
     sender: type[TeamAtTournament], instance: TeamAtTournament, **kwargs: object
 ) -> None:
     """Update tournament winners when a team is deleted."""
-    instance.tournament.update_winners()
+    schedule_winners_update(instance.tournament_id)
+
+
+@receiver(post_save, sender=TeamAtTournament)
+def increment_team_count(
+    sender: type[TeamAtTournament], instance: TeamAtTournament, created: bool, **kwargs: object
+) -> None:
+    if created:
+        update_counters(Tournament, instance.tournament_id, team_count=1)
+
+
+@receiver(post_delete, sender=TeamAtTournament)
+def decrement_team_count(
+    sender: type[TeamAtTournament], instance: TeamAtTournament, **kwargs: object
+) -> None:
+    update_counters(Tournament, instance.tournament_id, team_count=-1)
+
+
+@receiver(post_save, sender=MemberAtTournament)
+def increment_member_count(
+    sender: type[MemberAtTournament],
+    instance: MemberAtTournament,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    if created:
+        update_counters(Tournament, instance.tournament_id, member_count=1)
+        update_counters(TeamAtTournament, instance.team_at_tournament_id, member_count=1)
+
+
+@receiver(pre_save, sender=MemberAtTournament)
+def remember_previous_team(
+    sender: type[MemberAtTournament],
+    instance: MemberAtTournament,
+    update_fields: frozenset[str] | None,
+    **kwargs: object,
+) -> None:
+    """Remember the team the member is saved from, see ``move_member_count``."""
+    moving_fields = {"tournament", "tournament_id", "team_at_tournament", "team_at_tournament_id"}
+    if instance._state.adding or (update_fields is not None and not moving_fields & update_fields):
+        return
+    instance._previous_team = (  # type: ignore[attr-defined]
+        MemberAtTournament.objects.filter(pk=instance.pk)
+        .values_list("tournament_id", "team_at_tournament_id")
+        .first()
+    )
+
+
+@receiver(post_save, sender=MemberAtTournament)
+def move_member_count(
+    sender: type[MemberAtTournament],
+    instance: MemberAtTournament,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    """A member moved to another team (e.g. in the admin) is counted in the new one."""
+    previous = instance.__dict__.pop("_previous_team", None)
+    if created or previous is None:
+        return
+    tournament_id, team_at_tournament_id = previous
+    if tournament_id != instance.tournament_id:
+        update_counters(Tournament, tournament_id, member_count=-1)
+        update_counters(Tournament, instance.tournament_id, member_count=1)
+    if team_at_tournament_id != instance.team_at_tournament_id:
+        update_counters(TeamAtTournament, team_at_tournament_id, member_count=-1)
+        update_counters(TeamAtTournament, instance.team_at_tournament_id, member_count=1)
+
+
+@receiver(post_delete, sender=MemberAtTournament)
+def decrement_member_count(
+    sender: type[MemberAtTournament], instance: MemberAtTournament, **kwargs: object
+) -> None:
+    update_counters(Tournament, instance.tournament_id, member_count=-1)
+    update_counters(TeamAtTournament, instance.team_at_tournament_id, member_count=-1)
+
+
+@receiver(post_save, sender=MemberAtTournament)
+def remove_roster_candidate(
+    sender: type[MemberAtTournament],
+    instance: MemberAtTournament,
+    created: bool,
+    **kwargs: object,
+) -> None:
+    if created:
+        roster_candidates.remove_roster_candidates(instance.tournament_id, [instance.member])
+
+
+@receiver(post_delete, sender=MemberAtTournament)
+def add_roster_candidate(
+    sender: type[MemberAtTournament], instance: MemberAtTournament, **kwargs: object
+) -> None:
+    roster_candidates.add_roster_candidate(instance.tournament, instance.member)
+
+
+@receiver(post_save, sender=MemberAtTournament)
+@receiver(post_delete, sender=MemberAtTournament)
+def thaw_changed_rosters(
+    sender: type[MemberAtTournament], instance: MemberAtTournament, **kwargs: object
+) -> None:
+    """A roster changed after the freeze (e.g. in the admin) is frozen again by the next run."""
+    thaw_rosters(instance.tournament_id)
@@ -0,0 +1,17 @@
+import logging
+
+from core.queues import MAINTENANCE, db_periodic_task, lock_task
+from huey import crontab
+
+from tournaments.services import freeze_rosters, get_tournaments_to_freeze
+
+logger = logging.getLogger(__name__)
+
+
+@db_periodic_task(crontab(minute="*/15"), queue=MAINTENANCE)
+@lock_task(MAINTENANCE, "freeze-rosters")
+def freeze_past_rosters() -> None:
+    """Copy the rosters of tournaments past the roster deadline to the roster snapshots."""
+    for tournament_id in get_tournaments_to_freeze().values_list("id", flat=True):
+        count = freeze_rosters(tournament_id)
+        logger.info("Rosters of tournament %s frozen with %s members", tournament_id, count)
@@ -26,6 +26,11 @@ urlpatterns = [
         views.roster_dialog_add_form_view,
         name="roster_dialog_add_form",
     ),
+    path(
+        "team-at-tournament/<int:team_at_tournament_id>/bulk-add",
+        views.roster_dialog_bulk_add_form_view,
+        name="roster_dialog_bulk_add_form",
+    ),
     path(
         "member-at-tournament/<int:member_at_tournament_id>/update",
         views.roster_dialog_update_form_view,
@@ -41,6 +46,11 @@ urlpatterns = [
         views.teams_table_view,
         name="teams_table",
     ),
+    path(
+        "<int:tournament_id>/results-stream",
+        views.results_stream_view,
+        name="results_stream",
+    ),
     path(
         "<int:tournament_id>/export-rosters-csv",
         views.export_rosters_csv_view,
@@ -1,9 +1,14 @@
 import csv
 import logging
+from collections.abc import AsyncIterator, Iterable
 from typing import cast
 
+from asgiref.sync import sync_to_async
+from clubs.models import Club, ClubNotification
 from clubs.services import notify_club
 from competitions.filters import TournamentFilterSet
+from competitions.models import AgeLimit, Competition, CompetitionApplication, Division, Season
+from core.conditional import conditional_response
 from core.helpers import (
     get_current_club,
     get_current_club_or_none,
@@ -13,22 +18,34 @@ from core.helpers import (
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError
-from django.db.models import Avg, BooleanField, Count, Exists, OuterRef, Value
-from django.http import HttpRequest, HttpResponse
+from django.db.models import Avg, BooleanField, Exists, OuterRef, QuerySet, Value
+from django.http import Http404, HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.template.defaultfilters import pluralize
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.html import format_html
 from django.views.decorators.http import require_GET, require_POST, require_safe
 from django_countries.fields import Country
+from members.candidates import get_roster_candidates
 from members.models import Member
+from users.models import Agent
+from users.services import get_user_managed_clubs
 
-from tournaments.forms import AddMemberToRosterForm, UpdateMemberToRosterForm
+from tournaments.forms import (
+    AddMembersToRosterForm,
+    AddMemberToRosterForm,
+    UpdateMemberToRosterForm,
+)
+from tournaments.live import RECONNECT_AFTER, get_results_event, stream_results
 from tournaments.models import (
     MemberAtTournament,
     TeamAtTournament,
     Tournament,
 )
+from tournaments.services import add_members_to_roster, get_roster_snapshots
 
 logger = logging.getLogger(__name__)
 
@@ -56,8 +73,6 @@ def tournaments_view(request: HttpRequest) -> HttpResponse:
     queryset = filter_set.qs
 
     tournaments = queryset.annotate(
-        team_count=Count("teams", distinct=True),
-        member_count=Count("members", distinct=True),
         includes_my_club_team=Exists(
             TeamAtTournament.objects.filter(
                 tournament=OuterRef("pk"), application__team__club_id=club.id
@@ -77,12 +92,53 @@ def tournaments_view(request: HttpRequest) -> HttpResponse:
     )
 
 
+def _base_page_querysets(request: HttpRequest) -> list[QuerySet]:
+    """
+    The per-user parts of ``core/base.html``: the agent, the club switcher and the badge of
+    unread notifications.
+    """
+    if not request.user.is_authenticated:
+        return []
+    querysets = [Agent.objects.filter(user=request.user), get_user_managed_clubs(request.user)]
+    if club := get_current_club_or_none(request):
+        querysets.append(
+            ClubNotification.objects.filter(
+                is_read=False,
+                agent_at_club__agent__user=request.user,
+                agent_at_club__club_id=club.id,
+            )
+        )
+    return querysets
+
+
+def _tournament_querysets(request: HttpRequest, tournament_id: int) -> list[QuerySet]:
+    return [
+        Tournament.objects.filter(pk=tournament_id),
+        TeamAtTournament.objects.filter(tournament_id=tournament_id),
+        CompetitionApplication.objects.filter(teamattournament__tournament_id=tournament_id),
+    ]
+
+
 @require_GET
+@conditional_response(
+    lambda request, tournament_id: [
+        *_tournament_querysets(request, tournament_id),
+        *_base_page_querysets(request),
+        MemberAtTournament.objects.filter(tournament_id=tournament_id),
+        Competition.objects.filter(tournaments=tournament_id),
+        Season.objects.filter(competition__tournaments=tournament_id),
+        Division.objects.filter(competition__tournaments=tournament_id),
+        AgeLimit.objects.filter(competition__tournaments=tournament_id),
+        # Its count changes when the roster deadline passes
+        Tournament.objects.filter(pk=tournament_id, rosters_deadline__gt=timezone.now()),
+    ],
+    vary_on_user=True,
+    private=True,
+    no_cache=True,
+)
 def tournament_detail_view(request: HttpRequest, tournament_id: int) -> HttpResponse:
     tournament = get_object_or_404(
         Tournament.objects.select_related("competition").annotate(
-            team_count=Count("teams", distinct=True),
-            member_count=Count("members", distinct=True),
             avg_spirit=Avg("teams__spirit_avg"),
         ),
         pk=tournament_id,
@@ -96,17 +152,16 @@ def tournament_detail_view(request: HttpRequest, tournament_id: int) -> HttpResp
 
 @require_GET
 def roster_dialog_view(request: HttpRequest, team_at_tournament_id: int) -> HttpResponse:
-    team_at_tournament = get_object_or_404(TeamAtTournament, pk=team_at_tournament_id)
+    team_at_tournament = get_object_or_404(
+        TeamAtTournament.objects.select_related("tournament", "application__team"),
+        pk=team_at_tournament_id,
+    )
     return render(
         request,
         "tournaments/partials/roster_dialog.html",
         {
             "team_at_tournament": team_at_tournament,
-            "members_at_tournament": MemberAtTournament.objects.select_related(
-                "member__club", "team_at_tournament__application__team"
-            )
-            .filter(team_at_tournament_id=team_at_tournament.id)
-            .order_by("created_at"),
+            "roster": get_roster_snapshots(team_at_tournament.tournament, team_at_tournament),
         },
     )
 
@@ -177,6 +232,8 @@ def roster_dialog_add_form_view(request: HttpRequest, team_at_tournament_id: int
             )
     else:
         form = AddMemberToRosterForm()
+        # Build the candidates for the member search while the dialog opens
+        get_roster_candidates(team_at_tournament.tournament, current_club.id)
 
     return render(
         request,
@@ -189,6 +246,83 @@ def roster_dialog_add_form_view(request: HttpRequest, team_at_tournament_id: int
     )
 
 
+@login_required
+def roster_dialog_bulk_add_form_view(
+    request: HttpRequest, team_at_tournament_id: int
+) -> HttpResponse:
+    team_at_tournament = get_object_or_404(
+        TeamAtTournament.objects.select_related(
+            "application",
+            "application__team",
+            "application__team__club",
+            "tournament",
+            "tournament__competition",
+            "tournament__competition__season",
+            "tournament__competition__division",
+            "tournament__competition__age_limit",
+        ),
+        pk=team_at_tournament_id,
+    )
+
+    current_club = get_current_club(request)
+    if current_club.id != team_at_tournament.application.team.club_id:
+        raise PermissionDenied()
+
+    if request.method == "POST":
+        form = AddMembersToRosterForm(request.POST, team_at_tournament=team_at_tournament)
+
+        if form.is_valid():
+            if form.accepted_members:
+                try:
+                    add_members_to_roster(
+                        team_at_tournament,
+                        form.accepted_members,
+                        tournament_url=request.build_absolute_uri(
+                            reverse("tournaments:detail", args=(team_at_tournament.tournament_id,))
+                        ),
+                    )
+                except IntegrityError:
+                    # A concurrent submit added some of the members in the meantime
+                    messages.error(request, "Some of the members are already on the roster.")
+                    return HttpResponse(status=400)
+                count = len(form.accepted_members)
+                messages.success(request, f"{count} member{pluralize(count)} added successfully")
+
+            if not form.member_errors:
+                return hx_trigger_response(
+                    showRosterDialog={"teamAtTournamentId": team_at_tournament_id},
+                    teamsListChanged=True,
+                )
+
+            # Show the rejected members, the accepted ones are already on the roster
+            response = render(
+                request,
+                "tournaments/partials/roster_dialog_bulk_add_form.html",
+                {
+                    "team_at_tournament_id": team_at_tournament_id,
+                    "tournament_id": team_at_tournament.tournament_id,
+                    "form": AddMembersToRosterForm(),
+                    "member_errors": form.get_member_errors_display(),
+                },
+            )
+            response["HX-Trigger"] = "teamsListChanged"
+            return response
+    else:
+        form = AddMembersToRosterForm()
+        # Build the candidates for the member search while the dialog opens
+        get_roster_candidates(team_at_tournament.tournament, current_club.id)
+
+    return render(
+        request,
+        "tournaments/partials/roster_dialog_bulk_add_form.html",
+        {
+            "team_at_tournament_id": team_at_tournament_id,
+            "tournament_id": team_at_tournament.tournament_id,
+            "form": form,
+        },
+    )
+
+
 @login_required
 def roster_dialog_update_form_view(
     request: HttpRequest, member_at_tournament_id: int
@@ -252,9 +386,9 @@ def remove_member_from_roster_view(
         "tournaments/partials/roster_dialog.html",
         {
             "team_at_tournament": member_at_tournament.team_at_tournament,
-            "members_at_tournament": MemberAtTournament.objects.select_related(
-                "member__club", "team_at_tournament__application__team"
-            ).filter(team_at_tournament_id=member_at_tournament.team_at_tournament.id),
+            "roster": get_roster_snapshots(
+                member_at_tournament.tournament, member_at_tournament.team_at_tournament
+            ),
         },
     )
     response["HX-Trigger"] = "teamsListChanged"
@@ -262,6 +396,19 @@ def remove_member_from_roster_view(
 
 
 @require_GET
+@conditional_response(
+    lambda request, tournament_id: [
+        *_tournament_querysets(request, tournament_id),
+        Club.objects.filter(team__applications__teamattournament__tournament_id=tournament_id),
+        # The roster buttons show the member counts and are green for the current club
+        # until the roster deadline passes
+        MemberAtTournament.objects.filter(tournament_id=tournament_id),
+        Tournament.objects.filter(pk=tournament_id, rosters_deadline__gt=timezone.now()),
+    ],
+    vary_on_user=True,
+    private=True,
+    no_cache=True,
+)
 def teams_table_view(request: HttpRequest, tournament_id: int) -> HttpResponse:
     tournament = get_object_or_404(
         Tournament.objects.select_related("competition"),
@@ -275,13 +422,30 @@ def teams_table_view(request: HttpRequest, tournament_id: int) -> HttpResponse:
             "teams_at_tournament": (
                 TeamAtTournament.objects.filter(tournament_id=tournament_id)
                 .select_related("application", "application__team", "application__team__club")
-                .annotate(members_count_on_roster=Count("members"))
                 .order_by("final_placement", "seeding")
             ),
         },
     )
 
 
+@require_safe
+async def results_stream_view(request: HttpRequest, tournament_id: int) -> StreamingHttpResponse:
+    """Server-sent events with the results of the tournament, see ``tournaments.live``."""
+    if not await Tournament.objects.filter(pk=tournament_id).aexists():
+        raise Http404
+    if isinstance(request, ASGIRequest):
+        content: Iterable[str] | AsyncIterator[str] = stream_results(tournament_id)
+    else:
+        # A WSGI worker cannot hold the connection, the results are sent once and the
+        # browser connects again after the retry time
+        content = [await sync_to_async(get_results_event)(tournament_id, retry=RECONNECT_AFTER)]
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Let the proxy pass the events on as they come
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @require_GET
 def export_rosters_csv_view(request: HttpRequest, tournament_id: int) -> HttpResponse:
     """Export all rosters for a tournament as CSV. Staff/superuser only."""
@@ -290,18 +454,7 @@ def export_rosters_csv_view(request: HttpRequest, tournament_id: int) -> HttpRes
 
     tournament = get_object_or_404(Tournament, pk=tournament_id)
 
-    members_at_tournament = (
-        MemberAtTournament.objects.filter(tournament=tournament)
-        .select_related(
-            "member",
-            "team_at_tournament__application__team__club",
-        )
-        .order_by(
-            "team_at_tournament__application__team__name",
-            "member__last_name",
-            "member__first_name",
-        )
-    )
+    roster = get_roster_snapshots(tournament, order_by=("team_name", "last_name", "first_name"))
 
     response = HttpResponse(content_type="text/csv; charset=utf-8")
     response["Content-Disposition"] = f'attachment; filename="rosters_{tournament_id}.csv"'
@@ -324,20 +477,20 @@ def export_rosters_csv_view(request: HttpRequest, tournament_id: int) -> HttpRes
         ]
     )
 
-    for mat in members_at_tournament:
+    for snapshot in roster:
         writer.writerow(
             [
-                mat.member.first_name,
-                mat.member.last_name,
-                mat.member.birth_date.strftime("%Y-%m-%d"),
-                mat.member.get_sex_display(),
-                cast(Country, mat.member.citizenship).code,
-                mat.team_at_tournament.application.team_name,
-                mat.team_at_tournament.application.team.club.name,
-                mat.is_captain,
-                mat.is_spirit_captain,
-                mat.is_coach,
-                mat.jersey_number or "",
+                snapshot.first_name,
+                snapshot.last_name,
+                snapshot.birth_date.strftime("%Y-%m-%d"),
+                snapshot.get_sex_display(),
+                cast(Country, snapshot.citizenship).code,
+                snapshot.team_name,
+                snapshot.team_club_name,
+                snapshot.is_captain,
+                snapshot.is_spirit_captain,
+                snapshot.is_coach,
+                snapshot.jersey_number or "",
             ]
         )
 
@@ -0,0 +1,17 @@
+"""
+ASGI config for ultihub project.
+
+It exposes the ASGI callable as a module-level variable named ``application``. It is served
+by uvicorn workers of gunicorn with ``SERVER_MODE=asgi``, see ``docker/entrypoint.sh``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ultihub.settings")
+
+application = get_asgi_application()
@@ -1,5 +1,4 @@
 from pathlib import Path
-from typing import Any
 
 import environ
 import sentry_sdk
@@ -36,16 +35,6 @@ if ENVIRONMENT == "prod":
     # Prevent browsers from MIME-sniffing responses away from the declared content type.
     SECURE_CONTENT_TYPE_NOSNIFF = True
 
-    from sentry_sdk.types import Event
-
-    def _sentry_before_send(event: Event, hint: dict[str, Any]) -> Event | None:
-        from core.tasks import RetriableEmailError
-
-        exc_info = hint.get("exc_info")
-        if exc_info and issubclass(exc_info[0], RetriableEmailError):
-            return None
-        return event
-
     sentry_sdk.init(
         dsn=SENTRY_DSN,
         integrations=[
@@ -60,7 +49,6 @@ if ENVIRONMENT == "prod":
         # (birth_number, street, postal_code, dates of birth, etc.) can never
         # be transmitted to Sentry.
         max_request_body_size="never",
-        before_send=_sentry_before_send,
     )
 
 # APPLICATION DEFINITION ------------------------------------------------------
@@ -145,6 +133,9 @@ MESSAGE_TAGS = {
 }
 
 # DATABASE --------------------------------------------------------------------
+# "wsgi" or "asgi", selects the gunicorn worker class in docker/entrypoint.sh
+SERVER_MODE = env.str("SERVER_MODE", default="wsgi")
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -153,8 +144,10 @@ DATABASES = {
         "PASSWORD": env.str("DATABASE_PASSWORD"),
         "HOST": env.str("DATABASE_HOST"),
         "PORT": "5432",
-        # Reuse DB connections across requests to avoid opening a new connection every time
-        "CONN_MAX_AGE": 60,
+        # Reuse DB connections across requests to avoid opening a new connection every time.
+        # Under ASGI every request runs its sync code in a new thread, so a connection kept
+        # open would never be reused and the connections would pile up until Postgres refuses.
+        "CONN_MAX_AGE": 0 if SERVER_MODE == "asgi" else 60,
     }
 }
 
@@ -314,6 +307,20 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 
+# CACHES ----------------------------------------------------------------------
+# Shares the Redis server with Huey, in a separate database
+REDIS_URL = env.str("REDIS_URL", default="redis://redis:6379")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        if ENVIRONMENT == "test"
+        else {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": f"{REDIS_URL}/1",
+        }
+    )
+}
+
 # HUEY SETTINGS ---------------------------------------------------------------
 HUEY = {
     "huey_class": "huey.RedisHuey",
@@ -327,15 +334,40 @@ HUEY = {
     },
 }
 
+# Named queues and their consumer options, see core.queues. Every queue has its own worker
+# (`manage.py run_huey_queue <name>`); "interactive" is the default djhuey instance above.
+HUEY_QUEUES = {
+    "interactive": HUEY["consumer"],
+    "bulk": {"workers": 1},
+    # Releases locks of periodic tasks (see core.queues.lock_task) left by a crashed run
+    "maintenance": {"workers": 1, "flush_locks": True},
+}
+
 # REST FRAMEWORK --------------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ],
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.ApiCursorPagination",
+    # Sliding windows weighted by the cost of the endpoint, see api.throttling
+    "DEFAULT_THROTTLE_CLASSES": ["api.throttling.ApiThrottle"],
+    "DEFAULT_THROTTLE_RATES": {
+        "client": env.str("API_CLIENT_THROTTLE_RATE", default="600/min"),
+        "endpoint": env.str("API_ENDPOINT_THROTTLE_RATE", default="300/min"),
+    },
+    # nginx-proxy in front of the app
+    "NUM_PROXIES": 1,
 }
+API_TOKEN_CACHE_TIMEOUT = 5 * 60  # seconds
+API_PAGE_SIZE = env.int("API_PAGE_SIZE", default=100)
+API_MAX_PAGE_SIZE = 500
+# Compatibility with clients not aware of pagination, see api.pagination.ApiCursorPagination
+API_UNPAGINATED_LISTS = env.bool("API_UNPAGINATED_LISTS", default=True)
+# How long proxies may serve public API responses without revalidation (see core.conditional)
+API_CACHE_MAX_AGE = env.int("API_CACHE_MAX_AGE", default=30)
 
 # FAKTUROID -------------------------------------------------------------------
 FAKTUROID_CLIENT_ID = env.str("FAKTUROID_CLIENT_ID")
@@ -8,4 +8,5 @@ class AgentForm(forms.ModelForm):
         model = Agent
         fields = [
             "has_email_notifications_enabled",
+            "notification_delivery",
         ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.6 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0004_alter_newagentrequest_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="agent",
+            name="notification_delivery",
+            field=models.IntegerField(
+                choices=[(1, "Immediately"), (2, "Hourly digest"), (3, "Daily digest")],
+                default=1,
+                help_text="Receive an email for every notification or one digest per hour or day",
+                verbose_name="Email notifications delivery",
+            ),
+        ),
+    ]
@@ -6,6 +6,12 @@ from django.contrib.auth.models import User
 from django.db import models
 
 
+class NotificationDeliveryEnum(models.IntegerChoices):
+    IMMEDIATE = 1, "Immediately"
+    HOURLY_DIGEST = 2, "Hourly digest"
+    DAILY_DIGEST = 3, "Daily digest"
+
+
 class NewAgentRequest(AuditModel):
     email = ValidatedEmailField(unique=True)
     is_staff = models.BooleanField(default=False)
@@ -40,6 +46,12 @@ class Agent(AuditModel):
     has_email_notifications_enabled = models.BooleanField(
         default=True, verbose_name="Email notifications enabled"
     )
+    notification_delivery = models.IntegerField(
+        choices=NotificationDeliveryEnum.choices,
+        default=NotificationDeliveryEnum.IMMEDIATE,
+        verbose_name="Email notifications delivery",
+        help_text="Receive an email for every notification or one digest per hour or day",
+    )
 
     def __str__(self) -> str:
         return f"<Agent({self.user.email})>"